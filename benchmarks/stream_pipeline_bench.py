@@ -0,0 +1,303 @@
+# benchmarks/stream_pipeline_bench.py
+##♦️ uçtan uca stream pipeline benchmark'ı
+# Lokal bir WebSocket sunucusundan sentetik combined-stream frame'leri basar ve
+#   BinanceClient.ws_subscribe → main.build_bridge → main.build_kline_processor
+#   → RSI_MACD_Strategy → SignalEvaluator
+# zincirinden geçirir. Sembol sayısı × mesaj hızı taranır; her deneme için
+# sürdürülen msg/s, aşama gecikme yüzdelikleri, kuyruk derinlikleri ve RSS raporlanır.
+#
+# Kullanım:
+#   python -m benchmarks.stream_pipeline_bench --symbols 10,100,500 --rates 1000,5000,20000 --duration 10
+#   python -m benchmarks.stream_pipeline_bench --json bench_output.json
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+# Sinyal/karar logları geçici bir DB'ye yazılsın (utils.db import edilmeden önce)
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_"), "bench.db"))
+
+import numpy as np
+import websockets
+
+import main as bot_main
+from handlers import signal_handler
+from strategies.rsi_macd_strategy import RSI_MACD_Strategy
+from utils import db
+from utils.binance_api import BinanceClient
+from utils.signal_evaluator import SignalEvaluator
+
+LOG = logging.getLogger("bench")
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE / 1e6
+    except Exception:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _pct(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(values) / 1e3  # ns → µs
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {"p50": round(float(p50), 1), "p90": round(float(p90), 1), "p99": round(float(p99), 1),
+            "max": round(float(arr.max()), 1)}
+
+
+# -------------------------------------------------------------
+# Sentetik frame üretici (lokal WS sunucusu)
+# -------------------------------------------------------------
+class FrameSource:
+    def __init__(self, symbols: List[str], rate: int, duration: float, kline_share: float = 0.5):
+        self.symbols = symbols
+        self.rate = rate
+        self.duration = duration
+        self.kline_share = kline_share
+        self.prices = {s: 100.0 for s in symbols}
+        self.open_time = {s: 0 for s in symbols}
+        self.sent = 0
+
+    def _frame(self, rnd: random.Random) -> str:
+        sym = self.symbols[rnd.randrange(len(self.symbols))]
+        px = self.prices[sym] = max(0.01, self.prices[sym] * (1 + rnd.gauss(0, 0.004)))
+        t0 = time.perf_counter_ns()
+        if rnd.random() < self.kline_share:
+            self.open_time[sym] += 60_000
+            data = {"e": "kline", "E": 0, "s": sym, "_t0": t0,
+                    "k": {"t": self.open_time[sym], "s": sym, "i": "1m", "o": str(px), "h": str(px),
+                          "l": str(px), "c": str(px), "v": "1", "x": True}}
+            stream = f"{sym.lower()}@kline_1m"
+        else:
+            data = {"e": "24hrTicker", "E": 0, "s": sym, "_t0": t0, "c": str(px), "v": "1000"}
+            stream = f"{sym.lower()}@ticker"
+        return json.dumps({"stream": stream, "data": data})
+
+    async def handler(self, ws, *_):
+        rnd = random.Random(42)
+        tick = 0.005
+        per_tick = self.rate * tick
+        carry = 0.0
+        start = time.perf_counter()
+        n_tick = 0
+        try:
+            while time.perf_counter() - start < self.duration:
+                carry += per_tick
+                n = int(carry)
+                carry -= n
+                for _ in range(n):
+                    await ws.send(self._frame(rnd))
+                self.sent += n
+                n_tick += 1
+                delay = start + n_tick * tick - time.perf_counter()
+                await asyncio.sleep(max(0.0, delay))
+        except websockets.ConnectionClosed:
+            pass
+
+
+class SourceServer:
+    """FrameSource'u ayrı thread + event loop'ta çalıştırır (ölçülen loop'tan CPU çalmasın)."""
+
+    def __init__(self, source: FrameSource):
+        self.source = source
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._stop = None
+        self._thread = threading.Thread(target=self._run, name="bench_ws_source", daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        server = await websockets.serve(self.source.handler, "127.0.0.1", 0, max_queue=None)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        await self._stop.wait()
+        server.close()
+        await server.wait_closed()
+
+    def start(self) -> int:
+        self._thread.start()
+        self._ready.wait(timeout=10)
+        return self.port
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=10)
+
+
+# -------------------------------------------------------------
+# Tek deneme
+# -------------------------------------------------------------
+class _TimedQueue(asyncio.Queue):
+    """put/get zamanlarını ölçen kline kuyruğu (bekleme süresi + uçtan uca ingest)."""
+
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    async def put(self, item):
+        item["_tq"] = time.perf_counter_ns()
+        await super().put(item)
+
+    async def get(self):
+        item = await super().get()
+        now = time.perf_counter_ns()
+        self.stats["queue_wait"].append(now - item.get("_tq", now))
+        self.stats["ingest_e2e"].append(now - item.get("_t0", now))
+        return item
+
+
+async def run_trial(n_symbols: int, rate: int, duration: float) -> Dict:
+    symbols = [f"S{i:04d}USDT" for i in range(n_symbols)]
+    stats: Dict[str, List[float]] = {k: [] for k in ("ws_to_bridge", "queue_wait", "ingest_e2e", "strategy", "evaluator")}
+    depth_kline: List[int] = []
+    depth_eval: List[int] = []
+    rss_samples: List[float] = []
+    processed = {"frames": 0, "decisions": 0}
+
+    loop = asyncio.get_running_loop()
+
+    async def decision_cb(decision):
+        processed["decisions"] += 1
+        sigs = decision.get("signals") or []
+        if sigs:
+            stats["evaluator"].append((time.time() - sigs[-1]["ts"]) * 1e9)
+
+    evaluator = SignalEvaluator(decision_callback=decision_cb, loop=loop, window_seconds=10, threshold=0.3)
+    signal_handler.set_evaluator(evaluator)
+    before = asyncio.all_tasks()
+    evaluator.start()
+    evaluator_tasks = list(asyncio.all_tasks() - before)
+
+    strategies = {s: RSI_MACD_Strategy(s) for s in symbols}
+    for strat in strategies.values():
+        orig = strat.on_new_close
+
+        def timed(close, _orig=orig):
+            t = time.perf_counter_ns()
+            try:
+                return _orig(close)
+            finally:
+                stats["strategy"].append(time.perf_counter_ns() - t)
+
+        strat.on_new_close = timed
+
+    kline_queue = _TimedQueue(stats)
+    bridge = bot_main.build_bridge(kline_queue)
+    kline_processor = bot_main.build_kline_processor(kline_queue, strategies)
+
+    async def timed_bridge(msg):
+        data = msg.get("data", {})
+        stats["ws_to_bridge"].append(time.perf_counter_ns() - data.get("_t0", time.perf_counter_ns()))
+        processed["frames"] += 1
+        await bridge(msg)
+
+    async def sampler():
+        while True:
+            depth_kline.append(kline_queue.qsize())
+            depth_eval.append(evaluator.queue.qsize())
+            rss_samples.append(_rss_mb())
+            await asyncio.sleep(0.1)
+
+    source = FrameSource(symbols, rate, duration)
+    server = SourceServer(source)
+    port = server.start()
+
+    client = BinanceClient()
+    tasks = [
+        loop.create_task(client.ws_subscribe(f"ws://127.0.0.1:{port}/stream", timed_bridge)),
+        loop.create_task(kline_processor()),
+        loop.create_task(sampler()),
+    ]
+    t_start = time.perf_counter()
+    await asyncio.sleep(duration)
+    # kalan kuyruğu boşaltmak için kısa süre tanı (backlog ölçümü için sınırlı)
+    drain_deadline = time.perf_counter() + 5.0
+    while (kline_queue.qsize() or evaluator.queue.qsize()) and time.perf_counter() < drain_deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - t_start
+
+    evaluator.stop()
+    tasks += evaluator_tasks
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.stop()
+
+    return {
+        "symbols": n_symbols,
+        "offered_rate": rate,
+        "sent": source.sent,
+        "received": processed["frames"],
+        "sustained_msgs_per_sec": round(processed["frames"] / elapsed, 1),
+        "decisions": processed["decisions"],
+        "latency_us": {k: _pct(v) for k, v in stats.items()},
+        "kline_queue_depth": {"mean": round(float(np.mean(depth_kline or [0])), 1), "max": int(max(depth_kline or [0]))},
+        "evaluator_queue_depth": {"mean": round(float(np.mean(depth_eval or [0])), 1), "max": int(max(depth_eval or [0]))},
+        "rss_mb": {"start": round(rss_samples[0], 1) if rss_samples else 0.0,
+                   "max": round(max(rss_samples), 1) if rss_samples else 0.0},
+    }
+
+
+def _print_trial(res: Dict):
+    lat = res["latency_us"]
+    print(
+        f"symbols={res['symbols']:>4} offered={res['offered_rate']:>6}/s "
+        f"sustained={res['sustained_msgs_per_sec']:>9.1f}/s recv={res['received']}/{res['sent']} "
+        f"decisions={res['decisions']}"
+    )
+    for stage in ("ws_to_bridge", "queue_wait", "ingest_e2e", "strategy", "evaluator"):
+        p = lat[stage]
+        print(f"    {stage:<13} p50={p['p50']:>10}µs p90={p['p90']:>10}µs p99={p['p99']:>10}µs max={p['max']:>10}µs")
+    print(f"    queues: kline mean={res['kline_queue_depth']['mean']} max={res['kline_queue_depth']['max']} | "
+          f"evaluator mean={res['evaluator_queue_depth']['mean']} max={res['evaluator_queue_depth']['max']} | "
+          f"rss={res['rss_mb']['start']}→{res['rss_mb']['max']} MB")
+
+
+async def _amain(args):
+    db.init_db()
+    results = []
+    for n in args.symbols:
+        for rate in args.rates:
+            res = await run_trial(n, rate, args.duration)
+            _print_trial(res)
+            results.append(res)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stream → strategy → evaluator pipeline throughput benchmark")
+    ap.add_argument("--symbols", type=lambda s: [int(x) for x in s.split(",")], default=[10, 100, 500])
+    ap.add_argument("--rates", type=lambda s: [int(x) for x in s.split(",")], default=[1000, 5000, 20000])
+    ap.add_argument("--duration", type=float, default=10.0, help="deneme başına saniye")
+    ap.add_argument("--json", default=None, help="sonuçları JSON dosyasına yaz")
+    ap.add_argument("--verbose-logs", action="store_true", help="handler loglarını açık bırak")
+    args = ap.parse_args(argv)
+
+    if not args.verbose_logs:
+        logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_amain(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
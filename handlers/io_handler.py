@@ -13,6 +13,8 @@ from telegram.ext import CommandHandler, ContextTypes
 
 from utils.config import CONFIG
 from utils.binance_api import get_binance_api
+from utils.ticker_table import get_ticker_table
+from utils.liquidation_stream import get_liquidation_aggregator
 from utils import io_utils
 
 # =========================
@@ -69,6 +71,12 @@ async def _get_dynamic_usdt_symbols(api, max_symbols: int) -> List[str]:
         if s.get("status") == "TRADING" and s.get("quoteAsset") == CONFIG.IO.QUOTE_ASSET
     ]
 
+    table = get_ticker_table()
+    if table.ready():
+        ranked = [t["symbol"] for t in table.rows(symbols=usdt_symbols, sort_by="quote_volume", limit=max_symbols)]
+        if len(ranked) >= max_symbols:
+            return ranked
+
     tickers = await api.get_all_24h_tickers()
     vol_map: Dict[str, float] = {}
     for t in tickers:
@@ -97,7 +105,10 @@ async def _fetch_symbol_pack(symbol: str) -> Dict[str, Any]:
     kl = await api.get_klines(symbol, interval=CONFIG.BINANCE.STREAM_INTERVAL, limit=200)
     ob = await api.get_order_book(symbol, limit=100)
     tr = await api.get_recent_trades(symbol, limit=CONFIG.BINANCE.TRADES_LIMIT)
-    tk = await api.get_24h_ticker(symbol)
+    table = get_ticker_table()
+    tk = table.get(symbol) if table.ready() else None
+    if tk is None:
+        tk = await api.get_24h_ticker(symbol)
 
     try:
         fr = await api.get_funding_rate(symbol, limit=1)
@@ -105,6 +116,9 @@ async def _fetch_symbol_pack(symbol: str) -> Dict[str, Any]:
     except Exception:
         funding = {"fundingRate": 0}
 
+    liq_agg = get_liquidation_aggregator()
+    liquidations = liq_agg.notional(symbol, CONFIG.IO.WINDOW) if liq_agg.running else None
+
     now = _now_ms()
     norm_trades = []
     for t in tr:
@@ -119,7 +133,7 @@ async def _fetch_symbol_pack(symbol: str) -> Dict[str, Any]:
         "ticker": tk,
         "funding": funding,
         "oi": None,
-        "liquidations": None,
+        "liquidations": liquidations,
     }
 
 async def _build_snapshot(symbol: str) -> Dict[str, Any]:
@@ -1,11 +1,12 @@
 # handlers/kline_handler.py
 import asyncio
-from collections import deque
-from utils import indicators
+from utils.indicators import MACD, RSI
 from handlers.signal_handler import publish_signal
 
 async def kline_worker(queue: asyncio.Queue, symbol: str, interval: str = "1m", lookback: int = 500):
-    closes = deque(maxlen=lookback)
+    # artımlı state (bar başına O(1)); lookback artık kullanılmıyor, imza uyumluluğu için duruyor
+    rsi = RSI(14)
+    macd = MACD()
     while True:
         data = await queue.get()
         try:
@@ -17,12 +18,8 @@ async def kline_worker(queue: asyncio.Queue, symbol: str, interval: str = "1m",
                 queue.task_done()
                 continue
             close = float(k.get("c"))
-            closes.append(close)
-            arr = list(closes)
-            rsi_list = indicators.rsi(arr, period=14)
-            rsi_val = rsi_list[-1] if rsi_list else None
-            macd_line, macd_signal, macd_hist = indicators.macd(arr)
-            macd_h = macd_hist[-1] if macd_hist else None
+            rsi_val = rsi.update(close)
+            _, _, macd_h = macd.update(close)
             if rsi_val is not None and macd_h is not None:
                 if rsi_val < 30 and macd_h > 0:
                     await publish_signal("kline_rsi_macd", symbol, "BUY", strength=0.6, payload={"price": close, "rsi": rsi_val, "macd_h": macd_h})
@@ -3,6 +3,7 @@ import logging
 from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes
 from utils.binance_api import get_binance_api
+from utils.ticker_table import get_ticker_table
 
 LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
@@ -14,6 +15,12 @@ HELP = "/P [coin...] — Trend coinleri gösterir.\n/P d — Düşüşteki coinl
 # Ticker verisi çekme
 # -------------------------------------------------
 async def fetch_ticker_data(symbols=None, descending=True):
+    # Canlı tablo hazırsa ağ çağrısı yok
+    table = get_ticker_table()
+    if table.ready():
+        wanted = [s.upper() + "USDT" for s in symbols] if symbols else None
+        return table.rows(symbols=wanted, quote="USDT", sort_by="change_pct", descending=descending, limit=20)
+
     api = get_binance_api()
     data = await api.get_all_24h_tickers()
     if not data:
@@ -1,25 +1,52 @@
 # Dinamik stream ekleme/çıkarma (
 #handlers/stream_control_handler.py
+# - Semboller ShardSupervisor üzerinden worker process'lere eklenir / çıkarılır
+# - main.py supervisor'ı set_supervisor() ile enjekte eder (SHARD_WORKERS > 0)
 
 from telegram.ext import CommandHandler
 
+supervisor = None
+
+def set_supervisor(sup):
+    global supervisor
+    supervisor = sup
+
 async def add_stream(update, context):
     symbol = context.args[0].upper() if context.args else None
     if not symbol:
         await update.message.reply_text("Usage: /add_stream SYMBOL")
         return
-    # stream_mgr global veya singleton olmalı
-    stream_mgr.add_symbol(symbol)
-    await update.message.reply_text(f"Stream added: {symbol}")
+    if supervisor is None:
+        await update.message.reply_text("Dynamic streams require SHARD_WORKERS > 0")
+        return
+    shard = supervisor.add_symbol(symbol)
+    await update.message.reply_text(f"Stream added: {symbol} (shard {shard})")
 
 async def remove_stream(update, context):
     symbol = context.args[0].upper() if context.args else None
     if not symbol:
         await update.message.reply_text("Usage: /remove_stream SYMBOL")
         return
-    stream_mgr.remove_symbol(symbol)
-    await update.message.reply_text(f"Stream removed: {symbol}")
+    if supervisor is None:
+        await update.message.reply_text("Dynamic streams require SHARD_WORKERS > 0")
+        return
+    if supervisor.remove_symbol(symbol):
+        await update.message.reply_text(f"Stream removed: {symbol}")
+    else:
+        await update.message.reply_text(f"Not streaming: {symbol}")
+
+async def rebalance_streams(update, context):
+    if supervisor is None:
+        await update.message.reply_text("Dynamic streams require SHARD_WORKERS > 0")
+        return
+    moved = supervisor.rebalance()
+    lines = [f"Moved {moved} symbols"] + [
+        f"shard {s['shard']}: {s['symbols']} symbols, alive={s['alive']}, restarts={s['restarts']}"
+        for s in supervisor.stats()
+    ]
+    await update.message.reply_text("\n".join(lines))
 
 def register(application):
     application.add_handler(CommandHandler("add_stream", add_stream))
     application.add_handler(CommandHandler("remove_stream", remove_stream))
+    application.add_handler(CommandHandler("rebalance_streams", rebalance_streams))
@@ -1,12 +1,15 @@
 # handlers/ta_handler.py
 
 import asyncio
+import time
 import pandas as pd
 from telegram import Update
 from telegram.ext import CommandHandler, CallbackContext
 
+from utils.bar_cache import BarCache, get_bar_cache, last_closed_open_time
 from utils.binance_api import get_binance_api
 from utils.config import CONFIG
+from utils.ticker_table import get_ticker_table
 from utils.ta_utils import alpha_signal, scan_market
 
 
@@ -29,7 +32,9 @@ async def fetch_ohlcv(symbol: str, hours: int = 4, interval: str = "1h") -> pd.D
         "open": float, "high": float, "low": float,
         "close": float, "volume": float
     })
-    return df
+    # açık (oluşan) mum atılır → sonuç son kapanmış bara aittir, cache anahtarıyla aynı veri
+    now_ms = int(time.time() * 1000)
+    return df[df["close_time"].astype("int64") < now_ms].reset_index(drop=True)
 
 
 def regime_label(score: float) -> str:
@@ -66,24 +71,33 @@ def ta_handler(update: Update, context: CallbackContext) -> None:
                 # top-N scan
                 elif len(args) == 1 and args[0].isdigit():
                     top_n = int(args[0])
-                    tickers = await api.get_all_24h_tickers()
-                    usdt_pairs = [t for t in tickers if t["symbol"].endswith("USDT")]
-                    top_sorted = sorted(usdt_pairs, key=lambda x: float(x["quoteVolume"]), reverse=True)
-                    symbols = [t["symbol"] for t in top_sorted[:top_n]]
+                    table = get_ticker_table()
+                    if table.ready():
+                        symbols = [t["symbol"] for t in table.rows(quote="USDT", sort_by="quote_volume", limit=top_n)]
+                    else:
+                        tickers = await api.get_all_24h_tickers()
+                        usdt_pairs = [t for t in tickers if t["symbol"].endswith("USDT")]
+                        top_sorted = sorted(usdt_pairs, key=lambda x: float(x["quoteVolume"]), reverse=True)
+                        symbols = [t["symbol"] for t in top_sorted[:top_n]]
                     mode = f"top{top_n}"
 
-                # veri çek
-                data = {}
-                for sym in symbols:
-                    try:
-                        df = await fetch_ohlcv(sym, hours=4, interval="1h")
-                        data[sym] = df
-                    except Exception:
-                        continue
+                async def _scan():
+                    # veri çek
+                    data = {}
+                    for sym in symbols:
+                        try:
+                            df = await fetch_ohlcv(sym, hours=4, interval="1h")
+                            data[sym] = df
+                        except Exception:
+                            continue
 
-                btc_ref = data.get("BTCUSDT", None)
-                ref_close = btc_ref["close"] if btc_ref is not None else None
-                results = scan_market(data, ref_close=ref_close)
+                    btc_ref = data.get("BTCUSDT", None)
+                    ref_close = btc_ref["close"] if btc_ref is not None else None
+                    return scan_market(data, ref_close=ref_close)
+
+                # aynı kapanmış bar içinde aynı tarama tek kez hesaplanır
+                key = BarCache.make_key("*scan*", "1h", last_closed_open_time("1h"), "scan_market", tuple(symbols))
+                results = await get_bar_cache().get_or_compute(key, _scan)
 
                 text = f"📊 Market Scan (4h, mode={mode})\n"
                 for sym, res in results.items():
@@ -104,11 +118,14 @@ def ta_handler(update: Update, context: CallbackContext) -> None:
             hours = int(args[1]) if len(args) > 1 else 4
             interval = "1h"
 
-            df = await fetch_ohlcv(coin, hours=hours, interval=interval)
-            btc_df = await fetch_ohlcv("BTCUSDT", hours=hours, interval=interval)
-            ref_close = btc_df["close"] if btc_df is not None else None
+            async def _analyze():
+                df = await fetch_ohlcv(coin, hours=hours, interval=interval)
+                btc_df = await fetch_ohlcv("BTCUSDT", hours=hours, interval=interval)
+                ref_close = btc_df["close"] if btc_df is not None else None
+                return alpha_signal(df, ref_series=ref_close)
 
-            res = alpha_signal(df, ref_series=ref_close)
+            key = BarCache.make_key(coin, interval, last_closed_open_time(interval), "alpha_signal", (hours,))
+            res = await get_bar_cache().get_or_compute(key, _analyze)
 
             score = res["score"]
             sig = res["signal"]
@@ -1,59 +1,170 @@
 # handlers/ticker_handler.py
-#sadece canlı akışı gözlemlemek için var, 
+#sadece canlı akışı gözlemlemek için var,
 #anlamlı bir veri saklama veya işleme yapmaz
 #gerçek uygulamada komut veya veri kaydı için genişletmek gerekir.
 
 # handlers/ticker_pubsub.py
-# Async pub/sub: dict + çoklu subscriber
+# Async pub/sub: topic (symbol, field) bazlı abonelik + çoklu subscriber
+# - Abonelikler publish anında topic index üzerinden çözülür (sadece ilgili subscriber'lar dolaşılır)
+# - Her güncelleme için tek bir immutable kayıt (TickerUpdate) paylaşılır
+# - put_nowait + drop-oldest: publisher hiçbir zaman bloklanmaz
+# - market_data her mesajda tazelenir (ts); değişmeyen güncellemeler (heartbeat) sadece
+#   heartbeats=True ile abone olanlara gider
+# - Subscriber başına lag sayaçları (delivered / dropped / max_depth)
 import asyncio
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple
 
-# Global dict: en güncel fiyat/hacim
-market_data = {}
+# Topic alanları ve wildcard
+FIELDS = ("price", "vol")
+ANY = "*"
 
-# Subscriber listesi
-subscribers = set()
+
+class TickerUpdate(NamedTuple):
+    """Tek bir ticker güncellemesi (tüm subscriber'lar aynı nesneyi paylaşır)."""
+    symbol: str
+    price: float
+    vol: float
+    changed: Tuple[str, ...]   # boş → heartbeat (fiyat/hacim değişmedi)
+    ts: float
+
+
+class _Subscription:
+    __slots__ = ("queue", "topics", "heartbeats", "delivered", "dropped", "max_depth")
+
+    def __init__(self, queue: asyncio.Queue, topics: Set[Tuple[str, str]], heartbeats: bool = False):
+        self.queue = queue
+        self.topics = topics
+        self.heartbeats = heartbeats
+        self.delivered = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+
+# Global dict: en güncel fiyat/hacim (symbol -> TickerUpdate)
+market_data: Dict[str, TickerUpdate] = {}
+
+# Subscriber listesi (queue -> subscription)
+subscribers: Dict[asyncio.Queue, _Subscription] = {}
+
+# Topic index: (symbol | "*", field) -> subscription set
+_topics: Dict[Tuple[str, str], Set[_Subscription]] = {}
 
 # -----------------------------
 # Publisher (data handle)
 # -----------------------------
+def _deliver(sub: _Subscription, update: TickerUpdate):
+    queue = sub.queue
+    # Eğer queue doluysa en eskiyi at
+    if queue.full():
+        try:
+            queue.get_nowait()
+            sub.dropped += 1
+        except asyncio.QueueEmpty:
+            pass
+    try:
+        queue.put_nowait(update)
+        sub.delivered += 1
+    except asyncio.QueueFull:
+        sub.dropped += 1
+    depth = queue.qsize()
+    if depth > sub.max_depth:
+        sub.max_depth = depth
+
+
+def publish(symbol: str, price: float, vol: float):
+    """
+    Normalize edilmiş ticker değerini yayınlar.
+    Sadece değişen alanlara abone olan subscriber'lar dolaşılır;
+    hiçbir alan değişmediyse güncelleme heartbeat olarak sadece heartbeats=True abonelere gider.
+    """
+    prev = market_data.get(symbol)
+    if prev is None:
+        changed = FIELDS
+    else:
+        changed = tuple(f for f, old, new in (("price", prev.price, price), ("vol", prev.vol, vol)) if old != new)
+
+    update = TickerUpdate(symbol, price, vol, changed, time.time())
+    # En güncel veri (değişmese de zaman damgası tazelenir)
+    market_data[symbol] = update
+
+    if not _topics:
+        return
+
+    targets: Set[_Subscription] = set()
+    for field in changed or FIELDS:
+        subs = _topics.get((symbol, field))
+        if subs:
+            targets |= subs
+        subs = _topics.get((ANY, field))
+        if subs:
+            targets |= subs
+    if not changed:
+        targets = {sub for sub in targets if sub.heartbeats}
+
+    for sub in targets:
+        _deliver(sub, update)
+
+
 async def handle_ticker_data(data):
     try:
         symbol = data.get("s") or data.get("symbol")
         last_price = float(data.get("c") or data.get("lastPrice", 0))
         vol = float(data.get("v") or data.get("volume", 0))
-
-        # En güncel veri
-        market_data[symbol] = {"price": last_price, "vol": vol}
-
-        # Her subscriber'a async gönderim
-        for queue in subscribers:
-            # Eğer queue doluysa en eskiyi at
-            if queue.full():
-                try:
-                    queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    pass
-            await queue.put({"symbol": symbol, "price": last_price, "vol": vol})
-
+        publish(symbol, last_price, vol)
     except Exception:
         pass
 
 # -----------------------------
 # Subscriber yönetimi
 # -----------------------------
-def create_subscriber(maxsize=1000):
+def create_subscriber(maxsize=1000, symbols: Optional[Iterable[str]] = None, fields: Optional[Iterable[str]] = None,
+                      heartbeats: bool = False):
     """
-    Yeni subscriber ekler ve queue döner
+    Yeni subscriber ekler ve queue döner.
+    symbols   : None → tüm semboller; aksi halde sadece verilenler
+    fields    : None → tüm alanlar ("price", "vol"); aksi halde sadece bu alanlar değiştiğinde
+    heartbeats: True → değişmeyen güncellemeler de (changed=()) gelir
     """
     queue = asyncio.Queue(maxsize=maxsize)
-    subscribers.add(queue)
+    syms = [ANY] if symbols is None else [s.upper() for s in symbols]
+    flds = list(FIELDS) if fields is None else [f for f in fields if f in FIELDS]
+    topics = {(s, f) for s in syms for f in flds}
+
+    sub = _Subscription(queue, topics, heartbeats)
+    subscribers[queue] = sub
+    for topic in topics:
+        _topics.setdefault(topic, set()).add(sub)
     return queue
 
 def remove_subscriber(queue):
     """
     Subscriber siler
     """
-    subscribers.discard(queue)
+    sub = subscribers.pop(queue, None)
+    if sub is None:
+        return
+    for topic in sub.topics:
+        subs = _topics.get(topic)
+        if subs is None:
+            continue
+        subs.discard(sub)
+        if not subs:
+            del _topics[topic]
+
+def subscriber_stats(queue) -> Optional[Dict[str, int]]:
+    """
+    Subscriber lag sayaçları: delivered, dropped, depth (anlık), max_depth
+    """
+    sub = subscribers.get(queue)
+    if sub is None:
+        return None
+    return {
+        "delivered": sub.delivered,
+        "dropped": sub.dropped,
+        "depth": sub.queue.qsize(),
+        "max_depth": sub.max_depth,
+    }
 
 # -----------------------------
 # Örnek subscriber task
@@ -61,15 +172,14 @@ def remove_subscriber(queue):
 async def subscriber_task(name, queue):
     while True:
         data = await queue.get()
-        # Örnek filtreleme
-        if data["symbol"] in ("ETHUSDT", "BTCUSDT"):
-            print(f"{name} received: {data}")
+        # Filtreleme artık abonelik (topic) seviyesinde yapılıyor
+        print(f"{name} received: {data.symbol} price={data.price} vol={data.vol}")
 
 # -----------------------------
 # Kullanım Örneği
 # -----------------------------
-# queue1 = create_subscriber()
+# queue1 = create_subscriber(symbols=["ETHUSDT", "BTCUSDT"])
 # asyncio.create_task(subscriber_task("Sub1", queue1))
-# queue2 = create_subscriber()
+# queue2 = create_subscriber(fields=["price"])
 # asyncio.create_task(subscriber_task("Sub2", queue2))
 # handle_ticker_data() -> websocket veya bot stream’den çağrılır
@@ -13,7 +13,7 @@ import asyncio
 import os
 import signal
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 from telegram.ext import ApplicationBuilder
 
@@ -25,6 +25,18 @@ from utils.handler_loader import load_handlers
 from utils.binance_api import BinanceClient
 from utils.stream_manager import StreamManager
 from utils.order_manager import OrderManager
+from utils.market_recorder import MarketRecorder, MarketReplayer
+from utils.ingest_process import IngestProcess
+from utils.ticker_table import get_ticker_table
+from utils.liquidation_stream import get_liquidation_aggregator
+from utils.user_stream import AccountState, UserDataStream
+from utils.risk_manager import RiskManager
+from utils.bar_coordinator import BarCloseCoordinator
+from utils.whale_detector import get_whale_detector
+from utils.shard_supervisor import ShardSupervisor
+from utils.microstructure import get_microstructure_engine
+from utils.book_store import get_book_store
+from utils.liquidity_heatmap import get_heatmap_store
 from strategies.rsi_macd_strategy import RSI_MACD_Strategy
 
 # -------------------------------
@@ -34,8 +46,134 @@ LOG = logging.getLogger("main")
 
 # -------------------------------
 # Helpers: stream list
-def build_stream_list(symbols, interval):
-    return [f"{s.lower()}@kline_{interval}" for s in symbols] + [f"{s.lower()}@ticker" for s in symbols]
+def build_stream_list(symbols, interval, agg_trades: bool = False, klines: bool = True):
+    streams = [f"{s.lower()}@kline_{interval}" for s in symbols] if klines else []
+    streams += [f"{s.lower()}@ticker" for s in symbols]
+    if agg_trades:
+        streams += [f"{s.lower()}@aggTrade" for s in symbols]
+    return streams
+
+
+def build_book_stream_list(symbols, depth: bool = False, book_ticker: bool = False):
+    streams = [f"{s.lower()}@depth20@100ms" for s in symbols] if depth else []
+    if book_ticker:
+        streams += [f"{s.lower()}@bookTicker" for s in symbols]
+    return streams
+
+# -------------------------------
+# Helpers: stream → strateji pipeline'ı
+def build_bridge(kline_queue: asyncio.Queue):
+    """
+    WS mesaj yönlendirici: kline → kline_queue, aggTrade → whale dedektörü,
+    depth / bookTicker (stream adına göre; spot partial depth'te "e" yok) → defter deposu
+    (mikro yapı motoru oradan beslenir), diğerleri → funding/ticker handler.
+    """
+    from handlers import funding_handler, ticker_handler
+
+    # dedektör (~18 MB bucket) sadece aggTrade akışı açıkken kurulur
+    whale_detector = get_whale_detector() if CONFIG.BINANCE.WHALE_STREAM_ENABLED else None
+    book_store = get_book_store()
+
+    async def bridge(msg):
+        try:
+            data = msg.get("data") if isinstance(msg, dict) else msg
+            event = data.get("e") if isinstance(data, dict) else None
+            stream = msg.get("stream", "") if isinstance(msg, dict) else ""
+            if "@depth" in stream or "@bookTicker" in stream:
+                await book_store.handle_message(msg)
+            elif event == "aggTrade":
+                if whale_detector is not None:
+                    await whale_detector.handle_message(data)
+            elif isinstance(data, dict) and "k" in data:
+                await kline_queue.put(data)
+            else:
+                await funding_handler.handle_funding_data(data)
+                await ticker_handler.handle_ticker_data(data)
+        except Exception:
+            LOG.exception("bridge error")
+
+    return bridge
+
+
+def build_kline_processor(kline_queue: asyncio.Queue, strategies: Dict[str, RSI_MACD_Strategy],
+                          coordinator: Optional[BarCloseCoordinator] = None):
+    """
+    Kapanan mumları stratejilere verir, sinyalleri signal_handler'a yayınlar.
+    coordinator verilirse mumlar bar-close bariyerine gider (bkz. build_batch_processor).
+    """
+    from handlers import signal_handler
+
+    async def kline_processor():
+        while True:
+            data = await kline_queue.get()
+            try:
+                k = data.get("k", {})
+                # Sadece kapanan mumlar
+                if not k.get("x"):
+                    continue
+                if coordinator is not None:
+                    coordinator.add(data)
+                    continue
+                close_price = float(k["c"])
+                symbol = data.get("s")
+                strat = strategies.get(symbol)
+                if strat:
+                    sig = strat.on_new_close(close_price)
+                    if sig:
+                        await signal_handler.publish_signal(
+                            "rsi_macd",
+                            symbol,
+                            sig["type"],
+                            strength=sig["strength"],
+                            payload=sig["payload"],
+                        )
+            except asyncio.CancelledError:
+                # graceful exit
+                raise
+            except Exception:
+                LOG.exception("kline_processor error")
+            finally:
+                kline_queue.task_done()
+
+    return kline_processor
+
+
+def build_batch_processor(coordinator: BarCloseCoordinator, strategies: Dict[str, RSI_MACD_Strategy]):
+    """Bar-close batch'lerini toplu strateji değerlendirmesine verir (kesitsel özellikler payload'a eklenir)."""
+    from handlers import signal_handler
+
+    async def batch_processor():
+        while True:
+            batch = await coordinator.queue.get()
+            try:
+                idx = [i for i, s in enumerate(batch.symbols) if s in strategies]
+                if not idx:
+                    continue
+                signals = RSI_MACD_Strategy.evaluate_batch(
+                    [strategies[batch.symbols[i]] for i in idx], batch.close[idx]
+                )
+                feats = batch.features
+                for i in idx:
+                    symbol = batch.symbols[i]
+                    sig = signals.get(symbol)
+                    if not sig:
+                        continue
+                    payload = dict(sig["payload"])
+                    payload["breadth"] = feats["breadth"]
+                    payload["ref_return"] = feats["ref_return"]
+                    if feats["rel_return"] is not None:
+                        payload["rel_return"] = float(feats["rel_return"][i])
+                    await signal_handler.publish_signal(
+                        "rsi_macd", symbol, sig["type"], strength=sig["strength"], payload=payload
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOG.exception("batch_processor error")
+            finally:
+                coordinator.queue.task_done()
+
+    return batch_processor
 
 # -------------------------------
 # Main async entry
@@ -59,7 +197,19 @@ async def async_main():
     # --- Core services created inside running loop (loop uyumu için) ---
     bin_client = BinanceClient()
     stream_mgr = StreamManager(bin_client, loop=loop)
-    order_manager = OrderManager(paper_mode=CONFIG.BOT.PAPER_MODE)
+
+    # Canlı modda hesap durumu user data stream'den (bakiye/pozisyon/fill push)
+    account_state = None
+    user_stream = None
+    if not CONFIG.BOT.PAPER_MODE and CONFIG.BOT.USER_STREAM_ENABLED and CONFIG.BINANCE.API_KEY:
+        account_state = AccountState()
+        user_stream = UserDataStream(bin_client, account_state, loop=loop)
+    order_manager = OrderManager(
+        paper_mode=CONFIG.BOT.PAPER_MODE,
+        account_state=account_state,
+        # risk kontrolü yalnız user stream PnL'i varken (paper_trades tabanlı tahmin canlı işlemleri bloklamasın)
+        risk_manager=RiskManager(account_state=account_state) if account_state is not None else None,
+    )
 
     # SignalEvaluator: loop uyumu için burada oluştur
     from utils.signal_evaluator import SignalEvaluator
@@ -82,49 +232,14 @@ async def async_main():
     }
     kline_queue: asyncio.Queue = asyncio.Queue()
 
-    # Bridge: WS mesaj yönlendirici
-    async def bridge(msg):
-        from handlers import funding_handler, ticker_handler
-        try:
-            data = msg.get("data") if isinstance(msg, dict) else msg
-            if isinstance(data, dict) and "k" in data:
-                await kline_queue.put(data)
-            else:
-                await funding_handler.handle_funding_data(data)
-                await ticker_handler.handle_ticker_data(data)
-        except Exception:
-            LOG.exception("bridge error")
+    # Bridge + kline processor (modül seviyesindeki fabrikalar; benchmark da aynılarını kullanır)
+    # Bar-close bariyeri (opsiyonel): interval kapanışında tüm semboller tek batch'te
+    coordinator = None
+    if CONFIG.BOT.BAR_BATCH_ENABLED:
+        coordinator = BarCloseCoordinator(expected=strategies.keys(), loop=loop)
 
-    # Kline processor
-    async def kline_processor():
-        from handlers import signal_handler
-        while True:
-            data = await kline_queue.get()
-            try:
-                k = data.get("k", {})
-                # Sadece kapanan mumlar
-                if not k.get("x"):
-                    continue
-                close_price = float(k["c"])
-                symbol = data.get("s")
-                strat = strategies.get(symbol)
-                if strat:
-                    sig = strat.on_new_close(close_price)
-                    if sig:
-                        await signal_handler.publish_signal(
-                            "rsi_macd",
-                            symbol,
-                            sig["type"],
-                            strength=sig["strength"],
-                            payload=sig["payload"],
-                        )
-            except asyncio.CancelledError:
-                # graceful exit
-                raise
-            except Exception:
-                LOG.exception("kline_processor error")
-            finally:
-                kline_queue.task_done()
+    bridge = build_bridge(kline_queue)
+    kline_processor = build_kline_processor(kline_queue, strategies, coordinator=coordinator)
 
     # Handlers yükle ve evaluator'ü enjekte et
     from handlers import signal_handler
@@ -137,9 +252,101 @@ async def async_main():
     # 1) Evaluator loop
     evaluator.start()
 
-    # 2) Streams
-    streams = build_stream_list(CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO, CONFIG.BINANCE.STREAM_INTERVAL)
-    stream_mgr.start_combined_groups(streams, bridge)
+    # 1b) User data stream
+    if user_stream is not None:
+        user_stream.start()
+
+    # 2) Streams (veya kayıttan replay / ayrı ingest process)
+    recorder = None
+    ingest = None
+    supervisor = None
+    if CONFIG.RECORDER.REPLAY_PATH:
+        replayer = MarketReplayer()
+        replay_task = asyncio.create_task(replayer.run(bridge), name="market_replay")
+        background_tasks.append(replay_task)
+    elif CONFIG.SYSTEM.INGEST_MODE == "process":
+        from handlers import ticker_handler
+
+        interval = CONFIG.BINANCE.STREAM_INTERVAL
+
+        def on_kline_close(symbol, rec):
+            # inline modla aynı kline payload'u (BarCloseCoordinator interval + OHLCV bekler)
+            kline_queue.put_nowait({"e": "kline", "s": symbol, "k": {
+                "s": symbol, "i": interval, "t": int(rec["ts"]),
+                "o": float(rec["open"]), "h": float(rec["high"]), "l": float(rec["low"]),
+                "c": float(rec["close"]), "v": float(rec["volume"]), "q": float(rec["quote_volume"]),
+                "x": True,
+            }})
+
+        def on_ticker(symbol, rec):
+            ticker_handler.publish(symbol, float(rec["close"]), float(rec["volume"]))
+
+        ingest = IngestProcess(
+            CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO,
+            build_stream_list(CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO, CONFIG.BINANCE.STREAM_INTERVAL,
+                              agg_trades=CONFIG.BINANCE.WHALE_STREAM_ENABLED),
+        )
+        ingest.start()
+        ingest_task = asyncio.create_task(
+            ingest.consume(
+                on_kline_close=on_kline_close,
+                on_ticker=on_ticker,
+                on_trades=get_whale_detector().add_records if CONFIG.BINANCE.WHALE_STREAM_ENABLED else None,
+            ),
+            name="ingest_consumer",
+        )
+        background_tasks.append(ingest_task)
+    else:
+        if CONFIG.RECORDER.ENABLED:
+            recorder = MarketRecorder()
+            recorder.start()
+        # Shard modunda kline stream'leri + stratejiler worker process'lerde; burada ticker/aggTrade kalır
+        if CONFIG.SYSTEM.SHARD_WORKERS > 0:
+            from handlers import stream_control_handler
+            supervisor = ShardSupervisor(loop=loop)
+            supervisor.start(CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO)
+            stream_control_handler.set_supervisor(supervisor)
+        streams = build_stream_list(CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO, CONFIG.BINANCE.STREAM_INTERVAL,
+                                    agg_trades=CONFIG.BINANCE.WHALE_STREAM_ENABLED,
+                                    klines=supervisor is None)
+        stream_mgr.start_combined_groups(streams, bridge, raw_tap=recorder.tap if recorder else None)
+
+        # Defter akışları (partial depth / bookTicker) ayrı bağlantı grubunda; geniş evren için BOOK_SYMBOLS
+        mode = CONFIG.BINANCE.BOOK_STREAM_MODE
+        book_streams = build_book_stream_list(
+            CONFIG.BINANCE.BOOK_SYMBOLS or CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO,
+            depth=mode in ("depth", "both") or CONFIG.BINANCE.MICRO_STREAM_ENABLED,
+            book_ticker=mode in ("ticker", "both"),
+        )
+        if CONFIG.BINANCE.MICRO_STREAM_ENABLED:
+            get_book_store().engine = get_microstructure_engine()
+        if book_streams:
+            stream_mgr.start_combined_groups(book_streams, bridge, raw_tap=recorder.tap if recorder else None)
+
+    # 2a) Whale dedektörü (aggTrade akışı bridge / ingest üzerinden beslenir)
+    if CONFIG.BINANCE.WHALE_STREAM_ENABLED:
+        get_whale_detector().running = True
+
+    # 2b) Tüm market ticker tablosu (/p, /io, /t top-N REST yerine buradan okur)
+    if not CONFIG.RECORDER.REPLAY_PATH and CONFIG.BINANCE.ALL_MARKET_TICKER != "off":
+        stream_mgr.start_all_market_ticker(get_ticker_table().handle_message, mode=CONFIG.BINANCE.ALL_MARKET_TICKER)
+        background_tasks.append(asyncio.create_task(get_ticker_table().seed(bin_client), name="ticker_table_seed"))
+
+    # 2c) Futures likidasyon toplayıcı (/io risk bileşeni)
+    if not CONFIG.RECORDER.REPLAY_PATH and CONFIG.IO.LIQUIDATION_STREAM_ENABLED:
+        liq_agg = get_liquidation_aggregator()
+        liq_agg.running = True
+        stream_mgr.start_force_order_stream(liq_agg.handle_message)
+
+    # 2d) Likidite heatmap örnekleyici (REST depth, IO.HEATMAP_SAMPLE_SEC)
+    heatmap = None
+    if not CONFIG.RECORDER.REPLAY_PATH and CONFIG.IO.HEATMAP_ENABLED:
+        heatmap = get_heatmap_store()
+        heatmap.load()
+        heatmap_task = asyncio.create_task(
+            heatmap.run_sampler(bin_client, CONFIG.BINANCE.TOP_SYMBOLS_FOR_IO), name="liquidity_heatmap"
+        )
+        background_tasks.append(heatmap_task)
 
     # 3) Periodic funding poller
     stream_mgr.start_periodic_funding_poll(
@@ -153,6 +360,9 @@ async def async_main():
     # 4) Kline processor task
     kline_task = asyncio.create_task(kline_processor(), name="kline_processor")
     background_tasks.append(kline_task)
+    if coordinator is not None:
+        batch_task = asyncio.create_task(build_batch_processor(coordinator, strategies)(), name="bar_batch_processor")
+        background_tasks.append(batch_task)
 
     LOG.info(
         "Services started. PAPER_MODE=%s | Streams=%s",
@@ -192,8 +402,20 @@ async def async_main():
     LOG.info("Stopping background services...")
     evaluator.stop()
     stream_mgr.cancel_all()
+    if user_stream is not None:
+        user_stream.stop()
     for t in background_tasks:
         t.cancel()
+    if coordinator is not None:
+        coordinator.close()
+    if recorder is not None:
+        recorder.stop()
+    if ingest is not None:
+        ingest.stop()
+    if supervisor is not None:
+        supervisor.stop()
+    if heatmap is not None:
+        heatmap.save()
 
     # Drain queue fast (optional)
     try:
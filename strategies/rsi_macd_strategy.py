@@ -2,39 +2,39 @@
 # ♦️ Pluggable strategy wrapper (RSI + MACD)
 
 from collections import deque
-from utils import ta_utils  # artık ta_utils kullanılıyor
+from typing import Dict, List, Sequence
+
+from utils.indicators import MACD, RSI
 
 class RSI_MACD_Strategy:
     """
     RSI + MACD tabanlı örnek strateji.
     Kapanış fiyatlarını besle, basit BUY/SELL sinyali döner.
+    İndikatörler artımlı (utils.indicators): bar başına O(1), ta_utils.rsi / ta_utils.macd ile aynı değerler.
     """
 
     def __init__(self, symbol: str, lookback: int = 500, rsi_period: int = 14):
         self.symbol = symbol
         self.closes = deque(maxlen=lookback)
         self.rsi_period = rsi_period
+        self.rsi = RSI(rsi_period)   # ta_utils.rsi (SMA) varyantı
+        self.macd = MACD()
+        self.bars = 0
 
     def on_new_close(self, close: float):
         """Yeni kapanış fiyatı ekle ve sinyal üret."""
+        close = float(close)
         self.closes.append(close)
-        if len(self.closes) < self.rsi_period + 1:
+        self.bars += 1
+        rsi_val = self.rsi.update(close)
+        _, _, macd_h = self.macd.update(close)
+        if self.bars < self.rsi_period + 1 or rsi_val is None:
             return None
 
-        # closes → DataFrame'e çevir
-        import pandas as pd
-        df = pd.DataFrame({"close": list(self.closes)})
-
-        # RSI
-        rsi_val = ta_utils.rsi(df, period=self.rsi_period).iloc[-1]
-
-        # MACD
-        macd_line, signal_line, hist = ta_utils.macd(df)
-        macd_h = hist.iloc[-1]
-
-        if pd.isna(rsi_val) or pd.isna(macd_h):
-            return None
+        return self._decide(rsi_val, macd_h, close)
 
+    @staticmethod
+    def _decide(rsi_val, macd_h, close):
         # Basit kurallar
         if rsi_val < 30 and macd_h > 0:
             return {
@@ -50,3 +50,16 @@ class RSI_MACD_Strategy:
             }
 
         return None
+
+    @classmethod
+    def evaluate_batch(cls, strategies: List["RSI_MACD_Strategy"], closes: Sequence[float]) -> Dict[str, dict]:
+        """
+        Bar-close batch'i: her stratejiye kendi kapanışını ekler (artımlı state → sembol başına O(1)).
+        Dönüş: {symbol: sinyal dict}
+        """
+        out: Dict[str, dict] = {}
+        for strat, close in zip(strategies, closes):
+            sig = strat.on_new_close(close)
+            if sig:
+                out[strat.symbol] = sig
+        return out
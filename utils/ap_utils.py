@@ -61,7 +61,7 @@ def order_book_imbalance_pro(bids: list, asks: list):
 
 def compute_whale_score(trades, threshold_usd=None):
     """Whale trade hacmi normalize (log transform)"""
-    threshold_usd = threshold_usd or CONFIG.WHALE_USD_THRESHOLD
+    threshold_usd = threshold_usd or CONFIG.BINANCE.WHALE_USD_THRESHOLD
     whale_volumes = [float(t["qty"])*float(t["price"]) for t in trades if float(t["qty"])*float(t["price"]) >= threshold_usd]
     if not whale_volumes:
         return 0
@@ -96,7 +96,7 @@ async def get_altcoin_short_metrics_pro(client: BinanceClient, symbol: str):
     ob = await client.get_order_book(symbol, limit=50)
     obi = order_book_imbalance_pro(ob["bids"], ob["asks"])
 
-    # Trade bazlı skorlar
+    # Trade bazlı skorlar (son 200 trade; dedektörün zaman pencereli değerleri farklı ölçü)
     trades = await client.get_recent_trades(symbol, limit=200)
     whale_score = compute_whale_score(trades)
     taker_score = compute_taker_score(trades)
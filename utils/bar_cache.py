@@ -0,0 +1,203 @@
+# utils/bar_cache.py
+##♦️ bar-anahtarlı indikatör / alpha sonuç cache'i
+# - Anahtar: (symbol, interval, son kapanmış bar open_time, fonksiyon, parametreler)
+# - Yeni bar kapanınca anahtar değişir; aynı (symbol, interval) için eski bar kayıtları yazımda temizlenir
+# - LRU tahliye: kayıt sayısı (CONFIG.TA.CACHE_MAX_ENTRIES) + yaklaşık bellek tavanı (CONFIG.TA.CACHE_MAX_MB)
+# - Async uçuşta birleştirme: aynı anahtar hesaplanırken gelen istekler aynı sonucu bekler
+#   (10 kullanıcı aynı taramayı isterse tek hesap)
+# - Girdi yalnız kapanmış barlardan oluşmalı (açık mum atılır), yoksa sonuç bar boyunca bayat kalır
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("bar_cache")
+LOG.addHandler(logging.NullHandler())
+
+_UNIT_MS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+Key = Tuple[str, str, int, str, Hashable]
+
+
+# -------------------------------------------------------------
+# Bar zamanı yardımcıları
+# -------------------------------------------------------------
+def interval_ms(interval: str) -> int:
+    """Binance interval ("1m", "4h", "1d", "1w") → ms. ("1M" desteklenmez.)"""
+    return int(interval[:-1]) * _UNIT_MS[interval[-1]]
+
+
+def last_closed_open_time(interval: str, now_ms: Optional[int] = None) -> int:
+    """Duvar saatine göre son kapanmış barın open_time'ı (UTC hizalı; haftalık barlar Pazartesi başlar)."""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    step = interval_ms(interval)
+    offset = 4 * 86_400_000 if interval.endswith("w") else 0   # epoch Perşembe → Pazartesi hizası
+    return (now_ms - offset) // step * step + offset - step
+
+
+def _sizeof(obj: Any, depth: int = 0) -> int:
+    """Yaklaşık bellek (numpy/pandas verisi + kaplar); derinlik sınırlı."""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        mem = obj.memory_usage(index=True)
+        return int(mem.sum() if isinstance(mem, pd.Series) else mem)
+    if depth > 4:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_sizeof(k, depth + 1) + _sizeof(v, depth + 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(_sizeof(v, depth + 1) for v in obj)
+    return sys.getsizeof(obj)
+
+
+# -------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------
+class BarCache:
+    def __init__(self, max_entries: Optional[int] = None, max_mb: Optional[float] = None):
+        self.max_entries = int(max_entries or CONFIG.TA.CACHE_MAX_ENTRIES)
+        self.max_bytes = int((max_mb if max_mb is not None else CONFIG.TA.CACHE_MAX_MB) * 1024 * 1024)
+        self._data: "OrderedDict[Key, Tuple[Any, int]]" = OrderedDict()
+        self._by_series: Dict[Tuple[str, str], Set[Key]] = {}
+        self._bar: Dict[Tuple[str, str], int] = {}
+        self._pending: Dict[Key, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(symbol: str, interval: str, bar_time: int, func: str, params: Hashable = ()) -> Key:
+        return (symbol, interval, int(bar_time), func, params)
+
+    # ---------------------------------------------------------
+    # Temel
+    # ---------------------------------------------------------
+    def get(self, key: Key, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Key, value: Any):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        series = (key[0], key[1])
+        with self._lock:
+            bar = self._bar.get(series)
+            if bar is not None and key[2] < bar:
+                return                      # eski bar sonucu (geç gelen) yazılmaz
+            if bar is None or key[2] > bar:
+                self._invalidate_locked(series)
+                self._bar[series] = key[2]
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self._by_series.setdefault(series, set()).add(key)
+            self.bytes += size
+            while self._data and (len(self._data) > self.max_entries or self.bytes > self.max_bytes):
+                k, (_, sz) = self._data.popitem(last=False)
+                self.bytes -= sz
+                self._by_series.get((k[0], k[1]), set()).discard(k)
+                self.evictions += 1
+
+    def _invalidate_locked(self, series: Tuple[str, str]):
+        for k in self._by_series.pop(series, ()):
+            item = self._data.pop(k, None)
+            if item is not None:
+                self.bytes -= item[1]
+
+    def invalidate(self, symbol: str, interval: Optional[str] = None):
+        with self._lock:
+            for series in [s for s in self._by_series if s[0] == symbol and (interval is None or s[1] == interval)]:
+                self._invalidate_locked(series)
+                self._bar.pop(series, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._by_series.clear()
+            self._bar.clear()
+            self.bytes = 0
+
+    # ---------------------------------------------------------
+    # Hesapla-veya-getir
+    # ---------------------------------------------------------
+    def cached(self, key: Key, compute: Callable[[], Any]) -> Any:
+        """Senkron: cache'te yoksa compute() ve yaz."""
+        if not CONFIG.TA.CACHE_ENABLED:
+            return compute()
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    async def get_or_compute(self, key: Key, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async: aynı anahtar için uçuştaki hesap paylaşılır; hata cache'lenmez.
+        Hesap kendi task'ında koşar → bekleyenlerden biri (ilk çağıran dahil) iptal edilirse
+        diğerleri etkilenmez.
+        """
+        if not CONFIG.TA.CACHE_ENABLED:
+            return await compute()
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is not _missing:
+            return value
+        task = self._pending.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            task = asyncio.ensure_future(compute())
+            self._pending[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_computed(k, t))
+        return await asyncio.shield(task)
+
+    def _on_computed(self, key: Key, task: asyncio.Future):
+        self._pending.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is None:    # exception() → bekleyen yoksa "never retrieved" uyarısı olmasın
+            self.put(key, task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "mb": round(self.bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pending": len(self._pending),
+        }
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_cache: Optional[BarCache] = None
+
+
+def get_bar_cache() -> BarCache:
+    global _cache
+    if _cache is None:
+        _cache = BarCache()
+    return _cache
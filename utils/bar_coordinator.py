@@ -0,0 +1,165 @@
+# utils/bar_coordinator.py
+##♦️ bar-close bariyeri: interval kapanışında tüm sembollerin mumlarını tek batch'te toplar
+# - Her (interval, open_time) için ilk kapanan mum bir grace süresi (loop.call_later) başlatır
+# - Beklenen tüm semboller geldiyse hemen, gelmediyse grace dolunca flush edilir
+# - Batch: semboller × (open, high, low, close, volume) numpy dizisi + bar başına bir kez
+#   hesaplanan kesitsel özellikler (breadth, referans (BTC) getirisi, göreli getiri)
+# - Flush edilmiş bir bara geç gelen mum kaybolmaz; tek satırlık "late" batch olarak verilir
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("bar_coordinator")
+LOG.addHandler(logging.NullHandler())
+
+FIELDS = ("open", "high", "low", "close", "volume")
+F_OPEN, F_HIGH, F_LOW, F_CLOSE, F_VOLUME = range(len(FIELDS))
+
+
+@dataclass
+class BarBatch:
+    interval: str
+    open_time: int
+    symbols: List[str]
+    ohlcv: np.ndarray                      # (len(symbols), len(FIELDS)) float64
+    features: Dict[str, Any] = field(default_factory=dict)
+    late: bool = False
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.ohlcv[:, F_CLOSE]
+
+    def row(self, symbol: str) -> Optional[np.ndarray]:
+        try:
+            return self.ohlcv[self.symbols.index(symbol)]
+        except ValueError:
+            return None
+
+
+def cross_section_features(symbols: List[str], ohlcv: np.ndarray, ref_symbol: str) -> Dict[str, Any]:
+    """Bar başına bir kez: getiriler, breadth, referans getirisi, referansa göre göreli getiri."""
+    o = ohlcv[:, F_OPEN]
+    c = ohlcv[:, F_CLOSE]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.where(o > 0, c / o - 1.0, 0.0)
+    adv = int((ret > 0).sum())
+    dec = int((ret < 0).sum())
+    n = len(symbols)
+    ref_ret = float(ret[symbols.index(ref_symbol)]) if ref_symbol in symbols else None
+    qv = ohlcv[:, F_VOLUME] * c
+    return {
+        "returns": ret,
+        "advancers": adv,
+        "decliners": dec,
+        "breadth": (adv - dec) / n if n else 0.0,
+        "mean_return": float(ret.mean()) if n else 0.0,
+        "median_return": float(np.median(ret)) if n else 0.0,
+        "vw_return": float((ret * qv).sum() / qv.sum()) if n and qv.sum() > 0 else 0.0,
+        "ref_symbol": ref_symbol,
+        "ref_return": ref_ret,
+        "rel_return": ret - ref_ret if ref_ret is not None else None,
+    }
+
+
+class _Pending:
+    __slots__ = ("rows", "handle")
+
+    def __init__(self):
+        self.rows: Dict[str, Tuple[float, float, float, float, float]] = {}
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class BarCloseCoordinator:
+    """
+    Kapanan kline'ları (x=True) toplar; batch'ler self.queue'ya (asyncio.Queue) konur.
+    expected: bar başına beklenen sembol seti (hepsi gelince grace beklenmez).
+    """
+
+    def __init__(self, expected: Optional[Iterable[str]] = None, loop=None,
+                 grace_ms: Optional[int] = None, ref_symbol: Optional[str] = None):
+        self.expected = {s.upper() for s in expected} if expected else set()
+        self.loop = loop or asyncio.get_event_loop()
+        self.grace = (grace_ms if grace_ms is not None else CONFIG.BOT.BAR_BATCH_GRACE_MS) / 1000.0
+        self.ref_symbol = (ref_symbol or CONFIG.BOT.BAR_BATCH_REF_SYMBOL).upper()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._pending: Dict[Tuple[str, int], _Pending] = {}
+        self._flushed: deque = deque(maxlen=64)
+        self.stats = {"bars": 0, "batches": 0, "late": 0, "timeouts": 0}
+
+    # ---------------------------------------------------------
+    # Giriş
+    # ---------------------------------------------------------
+    def add(self, data: Dict[str, Any]) -> bool:
+        """Combined/raw kline payload'u; sadece kapanan mumlar kabul edilir."""
+        k = data.get("k") or {}
+        if not k.get("x"):
+            return False
+        symbol = (data.get("s") or k.get("s") or "").upper()
+        key = (k.get("i", ""), int(k.get("t", 0)))
+        row = (
+            float(k.get("o", k["c"])), float(k.get("h", k["c"])), float(k.get("l", k["c"])),
+            float(k["c"]), float(k.get("v", 0.0)),
+        )
+        self.stats["bars"] += 1
+
+        if key in self._flushed:
+            self.stats["late"] += 1
+            self._emit(key, {symbol: row}, late=True)
+            return True
+
+        pend = self._pending.get(key)
+        if pend is None:
+            pend = self._pending[key] = _Pending()
+            pend.handle = self.loop.call_later(self.grace, self._on_deadline, key)
+        pend.rows[symbol] = row
+
+        if self.expected and self.expected.issubset(pend.rows):
+            self.flush(key)
+        return True
+
+    def _on_deadline(self, key):
+        if key in self._pending:
+            self.stats["timeouts"] += 1
+            self.flush(key)
+
+    # ---------------------------------------------------------
+    # Flush
+    # ---------------------------------------------------------
+    def flush(self, key: Optional[Tuple[str, int]] = None):
+        """Tek bir bar'ı (key) ya da bekleyen tümünü batch olarak kuyruğa koyar."""
+        keys = [key] if key is not None else sorted(self._pending, key=lambda kk: kk[1])
+        for kk in keys:
+            pend = self._pending.pop(kk, None)
+            if pend is None:
+                continue
+            if pend.handle is not None:
+                pend.handle.cancel()
+            self._flushed.append(kk)
+            self._emit(kk, pend.rows, late=False)
+
+    def _emit(self, key: Tuple[str, int], rows: Dict[str, tuple], late: bool):
+        symbols = list(rows)
+        ohlcv = np.array([rows[s] for s in symbols], dtype=np.float64).reshape(len(symbols), len(FIELDS))
+        batch = BarBatch(
+            interval=key[0],
+            open_time=key[1],
+            symbols=symbols,
+            ohlcv=ohlcv,
+            features=cross_section_features(symbols, ohlcv, self.ref_symbol),
+            late=late,
+        )
+        self.stats["batches"] += 1
+        self.queue.put_nowait(batch)
+
+    def close(self):
+        for pend in self._pending.values():
+            if pend.handle is not None:
+                pend.handle.cancel()
+        self._pending.clear()
@@ -13,6 +13,9 @@ from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlencode
 
 from utils.config import CONFIG
+from utils.whale_detector import active_whale_detector
+from utils.depth_ladder import DepthLadder
+from utils.book_store import get_book_store
 
 # -------------------------------------------------------------
 # Logger
@@ -31,11 +34,15 @@ class BinanceHTTPClient:
         self._cache: Dict[str, Tuple[float, Any]] = {}
 
     async def _request(self, method: str, path: str, params: Optional[dict] = None,
-                       signed: bool = False, futures: bool = False) -> Any:
+                       signed: bool = False, futures: bool = False, keyed: bool = False) -> Any:
         base_url = CONFIG.BINANCE.FAPI_URL if futures else CONFIG.BINANCE.BASE_URL
         headers = {}
         params = params or {}
 
+        # imzasız ama API key isteyen endpoint'ler (örn. listenKey)
+        if keyed:
+            headers["X-MBX-APIKEY"] = CONFIG.BINANCE.API_KEY
+
         if signed:
             ts = int(time.time() * 1000)
             params["timestamp"] = ts
@@ -137,12 +144,46 @@ class BinanceClient:
         params = {"symbol": symbol.upper(), "limit": limit}
         return await self.http._request("GET", "/fapi/v1/fundingRate", params=params, futures=True)
 
+    async def futures_mark_price(self, symbol: str) -> float:
+        data = await self.http._request("GET", "/fapi/v1/premiumIndex", {"symbol": symbol.upper()}, futures=True)
+        return float(data["markPrice"])
+
+    async def futures_account(self) -> Dict[str, Any]:
+        return await self.http._request("GET", "/fapi/v2/account", signed=True, futures=True)
+
+    async def futures_open_orders(self) -> List[Dict[str, Any]]:
+        return await self.http._request("GET", "/fapi/v1/openOrders", signed=True, futures=True)
+
+    async def futures_income(self, income_type: str, start_time: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        """start_time'dan itibaren tüm gelir kayıtları (limit'lik sayfalarla)."""
+        out: List[Dict[str, Any]] = []
+        while True:
+            params = {"incomeType": income_type, "startTime": start_time, "limit": limit}
+            page = await self.http._request("GET", "/fapi/v1/income", params=params, signed=True, futures=True)
+            out.extend(page)
+            if len(page) < limit:
+                return out
+            start_time = int(page[-1]["time"]) + 1
+
+    # --- User Data Stream (listenKey) ---
+    async def futures_listen_key(self) -> str:
+        res = await self.http._request("POST", "/fapi/v1/listenKey", futures=True, keyed=True)
+        return res["listenKey"]
+
+    async def futures_keepalive_listen_key(self) -> Dict[str, Any]:
+        return await self.http._request("PUT", "/fapi/v1/listenKey", futures=True, keyed=True)
+
     # --- WebSocket ---
-    async def ws_subscribe(self, url: str, callback):
+    async def ws_subscribe(self, url: str, callback, raw_tap=None):
+        """
+        raw_tap: opsiyonel sync fn(raw_frame, recv_ts_ns) — decode öncesi ham frame kaydı için
+        """
         while True:
             try:
                 async with websockets.connect(url) as ws:
                     async for msg in ws:
+                        if raw_tap is not None:
+                            raw_tap(msg, time.time_ns())
                         data = json.loads(msg)
                         await callback(data)
             except Exception as e:
@@ -170,6 +211,9 @@ class BinanceClient:
     # Temel Metrikler
     # -------------------------------------------------------------
     async def order_book_imbalance(self, symbol: str, limit: int = 50) -> float:
+        book = get_book_store()
+        if book.has_depth(symbol, limit):
+            return book.obi(symbol, limit)
         ob = await self.get_order_book(symbol, limit)
         bids = sum(float(b[1]) for b in ob["bids"])
         asks = sum(float(a[1]) for a in ob["asks"])
@@ -195,6 +239,9 @@ class BinanceClient:
     # Pro Metrikler
     # -------------------------------------------------------------
     async def spread(self, symbol: str) -> float:
+        live = get_book_store().spread(symbol)
+        if live is not None:
+            return live
         ob = await self.get_order_book(symbol, 5)
         best_bid = float(ob["bids"][0][0])
         best_ask = float(ob["asks"][0][0])
@@ -202,20 +249,12 @@ class BinanceClient:
 
     async def vwap_depth_impact(self, symbol: str, depth: float = 0.01) -> float:
         ob = await self.get_order_book(symbol, 100)
-        mid = (float(ob["bids"][0][0]) + float(ob["asks"][0][0])) / 2
-        target = mid * (1 + depth)
-        cum_qty = 0
-        cum_notional = 0
-        for ask in ob["asks"]:
-            p, q = float(ask[0]), float(ask[1])
-            if p > target:
-                break
-            cum_qty += q
-            cum_notional += p * q
-        vwap = cum_notional / max(cum_qty, 1)
-        return (vwap - mid) / mid
+        return DepthLadder.from_order_book(ob).vwap_impact(depth)
 
     async def liquidity_score(self, symbol: str, levels: int = 20) -> float:
+        book = get_book_store()
+        if book.has_depth(symbol, levels):
+            return book.liquidity_score(symbol, levels)
         ob = await self.get_order_book(symbol, levels)
         bid_vol = sum(float(b[1]) for b in ob["bids"])
         ask_vol = sum(float(a[1]) for a in ob["asks"])
@@ -241,13 +280,7 @@ class BinanceClient:
 
     async def market_order_price_impact(self, symbol: str, qty: float) -> float:
         ob = await self.get_order_book(symbol, 100)
-        cum_qty = 0
-        for ask in ob["asks"]:
-            p, q = float(ask[0]), float(ask[1])
-            cum_qty += q
-            if cum_qty >= qty:
-                return (p - float(ob["bids"][0][0])) / float(ob["bids"][0][0])
-        return 0.0
+        return DepthLadder.from_order_book(ob).market_order_impact(qty)
 
     # -------------------------------------------------------------
     # Gelişmiş Pro Metrikler
@@ -258,9 +291,27 @@ class BinanceClient:
         for t in trades:
             notional = float(t["price"]) * float(t["qty"])
             if notional >= usd_threshold:
-                net += -1 if t["m"] else 1
+                net += -1 if t["isBuyerMaker"] else 1
         return net / max(len(trades), 1)
 
+    def whale_window_metrics(self, symbol: str, window_sec: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        aggTrade dedektöründen zaman pencereli (WHALE_WINDOW_SEC) metrikler; dedektör sembolü takip
+        etmiyorsa None. whale_trades / whale_momentum / trade_size_distribution'dan (son N trade) ayrı ölçüdür.
+        """
+        det = active_whale_detector()
+        if det is None or not det.covers(symbol):
+            return None
+        return {
+            "window_sec": window_sec or det.window,
+            "whale_count": det.whale_count(symbol, window_sec),
+            "whale_momentum": det.momentum(symbol, window_sec),
+            "net_flow_usd": det.net_flow(symbol, window_sec),
+            "whale_volume_usd": det.whale_volume(symbol, window_sec),
+            "size_distribution": det.size_distribution(symbol, window_sec),
+            "taker_qty": det.taker_qty(symbol, window_sec),
+        }
+
     async def taker_ratio_score(self, symbol: str, lookback: int = 500) -> float:
         trades = await self.get_agg_trades(symbol, limit=lookback)
         buy = sum(float(t["q"]) for t in trades if not t["m"])
@@ -270,23 +321,16 @@ class BinanceClient:
 
     async def vwap_depth_score(self, symbol: str, depth: float = 0.01) -> float:
         ob = await self.get_order_book(symbol, limit=100)
-        mid = (float(ob["bids"][0][0]) + float(ob["asks"][0][0])) / 2
-        target = mid * (1 + depth)
-        cum_qty = 0
-        cum_notional = 0
-        for ask in ob["asks"]:
-            p, q = float(ask[0]), float(ask[1])
-            if p > target:
-                break
-            cum_qty += q
-            cum_notional += p * q
-        vwap = cum_notional / max(cum_qty, 1)
-        return (vwap - mid) / mid
+        return DepthLadder.from_order_book(ob).vwap_impact(depth)
 
     async def liquidity_imbalance_score(self, symbol: str, levels: int = 20) -> float:
-        ob = await self.get_order_book(symbol, limit=levels)
-        bid_vol = sum(float(b[1]) for b in ob["bids"])
-        ask_vol = sum(float(a[1]) for a in ob["asks"])
+        book = get_book_store()
+        if book.has_depth(symbol, levels):
+            bid_vol, ask_vol = book.side_volumes(symbol, levels)
+        else:
+            ob = await self.get_order_book(symbol, limit=levels)
+            bid_vol = sum(float(b[1]) for b in ob["bids"])
+            ask_vol = sum(float(a[1]) for a in ob["asks"])
         imbalance = (bid_vol - ask_vol) / max(bid_vol + ask_vol, 1)
         liquidity = 100 * min(bid_vol, ask_vol) / max(bid_vol, ask_vol)
         return liquidity * (1 + imbalance)
@@ -0,0 +1,207 @@
+# utils/book_store.py
+##♦️ hafif partial-depth + bookTicker defter deposu (geniş sembol evreni için)
+# - @depth20@100ms partial snapshot'ları: sembol başına sabit 20 seviyelik dizi, yerinde üzerine yazılır
+#   (diff-depth değil → REST snapshot senkronu / sequence takibi yok)
+# - @bookTicker: sembol başına best bid/ask + miktarlar
+# - Sembol başına ~700 byte; 200+ altcoin için evren çapında spread / OBI / likidite taraması vektörel
+# - BinanceClient.spread / liquidity_score / order_book_imbalance / liquidity_imbalance_score taze veri varsa buradan
+# - Opsiyonel: her güncelleme MicrostructureEngine'e iletilir (engine attribute)
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("book_store")
+LOG.addHandler(logging.NullHandler())
+
+LEVELS = 20
+# bookTicker sütunları
+BT_BID, BT_BID_QTY, BT_ASK, BT_ASK_QTY = range(4)
+
+
+class PartialBookStore:
+    def __init__(self, capacity: int = 256, stale_after: Optional[float] = None):
+        self.capacity = capacity
+        self.stale_after = stale_after if stale_after is not None else CONFIG.BINANCE.BOOK_STALE_SEC
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.bids = np.zeros((capacity, LEVELS, 2))
+        self.asks = np.zeros((capacity, LEVELS, 2))
+        self.n_bids = np.zeros(capacity, dtype=np.int16)
+        self.n_asks = np.zeros(capacity, dtype=np.int16)
+        self.top = np.full((capacity, 4), np.nan)
+        self.depth_ts = np.zeros(capacity)   # time.time() (yerel alım zamanı)
+        self.top_ts = np.zeros(capacity)
+        self.engine = None                  # MicrostructureEngine (opsiyonel)
+        self.updates = 0
+
+    # ---------------------------------------------------------
+    # İç yardımcılar
+    # ---------------------------------------------------------
+    def _slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i >= self.capacity:
+                self._grow()
+            self.index[symbol] = i
+            self.symbols.append(symbol)
+        return i
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("bids", "asks", "n_bids", "n_asks", "top", "depth_ts", "top_ts"):
+            arr = getattr(self, name)
+            grown = np.full((cap,) + arr.shape[1:], np.nan) if name == "top" else np.zeros((cap,) + arr.shape[1:], dtype=arr.dtype)
+            grown[:self.capacity] = arr
+            setattr(self, name, grown)
+        self.capacity = cap
+
+    @staticmethod
+    def _fill(dst: np.ndarray, levels) -> int:
+        n = min(len(levels), LEVELS)
+        for j in range(n):
+            dst[j, 0] = float(levels[j][0])
+            dst[j, 1] = float(levels[j][1])
+        return n
+
+    # ---------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------
+    def update_depth(self, symbol: str, bids, asks, ts_ms: Optional[int] = None):
+        i = self._slot(symbol)
+        nb = self._fill(self.bids[i], bids)
+        na = self._fill(self.asks[i], asks)
+        self.n_bids[i] = nb
+        self.n_asks[i] = na
+        self.depth_ts[i] = time.time()
+        self.updates += 1
+        if self.engine is not None and nb and na:
+            self.engine.update(symbol, self.bids[i, :nb], self.asks[i, :na], ts_ms)
+
+    def update_top(self, symbol: str, bid: float, bid_qty: float, ask: float, ask_qty: float,
+                   ts_ms: Optional[int] = None):
+        i = self._slot(symbol)
+        self.top[i] = (bid, bid_qty, ask, ask_qty)
+        self.top_ts[i] = time.time()
+        self.updates += 1
+        # depth akışı olan sembollerde motor depth'ten beslenir (OFI serisi karışmasın)
+        if self.engine is not None and not self.depth_ts[i]:
+            self.engine.update_top(symbol, bid, bid_qty, ask, ask_qty, ts_ms)
+
+    async def handle_message(self, msg):
+        """ws callback: <symbol>@depth20@100ms veya <symbol>@bookTicker (combined)."""
+        try:
+            stream = msg.get("stream", "") if isinstance(msg, dict) else ""
+            data = msg.get("data", msg) if isinstance(msg, dict) else msg
+            symbol = (data.get("s") or stream.split("@", 1)[0]).upper()
+            if "bids" in data or isinstance(data.get("b"), list):
+                self.update_depth(symbol, data.get("bids") or data.get("b"), data.get("asks") or data.get("a"), data.get("E"))
+            else:
+                self.update_top(symbol, float(data["b"]), float(data["B"]), float(data["a"]), float(data["A"]),
+                                data.get("E") or data.get("T"))
+        except Exception:
+            LOG.exception("book store update error")
+
+    # ---------------------------------------------------------
+    # Okuma
+    # ---------------------------------------------------------
+    def _fresh_depth(self, symbol: str) -> Optional[int]:
+        i = self.index.get(symbol.upper())
+        if i is None or not self.n_bids[i] or not self.n_asks[i]:
+            return None
+        return i if time.time() - self.depth_ts[i] < self.stale_after else None
+
+    def has_depth(self, symbol: str, levels: int = LEVELS) -> bool:
+        i = self._fresh_depth(symbol)
+        return i is not None and levels <= LEVELS
+
+    def best(self, symbol: str) -> Optional[tuple]:
+        """(bid, ask): taze bookTicker, yoksa taze depth'in ilk seviyesi."""
+        i = self.index.get(symbol.upper())
+        if i is None:
+            return None
+        now = time.time()
+        if now - self.top_ts[i] < self.stale_after and self.top_ts[i] >= self.depth_ts[i]:
+            return float(self.top[i, BT_BID]), float(self.top[i, BT_ASK])
+        if self._fresh_depth(symbol) is not None:
+            return float(self.bids[i, 0, 0]), float(self.asks[i, 0, 0])
+        if now - self.top_ts[i] < self.stale_after:
+            return float(self.top[i, BT_BID]), float(self.top[i, BT_ASK])
+        return None
+
+    def spread(self, symbol: str) -> Optional[float]:
+        """BinanceClient.spread ile aynı tanım: (ask − bid) / mid."""
+        b = self.best(symbol)
+        if b is None:
+            return None
+        bid, ask = b
+        return (ask - bid) / ((ask + bid) / 2)
+
+    def side_volumes(self, symbol: str, levels: int = LEVELS) -> Optional[tuple]:
+        i = self._fresh_depth(symbol)
+        if i is None:
+            return None
+        return (float(self.bids[i, :min(levels, self.n_bids[i]), 1].sum()),
+                float(self.asks[i, :min(levels, self.n_asks[i]), 1].sum()))
+
+    def obi(self, symbol: str, levels: int = LEVELS) -> Optional[float]:
+        v = self.side_volumes(symbol, levels)
+        if v is None:
+            return None
+        bid_vol, ask_vol = v
+        return (bid_vol - ask_vol) / max(bid_vol + ask_vol, 1)
+
+    def liquidity_score(self, symbol: str, levels: int = LEVELS) -> Optional[float]:
+        v = self.side_volumes(symbol, levels)
+        if v is None:
+            return None
+        bid_vol, ask_vol = v
+        return 100 * min(bid_vol, ask_vol) / max(bid_vol, ask_vol)
+
+    def screen(self, symbols: Optional[Iterable[str]] = None, levels: int = LEVELS) -> Dict[str, np.ndarray]:
+        """
+        Evren çapında vektörel tarama (taze depth'i olan semboller):
+        {"symbol", "spread", "obi", "liquidity", "bid_vol", "ask_vol"}
+        """
+        n = len(self.symbols)
+        if symbols is not None:
+            idx = np.array([self.index[s] for s in symbols if s in self.index], dtype=np.int64)
+        else:
+            idx = np.arange(n)
+        now = time.time()
+        idx = idx[(self.n_bids[idx] > 0) & (self.n_asks[idx] > 0) & (now - self.depth_ts[idx] < self.stale_after)]
+        lv = np.arange(LEVELS)
+        bmask = lv[None, :] < np.minimum(self.n_bids[idx], levels)[:, None]
+        amask = lv[None, :] < np.minimum(self.n_asks[idx], levels)[:, None]
+        bid_vol = (self.bids[idx, :, 1] * bmask).sum(axis=1)
+        ask_vol = (self.asks[idx, :, 1] * amask).sum(axis=1)
+        bb = self.bids[idx, 0, 0]
+        ba = self.asks[idx, 0, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            liquidity = 100 * np.minimum(bid_vol, ask_vol) / np.maximum(bid_vol, ask_vol)
+        return {
+            "symbol": np.array([self.symbols[i] for i in idx], dtype=object),
+            "spread": (ba - bb) / ((ba + bb) / 2),
+            "obi": (bid_vol - ask_vol) / np.maximum(bid_vol + ask_vol, 1),
+            "liquidity": liquidity,
+            "bid_vol": bid_vol,
+            "ask_vol": ask_vol,
+        }
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_store: Optional[PartialBookStore] = None
+
+
+def get_book_store() -> PartialBookStore:
+    global _store
+    if _store is None:
+        _store = PartialBookStore()
+    return _store
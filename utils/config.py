@@ -19,11 +19,26 @@ load_dotenv(ENV_PATH, override=True)
 class BinanceConfig:
     BASE_URL: str = "https://api.binance.com"
     FAPI_URL: str = "https://fapi.binance.com"
+    FSTREAM_URL: str = "wss://fstream.binance.com"
     API_KEY: Optional[str] = os.getenv("BINANCE_API_KEY")
     SECRET_KEY: Optional[str] = os.getenv("BINANCE_SECRET_KEY")
     CONCURRENCY: int = int(os.getenv("BINANCE_CONCURRENCY", 8))
     TRADES_LIMIT: int = int(os.getenv("TRADES_LIMIT", 500))
     WHALE_USD_THRESHOLD: float = float(os.getenv("WHALE_USD_THRESHOLD", 50000))
+    # aggTrade whale dedektörü: "BTCUSDT:1000000,ETHUSDT:250000" şeklinde sembol bazlı eşikler
+    WHALE_SYMBOL_THRESHOLDS: str = os.getenv("WHALE_SYMBOL_THRESHOLDS", "")
+    WHALE_WINDOW_SEC: int = int(os.getenv("WHALE_WINDOW_SEC", 900))
+    WHALE_STREAM_ENABLED: bool = os.getenv("WHALE_STREAM_ENABLED", "false").lower() == "true"
+    # Order book mikro yapı motoru (<symbol>@depth20@100ms)
+    MICRO_STREAM_ENABLED: bool = os.getenv("MICRO_STREAM_ENABLED", "false").lower() == "true"
+    MICRO_HISTORY: int = int(os.getenv("MICRO_HISTORY", 3000))  # sembol başına kayıt (100ms → 5 dk)
+    MICRO_LEVELS: int = int(os.getenv("MICRO_LEVELS", 5))       # çok seviyeli imbalance derinliği
+    # Hafif defter modu: off | ticker (@bookTicker) | depth (@depth20@100ms) | both
+    BOOK_STREAM_MODE: str = os.getenv("BOOK_STREAM_MODE", "off").lower()
+    BOOK_SYMBOLS: List[str] = field(
+        default_factory=lambda: [s for s in os.getenv("BOOK_SYMBOLS", "").split(",") if s]
+    )  # boş → TOP_SYMBOLS_FOR_IO
+    BOOK_STALE_SEC: float = float(os.getenv("BOOK_STALE_SEC", 5))
     TOP_SYMBOLS_FOR_IO: List[str] = field(
         default_factory=lambda: os.getenv("TOP_SYMBOLS_FOR_IO", "BTCUSDT,ETHUSDT").split(",")
     )
@@ -32,8 +47,17 @@ class BinanceConfig:
         default_factory=lambda: os.getenv("SCAN_SYMBOLS", "BTCUSDT,ETHUSDT,BNBUSDT,SOLUSDT,TRXUSDT,CAKEUSDT,SUIUSDT,PEPEUSDT,ARPAUSDT,TURBOUSDT").split(",")
     )
     IO_CONCURRENCY: int = int(os.getenv("IO_CONCURRENCY", 5))
+    # WS bağlantı paketleme (HTTP concurrency'den bağımsız)
+    WS_MAX_STREAMS_PER_CONN: int = int(os.getenv("WS_MAX_STREAMS_PER_CONN", 1024))  # Binance combined limit
+    WS_MAX_URL_LEN: int = int(os.getenv("WS_MAX_URL_LEN", 4096))
+    WS_SPLIT_MSG_RATE: float = float(os.getenv("WS_SPLIT_MSG_RATE", 1000))  # msg/s üstü bölünür, 0 → kapalı
+    WS_RATE_CHECK_SEC: float = float(os.getenv("WS_RATE_CHECK_SEC", 30))
+    WS_SPLIT_HANDOVER_SEC: float = float(os.getenv("WS_SPLIT_HANDOVER_SEC", 15))  # yarılar bu sürede bağlanmazsa bölme geri alınır
     BINANCE_TICKER_TTL: int = int(os.getenv("BINANCE_TICKER_TTL", 5))
     STREAM_INTERVAL: str = os.getenv("STREAM_INTERVAL", "1m")
+    # Tüm market ticker tablosu: "mini" (!miniTicker@arr), "full" (!ticker@arr), "off"
+    ALL_MARKET_TICKER: str = os.getenv("ALL_MARKET_TICKER", "off").lower()
+    TICKER_TABLE_STALE_SEC: float = float(os.getenv("TICKER_TABLE_STALE_SEC", 30))
 
 # === Bot Config ===
 @dataclass
@@ -41,6 +65,15 @@ class BotConfig:
     PAPER_MODE: bool = os.getenv("PAPER_MODE", "true").lower() == "true"
     EVALUATOR_WINDOW: int = int(os.getenv("EVALUATOR_WINDOW", 60))
     EVALUATOR_THRESHOLD: float = float(os.getenv("EVALUATOR_THRESHOLD", 0.5))
+    RISK_MAX_DAILY_LOSS: float = float(os.getenv("RISK_MAX_DAILY_LOSS", 0.05))  # equity oranı
+    # Futures user data stream (bakiye/pozisyon/fill push) — sadece canlı modda
+    USER_STREAM_ENABLED: bool = os.getenv("USER_STREAM_ENABLED", "false").lower() == "true"
+    USER_STREAM_KEEPALIVE_SEC: int = int(os.getenv("USER_STREAM_KEEPALIVE_SEC", 1800))
+    MARK_PRICE_STALE_SEC: float = float(os.getenv("MARK_PRICE_STALE_SEC", 10))  # lokal mark price bu yaşın üstünde → REST
+    # Bar-close bariyeri: aynı interval'in kapanan mumları tek batch halinde işlenir
+    BAR_BATCH_ENABLED: bool = os.getenv("BAR_BATCH_ENABLED", "false").lower() == "true"
+    BAR_BATCH_GRACE_MS: int = int(os.getenv("BAR_BATCH_GRACE_MS", 250))
+    BAR_BATCH_REF_SYMBOL: str = os.getenv("BAR_BATCH_REF_SYMBOL", "BTCUSDT")
 
 # === TA Config ===
 @dataclass
@@ -77,6 +110,7 @@ class TAConfig:
     REGIME_WINDOW: int = int(os.getenv("REGIME_WINDOW", 80))
     ENTROPY_M: int = int(os.getenv("ENTROPY_M", 3))
     ENTROPY_R_FACTOR: float = float(os.getenv("ENTROPY_R_FACTOR", 0.2))
+    ENTROPY_CHUNK: int = int(os.getenv("ENTROPY_CHUNK", 256))   # ApEn/SampEn komşu sayımı satır parçası
     LEADLAG_MAX_LAG: int = int(os.getenv("LEADLAG_MAX_LAG", 10))
 
     # alpha_ta ağırlıkları
@@ -86,10 +120,22 @@ class TAConfig:
     W_REGIME: float = float(os.getenv("W_REGIME", 0.20))
     W_LEADLAG: float = float(os.getenv("W_LEADLAG", 0.20))
 
+    # bar-anahtarlı sonuç cache'i (utils.bar_cache): aynı kapanmış bar içinde tekrar hesap yok
+    CACHE_ENABLED: bool = os.getenv("TA_CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("TA_CACHE_MAX_ENTRIES", 512))
+    CACHE_MAX_MB: float = float(os.getenv("TA_CACHE_MAX_MB", 64))
+
 # === System Config ===
 @dataclass
 class SystemConfig:
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", 2))
+    # "inline" → stream'ler bot event loop'unda, "process" → ayrı ingest process + shared-memory ring
+    INGEST_MODE: str = os.getenv("INGEST_MODE", "inline").lower()
+    INGEST_RING_CAPACITY: int = int(os.getenv("INGEST_RING_CAPACITY", 262144))  # kayıt (64 byte)
+    # >0 → semboller bu kadar strateji worker process'ine bölünür (kline stream + stratejiler worker'da)
+    SHARD_WORKERS: int = int(os.getenv("SHARD_WORKERS", 0))
+    # calculate_cpu_functions havuzu: "thread" (kalıcı thread pool) | "process" (kalıcı process pool + shared memory)
+    CPU_BACKEND: str = os.getenv("CPU_BACKEND", "thread").lower()
 
 # === IO Config ===
 @dataclass
@@ -119,12 +165,34 @@ class IOConfig:
 
     OI_BASELINE: float = float(os.getenv("IO_OI_BASELINE", 1.0))
     LIQUIDATION_BASELINE: float = float(os.getenv("IO_LIQUIDATION_BASELINE", 1.0))
+    # !forceOrder@arr stream'i ile canlı likidasyon toplayıcı
+    LIQUIDATION_STREAM_ENABLED: bool = os.getenv("IO_LIQUIDATION_STREAM_ENABLED", "false").lower() == "true"
 
     TOP_N_MIGRATION: int = int(os.getenv("IO_TOP_N_MIGRATION", 10))
     MAX_SYMBOLS_MARKET: int = int(os.getenv("IO_MAX_SYMBOLS_MARKET", 30))
 
     QUOTE_ASSET: str = os.getenv("IO_QUOTE_ASSET", "USDT")
 
+    # Uzun dönem likidite heatmap (±bant derinliği örnekleri)
+    HEATMAP_ENABLED: bool = os.getenv("IO_HEATMAP_ENABLED", "false").lower() == "true"
+    HEATMAP_BANDS: List[float] = field(
+        default_factory=lambda: [float(x) for x in os.getenv("IO_HEATMAP_BANDS", "0.005,0.01,0.02,0.05").split(",")]
+    )
+    HEATMAP_SAMPLE_SEC: int = int(os.getenv("IO_HEATMAP_SAMPLE_SEC", 5))
+    HEATMAP_DEPTH_LIMIT: int = int(os.getenv("IO_HEATMAP_DEPTH_LIMIT", 500))  # REST depth seviye sayısı
+    HEATMAP_DIR: Optional[str] = os.getenv("IO_HEATMAP_DIR") or None       # kapanışta kayıt / açılışta yükleme
+
+# === Recorder / Replay Config ===
+@dataclass
+class RecorderConfig:
+    ENABLED: bool = os.getenv("RECORDER_ENABLED", "false").lower() == "true"
+    DIR: str = os.getenv("RECORDER_DIR", "data/recordings")
+    SEGMENT_MAX_BYTES: int = int(os.getenv("RECORDER_SEGMENT_MAX_BYTES", 64 * 1024 * 1024))
+    SEGMENT_MAX_SECONDS: int = int(os.getenv("RECORDER_SEGMENT_MAX_SECONDS", 3600))
+    # Doluysa canlı stream yerine kayıt geri oynatılır (dosya veya klasör)
+    REPLAY_PATH: Optional[str] = os.getenv("REPLAY_PATH") or None
+    REPLAY_SPEED: float = float(os.getenv("REPLAY_SPEED", 1.0))  # 0 → max hız
+
 # === Telegram Config ===
 @dataclass
 class TelegramConfig:
@@ -144,6 +212,7 @@ class AppConfig:
     BOT: BotConfig = field(default_factory=BotConfig)
     TA: TAConfig = field(default_factory=TAConfig)
     IO: IOConfig = field(default_factory=IOConfig)   # ✅ IO Config entegre edildi
+    RECORDER: RecorderConfig = field(default_factory=RecorderConfig)
     TELEGRAM: TelegramConfig = field(default_factory=TelegramConfig)
     DATABASE: DatabaseConfig = field(default_factory=DatabaseConfig)
 
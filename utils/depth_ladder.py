@@ -0,0 +1,114 @@
+# utils/depth_ladder.py
+##♦️ prefix-sum derinlik merdiveni: impact / VWAP / bant likiditesi sorguları O(log n)
+# - Defter bir kez parse edilir: her taraf için fiyat dizisi + kümülatif miktar ve notional prefix dizileri
+# - Sorgular searchsorted ile: "x% içine kadar VWAP", "qty için fiyat etkisi", "±p% bandındaki likidite"
+# - Prefix toplamları seviye sırasıyla (soldan sağa) biriktirilir → mevcut Python döngüleriyle bit-bit aynı sonuç
+# - Binance sıralaması varsayılır: bids azalan, asks artan fiyat
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+BID = "bids"
+ASK = "asks"
+
+
+class _Side:
+    __slots__ = ("price", "cum_qty", "cum_notional", "asc")
+
+    def __init__(self, levels, asc: bool):
+        arr = np.asarray(levels, dtype=np.float64).reshape(-1, 2) if len(levels) else np.empty((0, 2))
+        self.price = arr[:, 0].copy()
+        qty = arr[:, 1]
+        # başa 0 eklenmiş prefix'ler: cum[k] = ilk k seviyenin toplamı
+        self.cum_qty = np.concatenate(([0.0], np.cumsum(qty)))
+        self.cum_notional = np.concatenate(([0.0], np.cumsum(arr[:, 0] * qty)))
+        self.asc = asc
+
+    def count_within(self, limit: float) -> int:
+        """Fiyatı limit'i aşmayan (ask: ≤ limit, bid: ≥ limit) baştaki seviye sayısı."""
+        if self.asc:
+            return int(np.searchsorted(self.price, limit, side="right"))
+        # azalan dizide ≥ limit olan prefix: -price artan
+        return int(np.searchsorted(-self.price, -limit, side="right"))
+
+    def fill_index(self, qty: float) -> int:
+        """Kümülatif miktarın ilk kez qty'ye ulaştığı seviye (yoksa -1)."""
+        k = int(np.searchsorted(self.cum_qty[1:], qty, side="left"))
+        return k if k < self.price.size else -1
+
+
+class DepthLadder:
+    def __init__(self, bids, asks):
+        self.bids = _Side(bids, asc=False)
+        self.asks = _Side(asks, asc=True)
+
+    @classmethod
+    def from_order_book(cls, order_book: Dict[str, Any]) -> "DepthLadder":
+        return cls(order_book.get("bids", []), order_book.get("asks", []))
+
+    def _side(self, side: str) -> _Side:
+        return self.bids if side == BID else self.asks
+
+    # ---------------------------------------------------------
+    # Temel
+    # ---------------------------------------------------------
+    @property
+    def best_bid(self) -> float:
+        return float(self.bids.price[0])
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.asks.price[0])
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    # ---------------------------------------------------------
+    # Sorgular
+    # ---------------------------------------------------------
+    def depth_within(self, side: str, limit: float) -> Tuple[float, float]:
+        """limit fiyatına kadar (dahil) kümülatif (miktar, notional)."""
+        s = self._side(side)
+        k = s.count_within(limit)
+        return float(s.cum_qty[k]), float(s.cum_notional[k])
+
+    def vwap_impact(self, depth: float = 0.01, side: str = ASK) -> float:
+        """
+        mid'den depth oranı kadar uzağa kadar olan seviyelerin VWAP'ının mid'e göre sapması.
+        BinanceClient.vwap_depth_impact ile aynı: payda max(cum_qty, 1).
+        """
+        mid = self.mid
+        limit = mid * (1 + depth) if side == ASK else mid * (1 - depth)
+        cum_qty, cum_notional = self.depth_within(side, limit)
+        vwap = cum_notional / max(cum_qty, 1)
+        return (vwap - mid) / mid
+
+    def impact_price(self, qty: float, side: str = ASK) -> Optional[float]:
+        """qty'lik market emrinin son dolduğu seviye fiyatı; defter yetmezse None."""
+        s = self._side(side)
+        k = s.fill_index(qty)
+        return float(s.price[k]) if k >= 0 else None
+
+    def market_order_impact(self, qty: float) -> float:
+        """BinanceClient.market_order_price_impact ile aynı: (dolum fiyatı − best bid) / best bid, yetmezse 0."""
+        p = self.impact_price(qty, ASK)
+        if p is None:
+            return 0.0
+        bb = self.best_bid
+        return (p - bb) / bb
+
+    def band_liquidity(self, price: float, pct: float, notional: bool = False) -> Dict[str, float]:
+        """price·(1 ± pct) bandı içindeki bid/ask miktarı (notional=True → quote cinsinden)."""
+        bid_cum = self.bids.cum_notional if notional else self.bids.cum_qty
+        ask_cum = self.asks.cum_notional if notional else self.asks.cum_qty
+        return {
+            "bids": float(bid_cum[self.bids.count_within(price * (1 - pct))]),
+            "asks": float(ask_cum[self.asks.count_within(price * (1 + pct))]),
+        }
+
+    def reach(self) -> Tuple[float, float]:
+        """Defterin mid'den ulaştığı en uzak mesafe (oran) — bid, ask. Daha geniş bantlar eksik kalır."""
+        mid = self.mid
+        return (mid - float(self.bids.price[-1])) / mid, (float(self.asks.price[-1]) - mid) / mid
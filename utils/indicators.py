@@ -0,0 +1,319 @@
+# utils/indicators.py
+##♦️ streaming (artımlı) indikatör motoru — bar başına O(1) güncelleme
+# - Sembol başına durum nesneleri: EMA, MACD, RSI (ta_utils SMA varyantı + Wilder), ATR, OBV, Bollinger, Stochastic,
+#   PermutationEntropy
+# - ta_utils batch fonksiyonlarıyla sayısal olarak aynı sonuçlar (aynı ısınma / NaN kuralları):
+#     EMA/MACD   → pandas ewm(adjust=False) güncelleme formülünün birebir aynısı
+#     RSI (sma)  → ta_utils.rsi (ilk bar kazanç/kayıp 0 sayılır, rolling mean)
+#     ATR (sma)  → ta_utils.atr (ilk bar TR = high − low)
+#     Bollinger  → rolling mean ± k · rolling std (ddof=1)
+#     Stochastic → monoton deque'ler ile rolling min/max
+# - Kayan toplamlar periyodik olarak yeniden toplanır (float sürüklenmesine karşı)
+# - update() ısınma bitene kadar None döner; .value son değeri tutar
+
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from utils.config import CONFIG
+
+_RESYNC_EVERY = 1024
+
+
+class _RollingSum:
+    """Sabit pencereli kayan toplam (O(1) ekle/çıkar, periyodik tam toplam)."""
+
+    __slots__ = ("window", "buf", "total", "_n")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buf: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self._n = 0
+
+    def push(self, x: float):
+        if len(self.buf) == self.window:
+            self.total -= self.buf[0]
+        self.buf.append(x)
+        self.total += x
+        self._n += 1
+        if self._n % _RESYNC_EVERY == 0:
+            self.total = math.fsum(self.buf)
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) == self.window
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.window
+
+
+# -------------------------------------------------------------
+# Trend
+# -------------------------------------------------------------
+class EMA:
+    """pandas ewm(span=period, adjust=False).mean() ile birebir aynı güncelleme."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, period: Optional[int] = None):
+        period = period or CONFIG.TA.EMA_PERIOD
+        self.alpha = 2.0 / (period + 1.0)
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = float(x)
+        elif self.value != x:
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class MACD:
+    __slots__ = ("fast", "slow", "signal", "value")
+
+    def __init__(self, fast: Optional[int] = None, slow: Optional[int] = None, signal: Optional[int] = None):
+        self.fast = EMA(fast or CONFIG.TA.MACD_FAST)
+        self.slow = EMA(slow or CONFIG.TA.MACD_SLOW)
+        self.signal = EMA(signal or CONFIG.TA.MACD_SIGNAL)
+        self.value: Optional[Tuple[float, float, float]] = None
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        """(macd_line, signal_line, hist)"""
+        line = self.fast.update(close) - self.slow.update(close)
+        sig = self.signal.update(line)
+        self.value = (line, sig, line - sig)
+        return self.value
+
+
+# -------------------------------------------------------------
+# Momentum
+# -------------------------------------------------------------
+class RSI:
+    """
+    method="sma"   : ta_utils.rsi ile aynı (kazanç/kayıp rolling mean, ilk bar 0 kazanç/0 kayıp)
+    method="wilder": klasik Wilder RSI (ilk period ortalaması SMA, sonra 1/period üstel)
+    """
+
+    __slots__ = ("period", "method", "prev", "gain", "loss", "avg_gain", "avg_loss", "n", "value")
+
+    def __init__(self, period: Optional[int] = None, method: str = "sma"):
+        self.period = period or CONFIG.TA.RSI_PERIOD
+        self.method = method
+        self.prev: Optional[float] = None
+        self.gain = _RollingSum(self.period)
+        self.loss = _RollingSum(self.period)
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.n = 0
+        self.value: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        delta = 0.0 if self.prev is None else close - self.prev
+        self.prev = close
+        g = delta if delta > 0 else 0.0
+        lo = -delta if delta < 0 else 0.0
+        self.n += 1
+
+        if self.method == "wilder":
+            if self.n == 1:
+                return None
+            k = self.n - 1  # delta sayısı
+            if k <= self.period:
+                self.avg_gain += g / self.period
+                self.avg_loss += lo / self.period
+                if k < self.period:
+                    return None
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + g) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + lo) / self.period
+            rs = self.avg_gain / (self.avg_loss + 1e-12)
+        else:
+            self.gain.push(g)
+            self.loss.push(lo)
+            if not self.gain.full:
+                return None
+            rs = self.gain.mean / (self.loss.mean + 1e-12)
+
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class Stochastic:
+    """ta_utils.stochastic: %K rolling min/max (monoton deque), %D = %K'nın d_period SMA'sı."""
+
+    __slots__ = ("k_period", "d_period", "i", "highs", "lows", "k_sum", "value")
+
+    def __init__(self, k_period: Optional[int] = None, d_period: Optional[int] = None):
+        self.k_period = k_period or CONFIG.TA.STOCH_K
+        self.d_period = d_period or CONFIG.TA.STOCH_D
+        self.i = -1
+        self.highs: Deque[Tuple[int, float]] = deque()  # azalan (rolling max)
+        self.lows: Deque[Tuple[int, float]] = deque()   # artan (rolling min)
+        self.k_sum = _RollingSum(self.d_period)
+        self.value: Optional[Tuple[float, Optional[float]]] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[Tuple[float, Optional[float]]]:
+        self.i += 1
+        i = self.i
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((i, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((i, low))
+        start = i - self.k_period + 1
+        while self.highs[0][0] < start:
+            self.highs.popleft()
+        while self.lows[0][0] < start:
+            self.lows.popleft()
+        if start < 0:
+            return None
+        low_min = self.lows[0][1]
+        k = 100 * (close - low_min) / (self.highs[0][1] - low_min + 1e-12)
+        self.k_sum.push(k)
+        self.value = (k, self.k_sum.mean if self.k_sum.full else None)
+        return self.value
+
+
+class PermutationEntropy:
+    """ta_utils.rolling_permutation_entropy'nin canlı karşılığı: son window değerdeki desen sayıları."""
+
+    __slots__ = ("m", "n_patterns", "norm", "last", "codes", "counts", "value")
+
+    def __init__(self, window: int, m: int = 3):
+        self.m = m
+        self.n_patterns = window - m + 1
+        self.norm = math.log(math.factorial(m))
+        self.last: Deque[float] = deque(maxlen=m)
+        self.codes: Deque[int] = deque()
+        self.counts = [0] * math.factorial(m)
+        self.value: Optional[float] = None
+
+    def _code(self) -> int:
+        # np.argsort → Lehmer kodu (eşitliklerde ta_utils ile aynı sıralama için numpy)
+        perm = np.argsort(np.fromiter(self.last, dtype=float, count=self.m)).tolist()
+        code = 0
+        for i in range(self.m - 1):
+            smaller = sum(1 for p in perm[i + 1:] if p < perm[i])
+            code += smaller * math.factorial(self.m - 1 - i)
+        return code
+
+    def update(self, x: float) -> Optional[float]:
+        self.last.append(x)
+        if len(self.last) < self.m:
+            return None
+        code = self._code()
+        self.codes.append(code)
+        self.counts[code] += 1
+        if len(self.codes) > self.n_patterns:
+            self.counts[self.codes.popleft()] -= 1
+        if len(self.codes) < self.n_patterns:
+            return None
+        h = 0.0
+        for c in self.counts:
+            p = c / self.n_patterns
+            h -= p * math.log(p + 1e-12)
+        self.value = h / self.norm
+        return self.value
+
+
+# -------------------------------------------------------------
+# Volatilite
+# -------------------------------------------------------------
+class ATR:
+    """method="sma": ta_utils.atr (TR rolling mean); method="wilder": Wilder yumuşatması."""
+
+    __slots__ = ("period", "method", "prev_close", "tr", "n", "value")
+
+    def __init__(self, period: Optional[int] = None, method: str = "sma"):
+        self.period = period or CONFIG.TA.ATR_PERIOD
+        self.method = method
+        self.prev_close: Optional[float] = None
+        self.tr = _RollingSum(self.period)
+        self.n = 0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.n += 1
+        if self.method == "wilder" and self.value is not None:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+            return self.value
+        self.tr.push(tr)
+        if not self.tr.full:
+            return None
+        self.value = self.tr.mean
+        return self.value
+
+
+class Bollinger:
+    """ta_utils.bollinger_bands: (upper, sma, lower), std ddof=1."""
+
+    __slots__ = ("period", "k", "buf", "shift", "s1", "s2", "_n", "value")
+
+    def __init__(self, period: Optional[int] = None, k: Optional[float] = None):
+        self.period = period or CONFIG.TA.BB_PERIOD
+        self.k = CONFIG.TA.BB_STDDEV if k is None else k
+        self.buf: Deque[float] = deque(maxlen=self.period)
+        self.shift: Optional[float] = None  # iptal hatasını azaltmak için referans değer
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self._n = 0
+        self.value: Optional[Tuple[float, float, float]] = None
+
+    def update(self, close: float) -> Optional[Tuple[float, float, float]]:
+        if self.shift is None:
+            self.shift = close
+        if len(self.buf) == self.period:
+            old = self.buf[0] - self.shift
+            self.s1 -= old
+            self.s2 -= old * old
+        self.buf.append(close)
+        x = close - self.shift
+        self.s1 += x
+        self.s2 += x * x
+        self._n += 1
+        if self._n % _RESYNC_EVERY == 0:
+            # referansı pencere ortalamasına kaydır, toplamları tam hesapla
+            self.shift = math.fsum(self.buf) / len(self.buf)
+            self.s1 = math.fsum(v - self.shift for v in self.buf)
+            self.s2 = math.fsum((v - self.shift) ** 2 for v in self.buf)
+        if len(self.buf) < self.period:
+            return None
+        n = self.period
+        mean_x = self.s1 / n
+        var = max((self.s2 - n * mean_x * mean_x) / (n - 1), 0.0) if n > 1 else float("nan")
+        sma = self.shift + mean_x
+        std = math.sqrt(var)
+        self.value = (sma + self.k * std, sma, sma - self.k * std)
+        return self.value
+
+
+# -------------------------------------------------------------
+# Hacim
+# -------------------------------------------------------------
+class OBV:
+    """ta_utils.obv: sign(Δclose) · volume kümülatif (ilk bar 0)."""
+
+    __slots__ = ("prev", "value")
+
+    def __init__(self):
+        self.prev: Optional[float] = None
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        if self.prev is not None:
+            if close > self.prev:
+                self.value += volume
+            elif close < self.prev:
+                self.value -= volume
+        self.prev = close
+        return self.value
@@ -0,0 +1,163 @@
+# utils/ingest_process.py
+##♦️ ayrı process'te market-data ingest (StreamManager + decoder) → shared-memory ring
+# - Ingest process kendi event loop'unda WS frame'lerini decode eder ve ShmRing'e yazar
+# - Bot process ring'i poll eder; kapanan mumlar ve ticker'lar vektörel filtrelenir,
+#   sadece gereken kayıtlar Python seviyesine çıkar
+# - CONFIG.SYSTEM.INGEST_MODE="process" ile aktif olur (default "inline")
+
+import asyncio
+import logging
+import multiprocessing as mp
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from utils.config import CONFIG
+from utils.shm_ring import KIND_KLINE, KIND_TICKER, KIND_TRADE, ShmRing
+
+LOG = logging.getLogger("ingest_process")
+LOG.addHandler(logging.NullHandler())
+
+
+# -------------------------------------------------------------
+# Decoder (ingest process tarafı)
+# -------------------------------------------------------------
+def write_frame(ring: ShmRing, msg, sym_index: Dict[str, int]) -> bool:
+    """Combined-stream frame'ini normalize edip ring'e yazar. Tanınmayan frame → False."""
+    data = msg.get("data") if isinstance(msg, dict) and "data" in msg else msg
+    if not isinstance(data, dict):
+        return False
+    sym = sym_index.get(data.get("s"))
+    if sym is None:
+        return False
+    ev = data.get("e")
+    if ev == "kline":
+        k = data["k"]
+        ring.write(KIND_KLINE, sym, int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]),
+                   float(k["c"]), float(k["v"]), float(k.get("q", 0.0)), closed=1 if k.get("x") else 0)
+        return True
+    if ev in ("trade", "aggTrade"):
+        ring.write(KIND_TRADE, sym, int(data["T"]), close=float(data["p"]), volume=float(data["q"]),
+                   closed=1 if data.get("m") else 0)
+        return True
+    if ev in ("24hrTicker", "24hrMiniTicker"):
+        ring.write(KIND_TICKER, sym, int(data["E"]), float(data["o"]), float(data["h"]), float(data["l"]),
+                   float(data["c"]), float(data["v"]), float(data.get("q", 0.0)))
+        return True
+    return False
+
+
+async def _ingest_async(ring_name: str, symbols: List[str], streams: List[str]):
+    from utils.binance_api import BinanceClient
+    from utils.stream_manager import StreamManager
+
+    ring = ShmRing.attach(ring_name)
+    sym_index = {s.upper(): i for i, s in enumerate(symbols)}
+    client = BinanceClient()
+    stream_mgr = StreamManager(client, loop=asyncio.get_running_loop())
+
+    async def on_message(msg):
+        try:
+            write_frame(ring, msg, sym_index)
+        except Exception:
+            LOG.exception("ingest decode error")
+
+    stream_mgr.start_combined_groups(streams, on_message)
+    try:
+        await asyncio.gather(*stream_mgr.tasks)
+    finally:
+        stream_mgr.cancel_all()
+        ring.close()
+
+
+def _ingest_main(ring_name: str, symbols: List[str], streams: List[str]):
+    """Ingest process giriş noktası (spawn ile pickle edilebilir olmalı)."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    try:
+        asyncio.run(_ingest_async(ring_name, symbols, streams))
+    except KeyboardInterrupt:
+        pass
+
+
+# -------------------------------------------------------------
+# Bot process tarafı
+# -------------------------------------------------------------
+class IngestProcess:
+    """
+    Ingest process'i yönetir ve ring'i okur.
+    on_kline_close(symbol, record) : kapanan her mum için (record: RECORD_DTYPE void)
+    on_ticker(symbol, record)      : batch başına sembol başına son ticker
+    on_trades(symbols, view)       : trade kayıtları (ring.read() kopyasının view'ı; yazar ezemez)
+    """
+
+    def __init__(self, symbols: List[str], streams: List[str], capacity: Optional[int] = None):
+        self.symbols = [s.upper() for s in symbols]
+        self.streams = streams
+        self.capacity = capacity or CONFIG.SYSTEM.INGEST_RING_CAPACITY
+        self.ring: Optional[ShmRing] = None
+        self.process: Optional[mp.Process] = None
+        self._sym_arr = np.array(self.symbols, dtype=object)
+
+    def start(self):
+        self.ring = ShmRing.create(self.capacity)
+        ctx = mp.get_context("spawn")
+        self.process = ctx.Process(
+            target=_ingest_main,
+            args=(self.ring.name, self.symbols, self.streams),
+            name="md_ingest",
+            daemon=True,
+        )
+        self.process.start()
+        LOG.info("Ingest process started pid=%s ring=%s cap=%s", self.process.pid, self.ring.name, self.capacity)
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(timeout=5)
+            self.process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def _dispatch(self, view: np.ndarray, on_kline_close: Optional[Callable], on_ticker: Optional[Callable],
+                  on_trades: Optional[Callable]):
+        kind = view["kind"]
+        if on_kline_close is not None:
+            for idx in np.flatnonzero((kind == KIND_KLINE) & (view["closed"] == 1)):
+                rec = view[idx]
+                on_kline_close(self.symbols[rec["sym"]], rec)
+        if on_ticker is not None:
+            idx = np.flatnonzero(kind == KIND_TICKER)
+            if idx.size:
+                # sembol başına en son ticker
+                syms = view["sym"][idx]
+                _, last = np.unique(syms[::-1], return_index=True)
+                for i in idx[::-1][last]:
+                    rec = view[i]
+                    on_ticker(self.symbols[rec["sym"]], rec)
+        if on_trades is not None:
+            mask = kind == KIND_TRADE
+            if mask.any():
+                on_trades(self._sym_arr, view[mask])
+
+    async def consume(self, on_kline_close: Optional[Callable] = None, on_ticker: Optional[Callable] = None,
+                      on_trades: Optional[Callable] = None, poll_interval: float = 0.005, batch: int = 65536):
+        """Ring'i poll eden async döngü (bot event loop'unda task olarak çalışır)."""
+        dropped_logged = 0
+        while True:
+            views = self.ring.read(batch)
+            if not views:
+                if self.process is not None and not self.process.is_alive():
+                    LOG.error("Ingest process exited (code=%s)", self.process.exitcode)
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            for view in views:
+                try:
+                    self._dispatch(view, on_kline_close, on_ticker, on_trades)
+                except Exception:
+                    LOG.exception("ingest dispatch error")
+            if self.ring.dropped != dropped_logged:
+                LOG.warning("Ingest ring overrun: dropped=%s", self.ring.dropped)
+                dropped_logged = self.ring.dropped
+            await asyncio.sleep(0)
@@ -6,6 +6,7 @@ import time
 from typing import Dict, Any, List, Optional
 
 from utils.config import CONFIG  # ✅ config entegre
+from utils.depth_ladder import DepthLadder
 
 # ===============================
 # --- Yardımcı Hesaplamalar ---
@@ -60,10 +61,10 @@ def calc_liquidity_layers(order_book: Dict[str, Any], price: float, pct_levels=N
         pct_levels = [0.01, 0.02, 0.05]
     layers = {}
     try:
+        # defter bir kez parse edilir; her bant prefix toplamlarından binary search ile
+        ladder = DepthLadder.from_order_book(order_book)
         for p in pct_levels:
-            bid_layer = sum(float(b[1]) for b in order_book.get("bids", []) if float(b[0]) >= price * (1 - p))
-            ask_layer = sum(float(a[1]) for a in order_book.get("asks", []) if float(a[0]) <= price * (1 + p))
-            layers[f"layer_{int(p*100)}"] = {"bids": bid_layer, "asks": ask_layer}
+            layers[f"layer_{int(p*100)}"] = ladder.band_liquidity(price, p)
     except Exception:
         pass
     return layers
@@ -0,0 +1,148 @@
+# utils/liquidation_stream.py
+##♦️ futures !forceOrder@arr tüketici + likidasyon notional toplayıcı
+# - Sembol × taraf için 1 dakikalık bucket'lar (sabit boyutlu ring, 1440 dk = 1 gün)
+# - Her zaman dilimi (CONFIG.IO.CASHFLOW_TIMEFRAMES: 15m..1d) için kayan toplam tutulur
+#   → sorgu O(1); dakika ilerledikçe pencereden çıkan bucket toplamlardan düşülür
+# - io_handler._fetch_symbol_pack bu veriyi build_io_snapshot(liquidations=...) için kullanır
+
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("liquidation_stream")
+LOG.addHandler(logging.NullHandler())
+
+N_BUCKETS = 1440  # dakika
+SIDE_LONG = 0     # SELL emri → long pozisyon likide oldu
+SIDE_SHORT = 1    # BUY emri  → short pozisyon likide oldu
+
+
+class LiquidationAggregator:
+    def __init__(self, capacity: int = 512, windows: Optional[Dict[str, int]] = None):
+        self.windows: Dict[str, int] = dict(windows or CONFIG.IO.CASHFLOW_TIMEFRAMES)
+        self._win_minutes = np.array(list(self.windows.values()), dtype=np.int64)
+        self._win_pos = {m: i for i, m in enumerate(self._win_minutes.tolist())}
+        if self._win_minutes.max() > N_BUCKETS:
+            raise ValueError(f"window > {N_BUCKETS} minutes not supported")
+        self.capacity = capacity
+        self.index: Dict[str, int] = {}
+        self.buckets = np.zeros((capacity, 2, N_BUCKETS))
+        self.sums = np.zeros((capacity, 2, len(self._win_minutes)))
+        self.last_min = np.zeros(capacity, dtype=np.int64)
+        self.running = False
+        self.events = 0
+
+    # ---------------------------------------------------------
+    # İç yardımcılar
+    # ---------------------------------------------------------
+    def _slot(self, symbol: str, now_min: int) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.index)
+            if i >= self.capacity:
+                self._grow()
+            self.index[symbol] = i
+            self.last_min[i] = now_min
+        return i
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("buckets", "sums"):
+            arr = getattr(self, name)
+            grown = np.zeros((cap,) + arr.shape[1:])
+            grown[:self.capacity] = arr
+            setattr(self, name, grown)
+        lm = np.zeros(cap, dtype=np.int64)
+        lm[:self.capacity] = self.last_min
+        self.last_min = lm
+        self.capacity = cap
+
+    def _advance(self, i: int, now_min: int):
+        last = int(self.last_min[i])
+        if now_min <= last:
+            return
+        if now_min - last >= N_BUCKETS:
+            self.buckets[i] = 0.0
+            self.sums[i] = 0.0
+        else:
+            b = self.buckets[i]
+            s = self.sums[i]
+            for m in range(last + 1, now_min + 1):
+                # pencereden çıkan dakika (m - w) toplamlardan düşülür, sonra m bucket'ı sıfırlanır
+                s -= b[:, (m - self._win_minutes) % N_BUCKETS]
+                b[:, m % N_BUCKETS] = 0.0
+            np.maximum(s, 0.0, out=s)  # float sürüklenmesine karşı
+        self.last_min[i] = now_min
+
+    # ---------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------
+    def add(self, symbol: str, side: int, notional: float, ts_ms: Optional[int] = None):
+        now_min = int((ts_ms if ts_ms is not None else time.time() * 1000) // 60000)
+        i = self._slot(symbol, now_min)
+        self._advance(i, now_min)
+        self.buckets[i, side, now_min % N_BUCKETS] += notional
+        self.sums[i, side] += notional
+        self.events += 1
+
+    async def handle_message(self, msg):
+        """ws_subscribe callback: !forceOrder@arr (raw veya combined)."""
+        try:
+            data = msg.get("data", msg) if isinstance(msg, dict) else msg
+            o = data.get("o") or {}
+            qty = float(o.get("z") or o.get("q") or 0.0)
+            price = float(o.get("ap") or o.get("p") or 0.0)
+            side = SIDE_LONG if o.get("S") == "SELL" else SIDE_SHORT
+            self.add(o["s"], side, qty * price, int(o.get("T") or data.get("E") or time.time() * 1000))
+        except Exception:
+            LOG.exception("forceOrder parse error")
+
+    # ---------------------------------------------------------
+    # Okuma (O(1))
+    # ---------------------------------------------------------
+    def notional(self, symbol: str, window_min: int = 15, side: Optional[int] = None) -> Optional[float]:
+        """
+        Son window_min dakikadaki likidasyon notional'ı (USD).
+        side: None → iki taraf toplamı, SIDE_LONG / SIDE_SHORT → tek taraf
+        Sembol hiç görülmediyse 0.0; takip edilmeyen pencere için bucket toplamına düşer.
+        """
+        i = self.index.get(symbol.upper())
+        if i is None:
+            return 0.0
+        now_min = int(time.time() // 60)
+        self._advance(i, now_min)
+        pos = self._win_pos.get(window_min)
+        if pos is not None:
+            vals = self.sums[i, :, pos]
+        else:
+            w = min(int(window_min), N_BUCKETS)
+            cols = (now_min - np.arange(w)) % N_BUCKETS
+            vals = self.buckets[i][:, cols].sum(axis=1)
+        return float(vals.sum() if side is None else vals[side])
+
+    def summary(self, symbol: str) -> Dict[str, Dict[str, float]]:
+        """Tüm zaman dilimleri için {"15m": {"long": x, "short": y}, ...}"""
+        out: Dict[str, Dict[str, float]] = {}
+        for label, minutes in self.windows.items():
+            out[label] = {
+                "long": self.notional(symbol, minutes, SIDE_LONG),
+                "short": self.notional(symbol, minutes, SIDE_SHORT),
+            }
+        return out
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_aggregator: Optional[LiquidationAggregator] = None
+
+
+def get_liquidation_aggregator() -> LiquidationAggregator:
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = LiquidationAggregator()
+    return _aggregator
@@ -0,0 +1,247 @@
+# utils/liquidity_heatmap.py
+##♦️ uzun dönem likidite heatmap deposu
+# - Sembol başına periyodik örnek: mid + her taraf için ±bant (CONFIG.IO.HEATMAP_BANDS) içindeki notional
+#   + defterin ulaştığı mesafe (reach; bant reach'ten genişse o bant eksik ölçülmüştür)
+# - Sütun bazlı, float32, append-only ring'ler; zaman damgaları delta kodlu (uint32 ms, önceki örneğe göre)
+# - Downsampling katmanları: ham (24s) → 1 dk ortalama (7g) → 15 dk ortalama (90g)
+# - query(symbol, start_ms, end_ms): aralığı kapsayan en ince katmandan sütunlar
+# - Sembol başına 24 saatlik ham seri (5 sn) ≈ 0.8 MB
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.config import CONFIG
+from utils.depth_ladder import DepthLadder
+
+LOG = logging.getLogger("liquidity_heatmap")
+LOG.addHandler(logging.NullHandler())
+
+# (çözünürlük sn, saklama sn); ilk katmanın çözünürlüğü örnekleme aralığıdır
+TIERS: Tuple[Tuple[int, int], ...] = ((0, 24 * 3600), (60, 7 * 24 * 3600), (900, 90 * 24 * 3600))
+
+
+def column_names(bands: Sequence[float]) -> List[str]:
+    cols = ["mid"]
+    for side in ("bid", "ask"):
+        cols += [f"{side}_{b * 100:g}" for b in bands]
+    return cols + ["reach_bid", "reach_ask"]
+
+
+class _Tier:
+    """Tek çözünürlük katmanı: float32 sütun ring'i + delta kodlu zaman damgaları."""
+
+    def __init__(self, capacity: int, n_cols: int):
+        self.capacity = capacity
+        self.values = np.zeros((capacity, n_cols), dtype=np.float32)
+        self.deltas = np.zeros(capacity, dtype=np.uint32)   # ms, önceki örneğe göre
+        self.head = 0          # bir sonraki yazılacak hücre
+        self.count = 0
+        self.base_ms = 0       # en eski örneğin mutlak zamanı
+        self.last_ms = 0       # en yeni örneğin mutlak zamanı
+
+    def append(self, ts_ms: int, row: np.ndarray):
+        first = self.count == 0
+        delta = 0 if first else min(max(ts_ms - self.last_ms, 0), 0xFFFFFFFF)
+        self.last_ms = ts_ms if first else self.last_ms + delta
+        if self.count == self.capacity:
+            # en eski örnek düşer → taban, yeni en eskinin delta'sı kadar ilerler
+            self.base_ms = self.last_ms if self.capacity == 1 else self.base_ms + int(self.deltas[(self.head + 1) % self.capacity])
+        else:
+            if first:
+                self.base_ms = ts_ms
+            self.count += 1
+        self.values[self.head] = row
+        self.deltas[self.head] = delta
+        self.head = (self.head + 1) % self.capacity
+
+    def _order(self) -> np.ndarray:
+        start = (self.head - self.count) % self.capacity
+        return (start + np.arange(self.count)) % self.capacity
+
+    def timestamps(self, order: Optional[np.ndarray] = None) -> np.ndarray:
+        order = self._order() if order is None else order
+        if not self.count:
+            return np.empty(0, dtype=np.int64)
+        d = self.deltas[order].astype(np.int64)
+        d[0] = 0
+        return self.base_ms + np.cumsum(d)
+
+    def slice(self, start_ms: Optional[int], end_ms: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        order = self._order()
+        ts = self.timestamps(order)
+        lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, side="left"))
+        hi = ts.size if end_ms is None else int(np.searchsorted(ts, end_ms, side="right"))
+        return ts[lo:hi], self.values[order[lo:hi]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.deltas.nbytes
+
+
+class _SymbolSeries:
+    def __init__(self, n_cols: int, sample_sec: int):
+        self.tiers: List[_Tier] = []
+        self.resolutions: List[int] = []
+        for res, keep in TIERS:
+            res = res or sample_sec
+            self.resolutions.append(res)
+            self.tiers.append(_Tier(max(1, keep // res), n_cols))
+        # üst katmanlar için açık bucket'lar: (bucket_start_ms, toplam, sayı)
+        self._acc = [[None, np.zeros(n_cols, dtype=np.float64), 0] for _ in TIERS[1:]]
+
+    def append(self, ts_ms: int, row: np.ndarray):
+        self.tiers[0].append(ts_ms, row)
+        self._cascade(1, ts_ms, row)
+
+    def _cascade(self, level: int, ts_ms: int, row: np.ndarray):
+        if level >= len(self.tiers):
+            return
+        acc = self._acc[level - 1]
+        res_ms = self.resolutions[level] * 1000
+        bucket = ts_ms - ts_ms % res_ms
+        if acc[0] is not None and bucket != acc[0]:
+            mean = (acc[1] / acc[2]).astype(np.float32)
+            self.tiers[level].append(acc[0], mean)
+            self._cascade(level + 1, acc[0], mean)
+            acc[1][:] = 0.0
+            acc[2] = 0
+        acc[0] = bucket
+        acc[1] += row
+        acc[2] += 1
+
+
+class LiquidityHeatmapStore:
+    def __init__(self, bands: Optional[Sequence[float]] = None, sample_sec: Optional[int] = None):
+        self.bands = list(bands or CONFIG.IO.HEATMAP_BANDS)
+        self.sample_sec = int(sample_sec or CONFIG.IO.HEATMAP_SAMPLE_SEC)
+        self.columns = column_names(self.bands)
+        self.series: Dict[str, _SymbolSeries] = {}
+
+    # ---------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------
+    def add_sample(self, symbol: str, order_book: Dict, ts_ms: Optional[int] = None):
+        ladder = DepthLadder.from_order_book(order_book)
+        mid = ladder.mid
+        row = np.empty(len(self.columns), dtype=np.float32)
+        row[0] = mid
+        nb = len(self.bands)
+        for j, b in enumerate(self.bands):
+            band = ladder.band_liquidity(mid, b, notional=True)
+            row[1 + j] = band["bids"]
+            row[1 + nb + j] = band["asks"]
+        row[-2], row[-1] = ladder.reach()
+        self.append(symbol, row, ts_ms)
+
+    def append(self, symbol: str, row: np.ndarray, ts_ms: Optional[int] = None):
+        ser = self.series.get(symbol)
+        if ser is None:
+            ser = self.series[symbol] = _SymbolSeries(len(self.columns), self.sample_sec)
+        ser.append(int(ts_ms if ts_ms is not None else time.time() * 1000), row)
+
+    # ---------------------------------------------------------
+    # Okuma
+    # ---------------------------------------------------------
+    def query(self, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+              tier: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        {"ts": int64 ms, "<kolon>": float32, ..., "tier": katman} — tier verilmezse start_ms'i
+        hâlâ kapsayan en ince katman seçilir (start_ms yok → ham katman).
+        """
+        ser = self.series.get(symbol.upper())
+        if ser is None:
+            return {"ts": np.empty(0, dtype=np.int64), "tier": -1}
+        if tier is None:
+            tier = 0
+            if start_ms is not None:
+                covering = [k for k, t in enumerate(ser.tiers) if t.count and t.base_ms <= start_ms]
+                with_data = [k for k, t in enumerate(ser.tiers) if t.count]
+                tier = covering[0] if covering else (with_data[-1] if with_data else 0)
+        ts, vals = ser.tiers[tier].slice(start_ms, end_ms)
+        out: Dict[str, np.ndarray] = {"ts": ts, "tier": tier}
+        for k, name in enumerate(self.columns):
+            out[name] = vals[:, k]
+        return out
+
+    def latest(self, symbol: str) -> Optional[Dict[str, float]]:
+        ser = self.series.get(symbol.upper())
+        if ser is None or not ser.tiers[0].count:
+            return None
+        t = ser.tiers[0]
+        row = t.values[(t.head - 1) % t.capacity]
+        out = {name: float(row[k]) for k, name in enumerate(self.columns)}
+        out["ts"] = t.last_ms
+        return out
+
+    def memory_bytes(self, symbol: Optional[str] = None) -> int:
+        sers = [self.series[symbol.upper()]] if symbol else self.series.values()
+        return sum(t.nbytes for ser in sers for t in ser.tiers)
+
+    # ---------------------------------------------------------
+    # Kalıcılık (npz, sembol başına)
+    # ---------------------------------------------------------
+    def save(self, directory: Optional[str] = None):
+        directory = directory or CONFIG.IO.HEATMAP_DIR
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        for sym, ser in self.series.items():
+            arrays = {"columns": np.array(self.columns)}
+            for k, t in enumerate(ser.tiers):
+                ts, vals = t.slice(None, None)
+                arrays[f"ts{k}"] = ts
+                arrays[f"v{k}"] = vals
+            np.savez_compressed(os.path.join(directory, f"{sym}.npz"), **arrays)
+        LOG.info("Heatmap saved: %d symbols → %s", len(self.series), directory)
+
+    def load(self, directory: Optional[str] = None):
+        directory = directory or CONFIG.IO.HEATMAP_DIR
+        if not directory or not os.path.isdir(directory):
+            return
+        for fn in sorted(os.listdir(directory)):
+            if not fn.endswith(".npz"):
+                continue
+            with np.load(os.path.join(directory, fn)) as z:
+                if list(z["columns"]) != self.columns:
+                    LOG.warning("Heatmap %s: band config changed, skipped", fn)
+                    continue
+                ser = self.series[fn[:-4]] = _SymbolSeries(len(self.columns), self.sample_sec)
+                for k, t in enumerate(ser.tiers):
+                    for ts, row in zip(z[f"ts{k}"], z[f"v{k}"]):
+                        t.append(int(ts), row)
+
+    # ---------------------------------------------------------
+    # Örnekleyici (REST depth; 20 seviyelik partial book ±5% bandına yetmez)
+    # ---------------------------------------------------------
+    async def run_sampler(self, client, symbols: Sequence[str], depth_limit: Optional[int] = None):
+        depth_limit = depth_limit or CONFIG.IO.HEATMAP_DEPTH_LIMIT
+
+        async def one(sym):
+            try:
+                ob = await client.get_order_book(sym, depth_limit)
+                self.add_sample(sym.upper(), ob)
+            except Exception:
+                LOG.exception("heatmap sample failed: %s", sym)
+
+        while True:
+            t0 = time.monotonic()
+            await asyncio.gather(*(one(s) for s in symbols))
+            await asyncio.sleep(max(0.0, self.sample_sec - (time.monotonic() - t0)))
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_store: Optional[LiquidityHeatmapStore] = None
+
+
+def get_heatmap_store() -> LiquidityHeatmapStore:
+    global _store
+    if _store is None:
+        _store = LiquidityHeatmapStore()
+    return _store
@@ -0,0 +1,187 @@
+# utils/market_recorder.py
+##♦️ ham market-data kaydı (gzip segment + rotasyon) ve hızlandırılmış replay
+# - MarketRecorder: ws_subscribe içindeki ham combined-stream frame'lerini alış zamanı ile yazar
+#   satır formatı: "<recv_ts_ns>\t<raw json>\n" (gzip, segment başına boyut/süre limiti)
+#   Yazma işi ayrı bir thread'de yapılır, event loop sadece kuyruğa ekler.
+# - MarketReplayer: segmentleri aynı dispatch yoluna (bridge) 1x, Nx veya max hızda geri besler
+
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("market_recorder")
+LOG.addHandler(logging.NullHandler())
+
+SEGMENT_PREFIX = "md_"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class MarketRecorder:
+    """
+    Ham WS frame'lerini sıkıştırılmış, döndürülen (rotated) segment dosyalarına yazar.
+    tap(raw) event loop'tan çağrılır ve bloklamaz.
+    """
+
+    def __init__(self, directory: Optional[str] = None, segment_max_bytes: Optional[int] = None,
+                 segment_max_seconds: Optional[int] = None, queue_size: int = 100_000):
+        self.directory = directory or CONFIG.RECORDER.DIR
+        self.segment_max_bytes = segment_max_bytes or CONFIG.RECORDER.SEGMENT_MAX_BYTES
+        self.segment_max_seconds = segment_max_seconds or CONFIG.RECORDER.SEGMENT_MAX_SECONDS
+        self._queue: "queue.Queue[Optional[Tuple[int, str]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._fh = None
+        self._raw_fh = None
+        self._segment_started = 0.0
+        self.frames = 0
+        self.dropped = 0
+
+    # ---------------------------------------------------------
+    # Tap (ws_subscribe raw_tap)
+    # ---------------------------------------------------------
+    def tap(self, raw, recv_ts_ns: Optional[int] = None):
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        try:
+            self._queue.put_nowait((recv_ts_ns or time.time_ns(), raw))
+        except queue.Full:
+            self.dropped += 1
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="market_recorder", daemon=True)
+        self._thread.start()
+        LOG.info("Market recorder started: %s", self.directory)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._thread = None
+        LOG.info("Market recorder stopped. frames=%s dropped=%s", self.frames, self.dropped)
+
+    # ---------------------------------------------------------
+    # Writer thread
+    # ---------------------------------------------------------
+    def _open_segment(self):
+        self._close_segment()
+        name = f"{SEGMENT_PREFIX}{time.strftime('%Y%m%d_%H%M%S')}_{time.time_ns() % 1_000_000_000:09d}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        self._raw_fh = open(path, "wb")
+        self._fh = gzip.GzipFile(fileobj=self._raw_fh, mode="wb", compresslevel=6)
+        self._segment_started = time.time()
+        LOG.info("Recording segment: %s", path)
+
+    def _close_segment(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._raw_fh.close()
+            self._fh = None
+            self._raw_fh = None
+
+    def _needs_rotation(self) -> bool:
+        if self._fh is None:
+            return True
+        if self._raw_fh.tell() >= self.segment_max_bytes:
+            return True
+        return time.time() - self._segment_started >= self.segment_max_seconds
+
+    def _writer(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if self._needs_rotation():
+                    self._open_segment()
+                ts_ns, raw = item
+                self._fh.write(f"{ts_ns}\t{raw}\n".encode("utf-8"))
+                self.frames += 1
+        except Exception:
+            LOG.exception("market recorder writer error")
+        finally:
+            self._close_segment()
+
+
+# -------------------------------------------------------------
+# Replay
+# -------------------------------------------------------------
+def list_segments(path: str) -> List[str]:
+    """Dosya veya klasör → sıralı segment listesi."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+    return [path]
+
+
+def iter_frames(path: str) -> Iterator[Tuple[int, str]]:
+    """(recv_ts_ns, raw) çiftlerini kayıt sırasıyla döndürür."""
+    for seg in list_segments(path):
+        with gzip.open(seg, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                ts, _, raw = line.rstrip("\n").partition("\t")
+                if raw:
+                    yield int(ts), raw
+
+
+class MarketReplayer:
+    """
+    Kayıtlı frame'leri aynı callback'e (örn. main.bridge) geri besler.
+    speed: 1.0 → gerçek zaman, N → N kat hızlı, 0/None → bekleme yok (max hız)
+    """
+
+    def __init__(self, path: Optional[str] = None, speed: Optional[float] = None):
+        self.path = path or CONFIG.RECORDER.REPLAY_PATH
+        self.speed = CONFIG.RECORDER.REPLAY_SPEED if speed is None else speed
+        self.frames = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    async def run(self, callback: Callable) -> Dict[str, float]:
+        LOG.info("Replay started: %s (speed=%s)", self.path, self.speed or "max")
+        t_start = time.perf_counter()
+        first_ts: Optional[int] = None
+        for ts_ns, raw in iter_frames(self.path):
+            if self.speed and self.speed > 0:
+                if first_ts is None:
+                    first_ts = ts_ns
+                due = (ts_ns - first_ts) / 1e9 / self.speed
+                delay = due - (time.perf_counter() - t_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                await callback(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                LOG.exception("replay callback error")
+            self.frames += 1
+            # max hızda diğer task'lara (kline_processor vb.) nefes aldır
+            if not self.speed and self.frames % 256 == 0:
+                await asyncio.sleep(0)
+        self.elapsed = time.perf_counter() - t_start
+        stats = self.stats()
+        LOG.info("Replay finished: %s", stats)
+        return stats
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames": self.frames,
+            "errors": self.errors,
+            "elapsed_sec": round(self.elapsed, 3),
+            "frames_per_sec": round(self.frames / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,201 @@
+# utils/microstructure.py
+##♦️ order book mikro yapı feature motoru (her defter değişiminde artımlı güncellenir)
+# - microprice, L1 ve çok seviyeli (CONFIG.BINANCE.MICRO_LEVELS) queue imbalance
+# - order-flow imbalance (OFI, best seviye değişimlerinden — Cont/Kukanov/Stoikov tanımı)
+# - derinlik eğimi (kümülatif miktar ~ mid'e uzaklık (bps), her taraf için)
+# - spread (bps) zaman serisi
+# - Sembol başına önceden ayrılmış ring dizileri (sembol × geçmiş × feature), güncellemede allocation yok
+# - Kaynak: @depth20@100ms partial snapshot'ları (update) veya @bookTicker (update_top)
+
+import logging
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("microstructure")
+LOG.addHandler(logging.NullHandler())
+
+FEATURES = ("ts", "mid", "microprice", "spread_bps", "imb_l1", "imb_multi", "ofi", "slope_bid", "slope_ask")
+F = {name: i for i, name in enumerate(FEATURES)}
+
+
+def _as_levels(side) -> np.ndarray:
+    """[[price, qty], ...] (str veya float) → (n, 2) float64."""
+    if isinstance(side, np.ndarray) and side.dtype == np.float64:
+        return side
+    return np.asarray(side, dtype=np.float64).reshape(-1, 2)
+
+
+def _depth_slope(levels: np.ndarray, mid: float) -> float:
+    """Kümülatif miktarın mid'e uzaklığa (bps) göre OLS eğimi; seviye < 2 → NaN."""
+    if levels.shape[0] < 2 or mid <= 0:
+        return np.nan
+    dist = np.abs(levels[:, 0] - mid) / mid * 1e4
+    cum = np.cumsum(levels[:, 1])
+    dc = dist - dist.mean()
+    var = float(dc @ dc)
+    return float(dc @ (cum - cum.mean()) / var) if var > 0 else np.nan
+
+
+class MicrostructureEngine:
+    def __init__(self, capacity: int = 64, history: Optional[int] = None, levels: Optional[int] = None):
+        self.capacity = capacity
+        self.history = int(history or CONFIG.BINANCE.MICRO_HISTORY)
+        self.levels = int(levels or CONFIG.BINANCE.MICRO_LEVELS)
+        self.index: Dict[str, int] = {}
+        self.data = np.full((capacity, self.history, len(FEATURES)), np.nan)
+        self.head = np.zeros(capacity, dtype=np.int64)   # bir sonraki yazılacak hücre
+        self.count = np.zeros(capacity, dtype=np.int64)
+        # OFI için önceki best seviye: bid_px, bid_qty, ask_px, ask_qty
+        self.prev_top = np.full((capacity, 4), np.nan)
+        self.updates = 0
+
+    # ---------------------------------------------------------
+    # İç yardımcılar
+    # ---------------------------------------------------------
+    def _slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.index)
+            if i >= self.capacity:
+                self._grow()
+            self.index[symbol] = i
+        return i
+
+    def _grow(self):
+        cap = self.capacity * 2
+        data = np.full((cap,) + self.data.shape[1:], np.nan)
+        data[:self.capacity] = self.data
+        self.data = data
+        for name, fill in (("head", 0), ("count", 0)):
+            arr = np.zeros(cap, dtype=np.int64)
+            arr[:self.capacity] = getattr(self, name)
+            setattr(self, name, arr)
+        top = np.full((cap, 4), np.nan)
+        top[:self.capacity] = self.prev_top
+        self.prev_top = top
+        self.capacity = cap
+
+    def _ofi(self, i: int, bp: float, bq: float, ap: float, aq: float) -> float:
+        pbp, pbq, pap, paq = self.prev_top[i]
+        self.prev_top[i] = (bp, bq, ap, aq)
+        if np.isnan(pbp):
+            return 0.0
+        e = 0.0
+        if bp >= pbp:
+            e += bq
+        if bp <= pbp:
+            e -= pbq
+        if ap <= pap:
+            e -= aq
+        if ap >= pap:
+            e += paq
+        return e
+
+    def _write(self, i: int, row: Sequence[float]):
+        h = self.head[i]
+        self.data[i, h] = row
+        self.head[i] = (h + 1) % self.history
+        if self.count[i] < self.history:
+            self.count[i] += 1
+        self.updates += 1
+
+    # ---------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------
+    def update(self, symbol: str, bids, asks, ts_ms: Optional[int] = None):
+        """Partial depth snapshot'ı (en iyi seviye ilk sırada)."""
+        b = _as_levels(bids)
+        a = _as_levels(asks)
+        if not b.shape[0] or not a.shape[0]:
+            return
+        i = self._slot(symbol)
+        bp, bq = b[0]
+        ap, aq = a[0]
+        mid = (bp + ap) / 2
+        n = min(self.levels, b.shape[0], a.shape[0])
+        bsum = b[:n, 1].sum()
+        asum = a[:n, 1].sum()
+        self._write(i, (
+            ts_ms if ts_ms is not None else time.time() * 1000,
+            mid,
+            (ap * bq + bp * aq) / (bq + aq) if bq + aq > 0 else mid,
+            (ap - bp) / mid * 1e4 if mid > 0 else np.nan,
+            (bq - aq) / (bq + aq) if bq + aq > 0 else 0.0,
+            (bsum - asum) / (bsum + asum) if bsum + asum > 0 else 0.0,
+            self._ofi(i, bp, bq, ap, aq),
+            _depth_slope(b, mid),
+            _depth_slope(a, mid),
+        ))
+
+    def update_top(self, symbol: str, bid: float, bid_qty: float, ask: float, ask_qty: float,
+                   ts_ms: Optional[int] = None):
+        """bookTicker: sadece best seviye (çok seviyeli imbalance = L1, eğim NaN)."""
+        i = self._slot(symbol)
+        mid = (bid + ask) / 2
+        imb = (bid_qty - ask_qty) / (bid_qty + ask_qty) if bid_qty + ask_qty > 0 else 0.0
+        self._write(i, (
+            ts_ms if ts_ms is not None else time.time() * 1000,
+            mid,
+            (ask * bid_qty + bid * ask_qty) / (bid_qty + ask_qty) if bid_qty + ask_qty > 0 else mid,
+            (ask - bid) / mid * 1e4 if mid > 0 else np.nan,
+            imb,
+            imb,
+            self._ofi(i, bid, bid_qty, ask, ask_qty),
+            np.nan,
+            np.nan,
+        ))
+
+    async def handle_message(self, msg):
+        """ws callback: combined <symbol>@depth20@100ms (spot partial depth'te "s" yok → stream adından)."""
+        try:
+            stream = msg.get("stream", "") if isinstance(msg, dict) else ""
+            data = msg.get("data", msg) if isinstance(msg, dict) else msg
+            symbol = (data.get("s") or stream.split("@", 1)[0]).upper()
+            self.update(symbol, data.get("bids") or data.get("b"), data.get("asks") or data.get("a"), data.get("E"))
+        except Exception:
+            LOG.exception("microstructure update error")
+
+    # ---------------------------------------------------------
+    # Okuma
+    # ---------------------------------------------------------
+    def latest(self, symbol: str) -> Optional[Dict[str, float]]:
+        i = self.index.get(symbol.upper())
+        if i is None or not self.count[i]:
+            return None
+        row = self.data[i, (self.head[i] - 1) % self.history]
+        return {name: float(row[k]) for name, k in F.items()}
+
+    def series(self, symbol: str, feature: str, n: Optional[int] = None) -> np.ndarray:
+        """Kronolojik sırada son n değer (kopya)."""
+        i = self.index.get(symbol.upper())
+        if i is None:
+            return np.empty(0)
+        cnt = int(self.count[i])
+        n = cnt if n is None else min(int(n), cnt)
+        idx = (self.head[i] - n + np.arange(n)) % self.history
+        return self.data[i, idx, F[feature]].copy()
+
+    def ofi_sum(self, symbol: str, window_ms: float) -> float:
+        """Son window_ms içindeki kümülatif OFI."""
+        ts = self.series(symbol, "ts")
+        if not ts.size:
+            return 0.0
+        ofi = self.series(symbol, "ofi")
+        return float(np.nansum(ofi[ts >= ts[-1] - window_ms]))
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_engine: Optional[MicrostructureEngine] = None
+
+
+def get_microstructure_engine() -> MicrostructureEngine:
+    global _engine
+    if _engine is None:
+        _engine = MicrostructureEngine()
+    return _engine
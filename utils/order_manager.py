@@ -12,18 +12,26 @@ LOG.addHandler(logging.NullHandler())
 PAPER_MODE = os.getenv("PAPER_MODE", "true").lower() in ("1","true","yes")
 
 class OrderManager:
-    def __init__(self, api_module=binance_api, risk_per_trade: float = 0.01, leverage: int = 1, paper_mode: Optional[bool] = None):
+    def __init__(self, api_module=binance_api, risk_per_trade: float = 0.01, leverage: int = 1, paper_mode: Optional[bool] = None,
+                 account_state=None, risk_manager=None):
         self.api = api_module
         self.risk_per_trade = risk_per_trade
         self.leverage = leverage
         self.paper_mode = PAPER_MODE if paper_mode is None else paper_mode
         self._exchange_info = None
+        # user data stream ile senkron hesap durumu (varsa bakiye REST'e gitmez)
+        self.account_state = account_state
+        self.risk_manager = risk_manager
 
     async def init_exchange_info(self):
         if self._exchange_info is None:
             self._exchange_info = await self.api.exchange_info()
 
     async def get_futures_balance(self) -> Optional[float]:
+        if self.account_state is not None and self.account_state.synced:
+            bal = self.account_state.wallet_balance
+            if bal is not None:
+                return bal
         try:
             acc = await self.api.get_futures_account()
             return float(acc.get("totalWalletBalance", 0))
@@ -31,6 +39,20 @@ class OrderManager:
             LOG.warning("get_futures_balance failed: %s", e)
             return None
 
+    async def get_price(self, symbol: str) -> Optional[float]:
+        # futures emri futures mark price ile boyutlanır (spot miniTicker tablosu değil):
+        # önce user stream yanındaki !markPrice@arr akışı (lokal), yoksa / bayatsa REST
+        if self.account_state is not None:
+            mark = self.account_state.mark_price(symbol)
+            if mark is not None:
+                return mark
+        api = self.api if hasattr(self.api, "futures_mark_price") else binance_api.get_binance_api()
+        try:
+            return await api.futures_mark_price(symbol)
+        except Exception as e:
+            LOG.warning("get_price failed: %s", e)
+            return None
+
     async def calc_futures_qty(self, balance_usdt: float, entry_price: float, risk_pct: Optional[float] = None, leverage: Optional[int] = None) -> float:
         if risk_pct is None:
             risk_pct = self.risk_per_trade
@@ -61,10 +83,15 @@ class OrderManager:
             return {"ok": False, "error": "no_balance"}
         base_risk = self.risk_per_trade
         scaled_risk = min(0.5, base_risk * (0.5 + strength))
-        price = await self.api.get_price(symbol)
+        price = await self.get_price(symbol)
         if price is None:
             return {"ok": False, "error": "no_price"}
         qty = await self.calc_futures_qty(balance, price, risk_pct=scaled_risk)
+        if self.risk_manager is not None:
+            allowed, why = self.risk_manager.allow_trade(balance, qty * price)
+            if not allowed:
+                LOG.warning("Risk check blocked %s %s: %s", dec, symbol, why)
+                return {"ok": False, "error": "risk_blocked", "reason": why}
         result = await self.place_futures_market(symbol, dec, qty)
         LOG.info("Executed %s %s qty=%s result=%s", dec, symbol, qty, result)
         return {"ok": True, "result": result}
@@ -3,7 +3,8 @@
 
 import time
 import os
-from utils.config import RISK_MAX_DAILY_LOSS, DB_PATH
+from utils.config import CONFIG
+from utils.db import DB_PATH
 import sqlite3
 
 class RiskManager:
@@ -12,12 +13,17 @@ class RiskManager:
     - daily loss tracking using paper_trades table (only approximate).
     - per-trade max notional limit.
     - cool-off on exceeding daily loss threshold.
+    - account_state verilirse (user data stream) günlük PnL fill'lerden lokal okunur.
     """
-    def __init__(self, db_path=DB_PATH, max_daily_loss=RISK_MAX_DAILY_LOSS):
+    def __init__(self, db_path=DB_PATH, max_daily_loss=None, account_state=None):
         self.db = db_path
-        self.max_daily_loss = max_daily_loss
+        self.max_daily_loss = CONFIG.BOT.RISK_MAX_DAILY_LOSS if max_daily_loss is None else max_daily_loss
+        self.account_state = account_state
 
     def _get_today_pl(self):
+        if self.account_state is not None:
+            # stream senkron değilse (snapshot bekleniyor) paper_trades'e düşülmez
+            return self.account_state.today_pnl() if self.account_state.synced else 0.0
         # approximate: sum buys/sells via paper_trades (notional) - for live use positions reconciliation needed
         conn = sqlite3.connect(self.db)
         c = conn.cursor()
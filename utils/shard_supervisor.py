@@ -0,0 +1,279 @@
+# utils/shard_supervisor.py
+##♦️ sembol evrenini K worker process'e bölen supervisor
+# - Her worker kendi kline stream bağlantılarını, kapanış geçmişini (strateji deque'leri) ve stratejilerini tutar
+# - Sinyaller hafif bir IPC kanalı (mp.Queue, tuple) ile ana process'e gelir → signal_handler.publish_signal
+#   → SignalEvaluator tek noktada karar vermeye devam eder
+# - add_symbol / remove_symbol: en az yüklü shard'a ekler / sahibinden çıkarır (diğer shard'lar etkilenmez)
+# - rebalance(): shard'lar arası sembol sayısı farkı ≤ 1 olacak şekilde en az sembolü taşır
+# - Ölen worker mevcut bölümüyle yeniden başlatılır
+
+import asyncio
+import logging
+import multiprocessing as mp
+import threading
+import time
+from typing import Dict, List, Optional
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("shard_supervisor")
+LOG.addHandler(logging.NullHandler())
+
+CMD_ADD = "add"
+CMD_REMOVE = "remove"
+CMD_STOP = "stop"
+
+
+# -------------------------------------------------------------
+# Worker process tarafı
+# -------------------------------------------------------------
+def _kline_streams(symbols: List[str], interval: str) -> List[str]:
+    return [f"{s.lower()}@kline_{interval}" for s in symbols]
+
+
+async def _shard_async(shard_id: int, symbols: List[str], interval: str, cmd_q, sig_q):
+    from strategies.rsi_macd_strategy import RSI_MACD_Strategy
+    from utils.binance_api import BinanceClient
+    from utils.stream_manager import StreamManager
+
+    loop = asyncio.get_running_loop()
+    client = BinanceClient()
+    stream_mgr = StreamManager(client, loop=loop)
+    strategies: Dict[str, RSI_MACD_Strategy] = {s: RSI_MACD_Strategy(s) for s in symbols}
+    done = asyncio.Event()
+
+    async def on_message(msg):
+        try:
+            data = msg.get("data") if isinstance(msg, dict) else msg
+            k = data.get("k") or {}
+            if not k.get("x"):
+                return
+            strat = strategies.get(data.get("s"))
+            if strat is None:
+                return
+            sig = strat.on_new_close(float(k["c"]))
+            if sig:
+                sig_q.put_nowait((shard_id, strat.symbol, sig["type"], sig["strength"], sig["payload"], time.time()))
+        except Exception:
+            LOG.exception("shard %s message error", shard_id)
+
+    def on_command(cmd):
+        op, syms = cmd
+        if op == CMD_STOP:
+            done.set()
+            return
+        # sadece değişen semboller: eklenenlere yeni bağlantı, çıkarılanların bağlantısı kesintisiz
+        # yenilenir → shard'daki diğer sembollerin stream'leri kopmaz
+        if op == CMD_ADD:
+            added = [s for s in syms if s not in strategies]
+            for s in added:
+                strategies[s] = RSI_MACD_Strategy(s)
+            stream_mgr.add_streams(_kline_streams(added, interval), on_message)
+        elif op == CMD_REMOVE:
+            removed = [s for s in syms if strategies.pop(s, None) is not None]
+            stream_mgr.remove_streams(_kline_streams(removed, interval))
+        LOG.info("shard %s: %s %s → %d symbols", shard_id, op, syms, len(strategies))
+
+    def cmd_reader():
+        while True:
+            cmd = cmd_q.get()
+            loop.call_soon_threadsafe(on_command, cmd)
+            if cmd[0] == CMD_STOP:
+                return
+
+    threading.Thread(target=cmd_reader, name=f"shard{shard_id}_cmd", daemon=True).start()
+    if strategies:
+        stream_mgr.start_combined_groups(_kline_streams(list(strategies), interval), on_message)
+    try:
+        await done.wait()
+    finally:
+        stream_mgr.cancel_all()
+
+
+def _shard_main(shard_id: int, symbols: List[str], interval: str, cmd_q, sig_q):
+    """Worker process giriş noktası (spawn ile pickle edilebilir olmalı)."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    try:
+        asyncio.run(_shard_async(shard_id, symbols, interval, cmd_q, sig_q))
+    except KeyboardInterrupt:
+        pass
+
+
+# -------------------------------------------------------------
+# Bot process tarafı
+# -------------------------------------------------------------
+class _Shard:
+    __slots__ = ("shard_id", "symbols", "process", "cmd_q", "restarts")
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.symbols: List[str] = []
+        self.process: Optional[mp.Process] = None
+        self.cmd_q = None
+        self.restarts = 0
+
+
+class ShardSupervisor:
+    """
+    Sembolleri K worker process'e dağıtır; sinyalleri ana loop'ta signal_handler'a yayınlar.
+    workers: None → CONFIG.SYSTEM.SHARD_WORKERS
+    """
+
+    def __init__(self, workers: Optional[int] = None, interval: Optional[str] = None, loop=None,
+                 health_check_sec: float = 5.0):
+        self.k = max(1, int(workers or CONFIG.SYSTEM.SHARD_WORKERS))
+        self.interval = interval or CONFIG.BINANCE.STREAM_INTERVAL
+        self.loop = loop or asyncio.get_event_loop()
+        self.health_check_sec = health_check_sec
+        self._ctx = mp.get_context("spawn")
+        self.sig_q = self._ctx.Queue()
+        self.shards = [_Shard(i) for i in range(self.k)]
+        self.owner: Dict[str, int] = {}
+        self.signals = 0
+        self._reader: Optional[threading.Thread] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    # ---------------------------------------------------------
+    # Bölümleme
+    # ---------------------------------------------------------
+    def _least_loaded(self) -> _Shard:
+        return min(self.shards, key=lambda sh: (len(sh.symbols), sh.shard_id))
+
+    def assign(self, symbols: List[str]):
+        """Başlangıç ataması: round-robin yerine en az yüklü shard (sonradan eklenenlerle aynı kural)."""
+        for s in symbols:
+            s = s.upper()
+            if s not in self.owner:
+                sh = self._least_loaded()
+                sh.symbols.append(s)
+                self.owner[s] = sh.shard_id
+
+    # ---------------------------------------------------------
+    # Process yaşam döngüsü
+    # ---------------------------------------------------------
+    def _spawn(self, sh: _Shard):
+        sh.cmd_q = self._ctx.Queue()
+        sh.process = self._ctx.Process(
+            target=_shard_main,
+            args=(sh.shard_id, list(sh.symbols), self.interval, sh.cmd_q, self.sig_q),
+            name=f"strategy_shard_{sh.shard_id}",
+            daemon=True,
+        )
+        sh.process.start()
+        LOG.info("Shard %s started pid=%s symbols=%d", sh.shard_id, sh.process.pid, len(sh.symbols))
+
+    def start(self, symbols: Optional[List[str]] = None):
+        if symbols:
+            self.assign(symbols)
+        for sh in self.shards:
+            self._spawn(sh)
+        self._reader = threading.Thread(target=self._read_signals, name="shard_signal_reader", daemon=True)
+        self._reader.start()
+        self._health_task = self.loop.create_task(self._health_loop())
+
+    def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for sh in self.shards:
+            if sh.process is None:
+                continue
+            try:
+                sh.cmd_q.put((CMD_STOP, []))
+            except Exception:
+                pass
+            sh.process.join(timeout=3)
+            if sh.process.is_alive():
+                sh.process.terminate()
+                sh.process.join(timeout=3)
+            sh.process = None
+        self.sig_q.put(None)  # reader thread'i sonlandır
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_sec)
+            for sh in self.shards:
+                if sh.process is not None and not sh.process.is_alive():
+                    LOG.error("Shard %s exited (code=%s); restarting", sh.shard_id, sh.process.exitcode)
+                    sh.restarts += 1
+                    self._spawn(sh)
+
+    # ---------------------------------------------------------
+    # Sinyal köprüsü (IPC → SignalEvaluator)
+    # ---------------------------------------------------------
+    def _read_signals(self):
+        while True:
+            item = self.sig_q.get()
+            if item is None:
+                return
+            self.loop.call_soon_threadsafe(self._publish, item)
+
+    def _publish(self, item):
+        from handlers import signal_handler
+
+        _, symbol, type_, strength, payload, _ts = item
+        self.signals += 1
+        self.loop.create_task(
+            signal_handler.publish_signal("rsi_macd", symbol, type_, strength=strength, payload=payload)
+        )
+
+    # ---------------------------------------------------------
+    # Dinamik sembol yönetimi
+    # ---------------------------------------------------------
+    def _send(self, sh: _Shard, op: str, symbols: List[str]):
+        if sh.process is not None and symbols:
+            sh.cmd_q.put((op, symbols))
+
+    def add_symbol(self, symbol: str) -> int:
+        symbol = symbol.upper()
+        if symbol in self.owner:
+            return self.owner[symbol]
+        sh = self._least_loaded()
+        sh.symbols.append(symbol)
+        self.owner[symbol] = sh.shard_id
+        self._send(sh, CMD_ADD, [symbol])
+        return sh.shard_id
+
+    def remove_symbol(self, symbol: str) -> bool:
+        symbol = symbol.upper()
+        sid = self.owner.pop(symbol, None)
+        if sid is None:
+            return False
+        sh = self.shards[sid]
+        sh.symbols.remove(symbol)
+        self._send(sh, CMD_REMOVE, [symbol])
+        return True
+
+    def rebalance(self) -> int:
+        """
+        En kalabalık shard'dan en boş olana, fark ≤ 1 olana kadar sembol taşır.
+        Taşınan sembolün strateji geçmişi hedef shard'da sıfırdan başlar. Dönüş: taşınan sembol sayısı.
+        """
+        moves: Dict[int, Dict[str, List[str]]] = {sh.shard_id: {CMD_ADD: [], CMD_REMOVE: []} for sh in self.shards}
+        moved = 0
+        while True:
+            hi = max(self.shards, key=lambda sh: len(sh.symbols))
+            lo = self._least_loaded()
+            if len(hi.symbols) - len(lo.symbols) <= 1:
+                break
+            s = hi.symbols.pop()
+            lo.symbols.append(s)
+            self.owner[s] = lo.shard_id
+            moves[hi.shard_id][CMD_REMOVE].append(s)
+            moves[lo.shard_id][CMD_ADD].append(s)
+            moved += 1
+        for sh in self.shards:
+            self._send(sh, CMD_REMOVE, moves[sh.shard_id][CMD_REMOVE])
+            self._send(sh, CMD_ADD, moves[sh.shard_id][CMD_ADD])
+        if moved:
+            LOG.info("Rebalanced %d symbols across %d shards", moved, self.k)
+        return moved
+
+    def stats(self) -> List[Dict]:
+        return [{
+            "shard": sh.shard_id,
+            "pid": sh.process.pid if sh.process is not None else None,
+            "alive": bool(sh.process is not None and sh.process.is_alive()),
+            "symbols": len(sh.symbols),
+            "restarts": sh.restarts,
+        } for sh in self.shards]
@@ -0,0 +1,143 @@
+# utils/shm_ring.py
+##♦️ shared-memory ring buffer (tek yazar / tek okuyucu, sabit boyutlu kayıtlar)
+# - Ingest process normalize edilmiş kline/trade/ticker kayıtlarını yazar
+# - Bot process yeni kayıtları tek blok kopya ile okur (yazar okuyucuyu beklemez, view'lar güvenli değil)
+# - Header: [0] write_seq (toplam yazılan kayıt), [1] capacity
+# - Okuyucu geride kalırsa (lap) en eski kayıtlar atlanır ve dropped sayacı artar; kopya sırasında
+#   üzerine yazılan kayıtlar seqlock tarzı (kopya sonrası write_seq tekrar okunur) tespit edilip atılır
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional
+
+import numpy as np
+
+KIND_KLINE = 1
+KIND_TRADE = 2
+KIND_TICKER = 3
+
+# 64 byte / kayıt
+# kline : open/high/low/close/volume/quote_volume, closed=1 → kapanan mum, ts=open_time
+# trade : close=price, volume=qty, closed=1 → buyer maker (satış agresörü), ts=trade time
+# ticker: close=last, open/high/low 24h, volume=base vol, quote_volume=quote vol, ts=event time
+RECORD_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("closed", "u1"),
+    ("sym", "u2"),
+    ("ts", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("quote_volume", "f8"),
+], align=True)
+
+_HEADER_BYTES = 64
+
+
+class ShmRing:
+    """
+    Sabit kapasiteli shared-memory ring.
+    create() yazar tarafta, attach(name) okuyucu/yazar tarafta kullanılır.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=shm.buf[:16])
+        self.records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=shm.buf[_HEADER_BYTES:])
+        self.read_seq = int(self._header[0])
+        self.dropped = 0
+
+    @classmethod
+    def create(cls, capacity: int) -> "ShmRing":
+        size = _HEADER_BYTES + capacity * RECORD_DTYPE.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(shm, capacity, owner=True)
+        ring._header[0] = 0
+        ring._header[1] = capacity
+        ring.read_seq = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmRing":
+        shm = shared_memory.SharedMemory(name=name)
+        # segmentin sahibi oluşturan process; attach eden taraf çıkışta unlink etmesin
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        capacity = int(np.ndarray((2,), dtype=np.int64, buffer=shm.buf[:16])[1])
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # ---------------------------------------------------------
+    # Yazar
+    # ---------------------------------------------------------
+    def write(self, kind: int, sym: int, ts: int, open_: float = 0.0, high: float = 0.0, low: float = 0.0,
+              close: float = 0.0, volume: float = 0.0, quote_volume: float = 0.0, closed: int = 0):
+        seq = int(self._header[0])
+        self.records[seq % self.capacity] = (kind, closed, sym, ts, open_, high, low, close, volume, quote_volume)
+        # kayıt yazıldıktan sonra yayınla
+        self._header[0] = seq + 1
+
+    # ---------------------------------------------------------
+    # Okuyucu
+    # ---------------------------------------------------------
+    def pending(self) -> int:
+        return int(self._header[0]) - self.read_seq
+
+    def read(self, max_records: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Yeni kayıtları tek bir kopya dizi olarak döndürür ([] veya [arr]); dizi okuyucuya aittir.
+        Yazar okuyucuyu beklemez: write_seq = W iken yazar (W % capacity) hücresini, yani
+        W − capacity kaydını ezer. Kopyadan sonra W tekrar okunur; seq'i W − capacity + 1'den
+        küçük kayıtlar bozulmuş olabilir → atılır, dropped'a eklenir.
+        """
+        write_seq = int(self._header[0])
+        start = self.read_seq
+        if write_seq - start > self.capacity:
+            lost = write_seq - start - self.capacity
+            self.dropped += lost
+            start += lost
+        end = write_seq
+        if max_records is not None and end - start > max_records:
+            end = start + max_records
+        if end <= start:
+            return []
+        self.read_seq = end
+
+        i0 = start % self.capacity
+        i1 = end % self.capacity
+        if i0 < i1:
+            out = self.records[i0:i1].copy()
+        else:
+            out = np.concatenate((self.records[i0:], self.records[:i1]))
+        # seqlock kontrolü: kopya sırasında yazar tur bindirdiyse baştaki kayıtlar geçersiz
+        torn = int(self._header[0]) - self.capacity + 1 - start
+        if torn > 0:
+            torn = min(torn, end - start)
+            self.dropped += torn
+            out = out[torn:]
+        return [out] if len(out) else []
+
+    # ---------------------------------------------------------
+    # Kapatma
+    # ---------------------------------------------------------
+    def close(self):
+        # numpy view'ları bırak, sonra mapping'i kapat
+        self._header = None
+        self.records = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -4,16 +4,59 @@
 import asyncio
 import logging
 import time
-from typing import List, Callable
+from typing import Any, List, Callable, Optional, Set, Tuple
 from utils.config import CONFIG
 from utils.binance_api import BinanceClient
 
 LOG = logging.getLogger("stream_manager")
 
 
+COMBINED_URL = "wss://stream.binance.com:9443/stream?streams="
+
+
+_DEDUP_GRACE_SEC = 2.0   # eski bağlantı kapandıktan sonra yenilerin dedup'u bu kadar açık kalır
+
+
+def _dedup_key(msg) -> Optional[Tuple[str, Any]]:
+    """Combined mesaj → (stream, event zamanı / update id); anahtar yoksa None (dedup dışı)."""
+    if not isinstance(msg, dict):
+        return None
+    data = msg.get("data")
+    if not isinstance(data, dict):
+        return None
+    ev = data.get("E", data.get("u", data.get("lastUpdateId")))
+    return None if ev is None else (msg.get("stream"), ev)
+
+
+class _StreamConn:
+    """
+    Tek bir combined-stream bağlantısı: kendi handler'ı + raw_tap'i, mesaj sayacı (rate izleme),
+    ilk mesaj sinyali ve bölme sırasındaki paylaşılan dedup kümesi.
+    """
+
+    __slots__ = ("streams", "handler", "raw_tap", "task", "count", "since", "rate", "first_msg", "dedup", "_frame")
+
+    def __init__(self, streams: List[str], handler: Callable, raw_tap: Optional[Callable] = None):
+        self.streams = streams
+        self.handler = handler
+        self.raw_tap = raw_tap
+        self.task: Optional[asyncio.Task] = None
+        self.count = 0
+        self.since = time.monotonic()
+        self.rate = 0.0
+        self.first_msg = asyncio.Event()
+        self.dedup: Optional[Set[Tuple[str, Any]]] = None
+        self._frame = None
+
+    @property
+    def url(self) -> str:
+        return COMBINED_URL + "/".join(self.streams)
+
+
 class StreamManager:
     """
-    Builds grouped combined streams from a symbol list (to respect websocket URL length).
+    Builds packed combined streams from a symbol list (stream-count and URL-length aware).
+    Monitors per-connection message rate and splits connections that get hot.
     Provides a simple HTTP fallback scheduler for endpoints missing in WS (e.g. futures funding).
     """
 
@@ -21,29 +64,194 @@ class StreamManager:
         self.client = client
         self.loop = loop or asyncio.get_event_loop()
         self.tasks: List[asyncio.Task] = []
+        self.conns: List[_StreamConn] = []
+        self._monitor_task: Optional[asyncio.Task] = None
 
     # ---------------------------------------------------------
-    # Stream gruplama (URL uzunluğu limitine karşı)
+    # Stream paketleme (bağlantı başına stream sayısı + URL uzunluğu limiti)
     # ---------------------------------------------------------
-    def group_streams(self, streams: List[str]) -> List[List[str]]:
-        group_size = CONFIG.BINANCE.IO_CONCURRENCY  # eski STREAM_GROUP_SIZE yerine
-        return [streams[i:i + group_size] for i in range(0, len(streams), group_size)]
+    def group_streams(self, streams: List[str], max_streams: Optional[int] = None,
+                      max_url_len: Optional[int] = None) -> List[List[str]]:
+        max_streams = max_streams or CONFIG.BINANCE.WS_MAX_STREAMS_PER_CONN
+        max_url_len = max_url_len or CONFIG.BINANCE.WS_MAX_URL_LEN
+        groups: List[List[str]] = []
+        cur: List[str] = []
+        cur_len = len(COMBINED_URL)
+        for st in streams:
+            add = len(st) + (1 if cur else 0)
+            if cur and (len(cur) >= max_streams or cur_len + add > max_url_len):
+                groups.append(cur)
+                cur, cur_len, add = [], len(COMBINED_URL), len(st)
+            cur.append(st)
+            cur_len += add
+        if cur:
+            groups.append(cur)
+        return groups
 
     # ---------------------------------------------------------
     # Combined stream başlat (REST fallback yok)
     # ---------------------------------------------------------
-    def start_combined_groups(self, streams: List[str], message_handler: Callable):
+    def start_combined_groups(self, streams: List[str], message_handler: Callable, raw_tap: Optional[Callable] = None):
         groups = self.group_streams(streams)
-        LOG.info("Starting %s combined stream groups", len(groups))
+        LOG.info("Starting %s combined stream connections for %s streams", len(groups), len(streams))
 
         for grp in groups:
-            url = f"wss://stream.binance.com:9443/stream?streams={'/'.join(grp)}"
+            self._start_conn(_StreamConn(grp, message_handler, raw_tap))
 
-            async def runner():
-                await self.client.ws_subscribe(url, message_handler)
+        if CONFIG.BINANCE.WS_SPLIT_MSG_RATE > 0 and self._monitor_task is None:
+            self._monitor_task = self.loop.create_task(self._monitor_rates())
+            self.tasks.append(self._monitor_task)
 
-            task = self.loop.create_task(runner())
-            self.tasks.append(task)
+    def _start_conn(self, conn: _StreamConn):
+        def stash(frame, recv_ts_ns):
+            # ham frame dedup kararından sonra kaydedilir (bkz. counted)
+            conn._frame = (frame, recv_ts_ns)
+
+        async def counted(msg):
+            conn.count += 1
+            conn.first_msg.set()
+            seen = conn.dedup
+            if seen is not None:
+                key = _dedup_key(msg)
+                if key is not None:
+                    if key in seen:
+                        return
+                    seen.add(key)
+            if conn.raw_tap is not None and conn._frame is not None:
+                conn.raw_tap(*conn._frame)
+            await conn.handler(msg)
+
+        async def runner():
+            await self.client.ws_subscribe(conn.url, counted, raw_tap=stash if conn.raw_tap is not None else None)
+
+        conn.task = self.loop.create_task(runner())
+        self.tasks.append(conn.task)
+        self.conns.append(conn)
+
+    # ---------------------------------------------------------
+    # Bağlantı başına mesaj hızı izleme + sıcak bağlantıyı bölme
+    # ---------------------------------------------------------
+    async def _monitor_rates(self):
+        interval = CONFIG.BINANCE.WS_RATE_CHECK_SEC
+        limit = CONFIG.BINANCE.WS_SPLIT_MSG_RATE
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                for conn in list(self.conns):
+                    elapsed = max(now - conn.since, 1e-9)
+                    conn.rate = conn.count / elapsed
+                    conn.count = 0
+                    conn.since = now
+                    if conn.rate > limit and len(conn.streams) > 1:
+                        self._split_conn(conn)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                LOG.exception("stream rate monitor error")
+
+    def _split_conn(self, conn: _StreamConn):
+        """Sıcak bağlantıyı ikiye böler (kesintisiz devir, bkz. _replace_conn)."""
+        half = len(conn.streams) // 2
+        LOG.info("Splitting hot connection (%.0f msg/s, %s streams)", conn.rate, len(conn.streams))
+        self._replace_conn(conn, [_StreamConn(conn.streams[:half], conn.handler, conn.raw_tap),
+                                  _StreamConn(conn.streams[half:], conn.handler, conn.raw_tap)])
+
+    def _replace_conn(self, old: _StreamConn, new_conns: List[_StreamConn]):
+        """
+        Kesintisiz devir: önce yeni bağlantılar başlatılır, eski bağlantı hepsi ilk mesajını verince
+        kapatılır. Örtüşme boyunca hepsi ortak dedup kümesi kullanır ((stream, E) anahtarı)
+        → kline kapanışları dahil mesaj kaybı / çift teslim yok.
+        """
+        seen: Set[Tuple[str, Any]] = set()
+        old.dedup = seen
+        self.conns.remove(old)
+        for c in new_conns:
+            c.dedup = seen
+            self._start_conn(c)
+        task = self.loop.create_task(self._handover(old, new_conns))
+        self.tasks.append(task)
+        task.add_done_callback(self._discard_task)
+
+    # ---------------------------------------------------------
+    # Artımlı stream ekleme / çıkarma (diğer bağlantılara dokunulmaz)
+    # ---------------------------------------------------------
+    def add_streams(self, streams: List[str], message_handler: Callable, raw_tap: Optional[Callable] = None):
+        """Sadece henüz açık olmayan stream'ler için yeni bağlantı(lar) açar."""
+        active = {st for c in self.conns for st in c.streams}
+        new = [st for st in dict.fromkeys(streams) if st not in active]
+        if new:
+            self.start_combined_groups(new, message_handler, raw_tap)
+
+    def remove_streams(self, streams: List[str]):
+        """Sadece bu stream'leri taşıyan bağlantılar kapanır / kalan stream'lerle kesintisiz yenilenir."""
+        drop = set(streams)
+        for conn in [c for c in self.conns if drop.intersection(c.streams)]:
+            keep = [st for st in conn.streams if st not in drop]
+            if keep:
+                self._replace_conn(conn, [_StreamConn(keep, conn.handler, conn.raw_tap)])
+            else:
+                self._stop_conn(conn)
+
+    async def _handover(self, old: _StreamConn, new_conns: List[_StreamConn]):
+        timeout = CONFIG.BINANCE.WS_SPLIT_HANDOVER_SEC
+        try:
+            await asyncio.wait_for(asyncio.gather(*(c.first_msg.wait() for c in new_conns)), timeout)
+        except asyncio.TimeoutError:
+            # yeni bağlantılar bağlanamadı → devir geri alınır, eski bağlantı devam eder
+            LOG.warning("Connection handover timed out after %.0fs; keeping the original connection", timeout)
+            for c in new_conns:
+                self._stop_conn(c)
+            old.dedup = None
+            self.conns.append(old)
+            return
+        self._stop_conn(old)
+        # eski bağlantının önden teslim ettiği mesajlar yenilerden tekrar gelebilir
+        await asyncio.sleep(_DEDUP_GRACE_SEC)
+        for c in new_conns:
+            c.dedup = None
+
+    def _discard_task(self, task: asyncio.Task):
+        # bitmiş yardımcı task'lar listede birikmesin (cancel_all listeyi zaten sıfırlamış olabilir)
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def _stop_conn(self, conn: _StreamConn):
+        conn.task.cancel()
+        if conn in self.conns:
+            self.conns.remove(conn)
+        if conn.task in self.tasks:
+            self.tasks.remove(conn.task)
+
+    def connection_stats(self) -> List[dict]:
+        return [{"streams": len(c.streams), "msg_rate": round(c.rate, 1)} for c in self.conns]
+
+    # ---------------------------------------------------------
+    # Tüm market ticker (!miniTicker@arr / !ticker@arr) → LiveTickerTable
+    # ---------------------------------------------------------
+    def start_all_market_ticker(self, message_handler: Callable, mode: str = "mini"):
+        stream = "!ticker@arr" if mode == "full" else "!miniTicker@arr"
+        url = f"wss://stream.binance.com:9443/ws/{stream}"
+        LOG.info("Starting all-market ticker stream: %s", stream)
+
+        async def runner():
+            await self.client.ws_subscribe(url, message_handler)
+
+        task = self.loop.create_task(runner())
+        self.tasks.append(task)
+
+    # ---------------------------------------------------------
+    # Futures likidasyonları (!forceOrder@arr) → LiquidationAggregator
+    # ---------------------------------------------------------
+    def start_force_order_stream(self, message_handler: Callable):
+        url = f"{CONFIG.BINANCE.FSTREAM_URL}/ws/!forceOrder@arr"
+        LOG.info("Starting futures liquidation stream")
+
+        async def runner():
+            await self.client.ws_subscribe(url, message_handler)
+
+        task = self.loop.create_task(runner())
+        self.tasks.append(task)
 
     # ---------------------------------------------------------
     # Funding verisi (REST fallback — çünkü funding WS kullanılmıyor)
@@ -85,3 +293,5 @@ class StreamManager:
         for t in self.tasks:
             t.cancel()
         self.tasks = []
+        self.conns = []
+        self._monitor_task = None
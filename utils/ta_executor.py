@@ -0,0 +1,219 @@
+# utils/ta_executor.py
+##♦️ calculate_cpu_functions için kalıcı executor backend'leri
+# - "thread" : kalıcı ThreadPoolExecutor (her çağrıda kur/yık yok; GIL'e takılan pandas kodunda sınırlı kazanç)
+# - "process": kalıcı spawn ProcessPoolExecutor; tamamen sayısal df tek SharedMemory bloğuna
+#              yazılır, worker'lar attach edip DataFrame'i yerelde kurar (pickle'lanmış DataFrame yok),
+#              fonksiyonlar CPU_FUNCTIONS'tan isimle çözülür (lambda'lar da çalışır)
+#              blok ile birebir taşınamayan df (sayısal olmayan sütun, desteklenmeyen index) pickle ile
+#              gönderilir → sonuçlar thread backend ile aynı kalır
+# - Worker sayısı CONFIG.SYSTEM.MAX_WORKERS, backend CONFIG.SYSTEM.CPU_BACKEND
+
+import atexit
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("ta_executor")
+LOG.addHandler(logging.NullHandler())
+
+BACKENDS = ("thread", "process")
+
+
+# -------------------------------------------------------------
+# DataFrame ↔ SharedMemory
+# -------------------------------------------------------------
+def _shareable_column(dtype) -> bool:
+    """float / int (≤ 64 bit) numpy dtype'ları blokta bit-bit taşınabilir."""
+    return isinstance(dtype, np.dtype) and dtype.kind in "fiu" and dtype.itemsize <= 8
+
+
+def export_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, dict]:
+    """
+    Sütunlar (+ Range/Datetime/int index) → 8 byte'lık (sütun × satır) tek blok.
+    Float'lar float64'e, int'ler int64/uint64 bitleriyle yazılır (hassasiyet kaybı yok).
+    Birebir taşınamayan df'de ValueError (çağıran pickle'a düşer): sayısal olmayan / bool / extension
+    dtype sütun, tekrarlı veya çok seviyeli sütun adları, tz'li Datetime veya başka tip index.
+    """
+    if isinstance(df.columns, pd.MultiIndex) or not df.columns.is_unique:
+        raise ValueError("columns must be unique and single-level")
+    bad = [c for c in df.columns if not _shareable_column(df[c].dtype)]
+    if bad:
+        raise ValueError(f"non-numeric columns: {bad}")
+    cols = list(df.columns)
+    n = len(df)
+    idx = df.index
+    if isinstance(idx, pd.RangeIndex):
+        index_meta = ("range", idx.start, idx.step)
+        index_vals = None
+    elif isinstance(idx, pd.DatetimeIndex) and idx.tz is None and idx.dtype == "datetime64[ns]":
+        index_meta = ("datetime",)
+        index_vals = idx.asi8
+    elif isinstance(idx.dtype, np.dtype) and idx.dtype.kind == "i":
+        index_meta = ("int",)
+        index_vals = idx.to_numpy(dtype=np.int64)
+    else:
+        raise ValueError(f"unsupported index: {type(idx).__name__}[{idx.dtype}]")
+
+    rows = len(cols) + (1 if index_vals is not None else 0)
+    shm = shared_memory.SharedMemory(create=True, size=max(rows * n * 8, 8))
+    block = np.ndarray((rows, n), dtype=np.float64, buffer=shm.buf)
+    for k, c in enumerate(cols):
+        kind = df[c].dtype.kind
+        if kind == "f":
+            block[k] = df[c].to_numpy(dtype=np.float64)
+        else:
+            wide = np.uint64 if kind == "u" else np.int64
+            block[k].view(wide)[:] = df[c].to_numpy(dtype=wide)
+    if index_vals is not None:
+        block[len(cols)].view(np.int64)[:] = index_vals
+    meta = {
+        "n": n,
+        "columns": cols,
+        "dtypes": [str(df[c].dtype) for c in cols],
+        "index": index_meta,
+        "index_name": idx.name,
+    }
+    return shm, meta
+
+
+def import_frame(shm_name: str, meta: dict) -> pd.DataFrame:
+    """Worker tarafı: bloğu attach et, yerel kopya DataFrame kur, bloğu bırak."""
+    # spawn worker'ları ana process'in resource tracker'ını paylaşır (kayıt idempotent) →
+    # burada unregister edilmez, segmenti ana process unlink eder
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        cols = meta["columns"]
+        n = meta["n"]
+        rows = len(cols) + (0 if meta["index"][0] == "range" else 1)
+        block = np.ndarray((rows, n), dtype=np.float64, buffer=shm.buf)
+        kind = meta["index"][0]
+        if kind == "range":
+            index = pd.RangeIndex(meta["index"][1], meta["index"][1] + n * meta["index"][2], meta["index"][2])
+        elif kind == "datetime":
+            index = pd.DatetimeIndex(block[len(cols)].view(np.int64).copy().view("datetime64[ns]"))
+        else:
+            index = pd.Index(block[len(cols)].view(np.int64).copy())
+        index.name = meta["index_name"]
+        data = {}
+        for k, (c, dt) in enumerate(zip(cols, meta["dtypes"])):
+            dt = np.dtype(dt)
+            row = block[k] if dt.kind == "f" else block[k].view(np.uint64 if dt.kind == "u" else np.int64)
+            data[c] = row.astype(dt, copy=True)
+        del block
+        return pd.DataFrame(data, index=index, columns=cols)
+    finally:
+        shm.close()
+
+
+def _run_shared(shm_name: str, meta: dict, name: str) -> Any:
+    """Process worker görevi: tek CPU fonksiyonu (isimle)."""
+    from utils import ta_utils
+    df = import_frame(shm_name, meta)
+    return ta_utils.CPU_FUNCTIONS[name](df)
+
+
+def _run_pickled(df: pd.DataFrame, name: str) -> Any:
+    """Process worker görevi: SharedMemory'ye sığmayan df pickle ile gelir."""
+    from utils import ta_utils
+    return ta_utils.CPU_FUNCTIONS[name](df)
+
+
+# -------------------------------------------------------------
+# Executor
+# -------------------------------------------------------------
+class CpuExecutor:
+    def __init__(self, backend: str, workers: int):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown CPU backend: {backend}")
+        self.backend = backend
+        self.workers = workers
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.backend == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"))
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ta-cpu")
+        return self._pool
+
+    def run(self, df: pd.DataFrame, names: Iterable[str]) -> Dict[str, Any]:
+        """{name: sonuç}; hata veren fonksiyon → None (ta_utils mesaj formatıyla yazdırılır)."""
+        from utils import ta_utils
+        names = list(names)
+        results: Dict[str, Any] = {}
+        pool = self._get_pool()
+        shm = None
+        try:
+            futures = {}
+            if self.backend == "process":
+                try:
+                    shm, meta = export_frame(df)
+                except ValueError as e:
+                    LOG.debug("frame not shareable, pickling instead: %s", e)
+                    for name in names:
+                        futures[pool.submit(_run_pickled, df, name)] = name
+                else:
+                    for name in names:
+                        futures[pool.submit(_run_shared, shm.name, meta, name)] = name
+            else:
+                for name in names:
+                    # Yan etki oluşturan fonksiyonlara izolasyon
+                    arg_df = df.copy(deep=True) if name in ta_utils.MUTATING_FUNCTIONS else df
+                    futures[pool.submit(ta_utils.CPU_FUNCTIONS[name], arg_df)] = name
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except BrokenProcessPool as e:
+                    results[name] = None
+                    self._pool = None   # sonraki çağrıda yeniden kurulur
+                    print(f"[CPU TA ERROR] {name} hesaplanamadı: {e}")
+                except Exception as e:
+                    results[name] = None
+                    print(f"[CPU TA ERROR] {name} hesaplanamadı: {e}")
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        return results
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+# -------------------------------------------------------------
+# Singleton (backend, worker sayısı başına)
+# -------------------------------------------------------------
+_executors: Dict[Tuple[str, int], CpuExecutor] = {}
+
+
+def get_cpu_executor(max_workers: Optional[int] = None, backend: Optional[str] = None) -> CpuExecutor:
+    backend = (backend or CONFIG.SYSTEM.CPU_BACKEND).lower()
+    workers = int(max_workers or CONFIG.SYSTEM.MAX_WORKERS or 2)
+    key = (backend, workers)
+    ex = _executors.get(key)
+    if ex is None:
+        ex = _executors[key] = CpuExecutor(backend, workers)
+        LOG.info("CPU executor: backend=%s workers=%d", backend, workers)
+    return ex
+
+
+def shutdown_cpu_executors():
+    for ex in list(_executors.values()):
+        ex.shutdown()
+    _executors.clear()
+
+
+atexit.register(shutdown_cpu_executors)
@@ -1,6 +1,6 @@
 # ta_utils.py
 # Free Render uyumlu hibrit TA pipeline
-# - CPU-bound: ThreadPoolExecutor
+# - CPU-bound: kalıcı ThreadPoolExecutor veya shared-memory'li ProcessPoolExecutor (utils.ta_executor)
 # - IO-bound: asyncio
 # - MAX_WORKERS: CONFIG.SYSTEM.MAX_WORKERS varsa kullanılır, yoksa 2
 
@@ -8,10 +8,11 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
 import math
-from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from utils.config import CONFIG
 
@@ -85,11 +86,34 @@ def vwap(df: pd.DataFrame) -> pd.Series:
     return (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
 
 
+def rolling_mad(values, period: int, dtype=None, block: int = 4096) -> np.ndarray:
+    """
+    Kayan ortalama mutlak sapma: mean(|x − mean(x)|), son eksen zaman (1D veya semboller × zaman).
+    sliding_window_view (kopyasız) + blok blok hesap → geçici bellek O(block·period).
+    İlk period-1 bar ve NaN içeren pencereler NaN. dtype=np.float32 → yarı bellek/bant genişliği.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+    x = np.asarray(values, dtype=dtype or np.float64)
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan, dtype=x.dtype)
+    if n < period:
+        return out
+    win = sliding_window_view(x, period, axis=-1)       # (..., n-period+1, period)
+    for s in range(0, win.shape[-2], block):
+        w = win[..., s:s + block, :]
+        dev = np.abs(w - w.mean(axis=-1, keepdims=True))
+        out[..., period - 1 + s:period - 1 + s + w.shape[-2]] = dev.mean(axis=-1)
+    return out
+
+
 def cci(df: pd.DataFrame, period: int = 20) -> pd.Series:
-    """Commodity Channel Index (CCI) hesaplar."""
+    """Commodity Channel Index (CCI) hesaplar. high/low/close geniş DataFrame (zaman × sembol) da olabilir."""
     tp = (df['high'] + df['low'] + df['close']) / 3
     sma = tp.rolling(period).mean()
-    mad = tp.rolling(period).apply(lambda x: np.mean(np.abs(x - np.mean(x))), raw=True)
+    if isinstance(tp, pd.DataFrame):
+        mad = pd.DataFrame(rolling_mad(tp.to_numpy(dtype=float).T, period).T, index=tp.index, columns=tp.columns)
+    else:
+        mad = pd.Series(rolling_mad(tp.to_numpy(dtype=float), period), index=tp.index)
     return (tp - sma) / (0.015 * mad)
 
 
@@ -319,31 +343,19 @@ TA_FUNCTIONS = {
 # Hibrit Pipeline
 # =============================================================
 
-def calculate_cpu_functions(df: pd.DataFrame, max_workers: Optional[int] = None) -> dict:
+def calculate_cpu_functions(df: pd.DataFrame, max_workers: Optional[int] = None,
+                            backend: Optional[str] = None) -> dict:
     """
     CPU-bound fonksiyonları paralelde hesaplar.
+    - Kalıcı executor (utils.ta_executor): backend CONFIG.SYSTEM.CPU_BACKEND ("thread" | "process")
+    - "process": df shared memory ile worker'lara gider, GIL'e takılan pandas kodu çekirdeklere yayılır
     - Free Render için default max_workers=2 (CONFIG.SYSTEM.MAX_WORKERS yoksa).
-    - MUTATING_FUNCTIONS için df.copy() ile izole çalıştırır.
+    - MUTATING_FUNCTIONS için df.copy() ile izole çalıştırır (process'te her worker zaten kendi kopyasında).
     """
-    results: dict = {}
-    max_workers = max_workers or _get_max_workers(default=2)
+    from utils.ta_executor import get_cpu_executor
 
-    # Hafıza ve stabilite açısından Free Render'da 2 önerilir.
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for name, func in CPU_FUNCTIONS.items():
-            # Yan etki oluşturan fonksiyonlara izolasyon
-            arg_df = df.copy(deep=True) if name in MUTATING_FUNCTIONS else df
-            futures[executor.submit(func, arg_df)] = name
-
-        for future in as_completed(futures):
-            name = futures[future]
-            try:
-                results[name] = future.result()
-            except Exception as e:
-                results[name] = None
-                print(f"[CPU TA ERROR] {name} hesaplanamadı: {e}")
-    return results
+    max_workers = max_workers or _get_max_workers(default=2)
+    return get_cpu_executor(max_workers, backend).run(df, CPU_FUNCTIONS.keys())
 
 
 async def calculate_io_functions() -> dict:
@@ -395,7 +407,7 @@ def _run_asyncio(coro):
 def calculate_all_ta_hybrid(df: pd.DataFrame, max_workers: Optional[int] = None) -> dict:
     """
     Tüm TA'leri hibrit olarak hesaplar:
-      - CPU-bound: ThreadPoolExecutor
+      - CPU-bound: kalıcı thread/process havuzu (CONFIG.SYSTEM.CPU_BACKEND)
       - I/O-bound: asyncio
     Dönen sonuç: { indicator_name: value_or_series_or_df }
     """
@@ -416,37 +428,102 @@ def calculate_all_ta_hybrid(df: pd.DataFrame, max_workers: Optional[int] = None)
 # =============================================================
 
 # --- 1) Kalman: 1D random-walk
-def kalman_filter_series(prices: pd.Series, q: Optional[float] = None, r: Optional[float] = None) -> pd.Series:
+# Q/R sabit → kazanç dizisi veriden bağımsız ve kararlı duruma yakınsar:
+#   x_t = (1 - k_t)·x_{t-1} + k_t·z_t
+# Isınma (k_t değişirken) kapalı form cumprod/cumsum ile, sonrası sabit katsayılı
+# lineer rekürsif filtre (scipy.signal.lfilter; yoksa parça parça kapalı form).
+@lru_cache(maxsize=32)
+def _kalman_gains(q: float, r: float, tol: float = 1e-15, max_steps: int = 100_000) -> np.ndarray:
+    """k_0..k_{m-1}; son eleman kararlı durum kazancı (ardışık fark ≤ tol·k)."""
+    p = 1.0
+    gains = []
+    for _ in range(max_steps):
+        p_prior = p + q
+        k = p_prior / (p_prior + r)
+        p = (1 - k) * p_prior
+        if gains and abs(k - gains[-1]) <= tol * k:
+            gains.append(k)
+            break
+        gains.append(k)
+    out = np.array(gains)
+    out.flags.writeable = False
+    return out
+
+
+def _ffill_last_axis(v: np.ndarray) -> np.ndarray:
+    mask = np.isnan(v)
+    if not mask.any():
+        return v
+    idx = np.where(mask, 0, np.arange(v.shape[-1]))
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    return np.take_along_axis(v, idx, axis=-1)
+
+
+def _ar1_filter(u: np.ndarray, a: float, x_prev: np.ndarray) -> np.ndarray:
+    """y_t = a·y_{t-1} + u_t (son eksen boyunca), y_{-1} = x_prev."""
+    try:
+        from scipy.signal import lfilter
+        return lfilter([1.0], [1.0, -a], u, axis=-1, zi=a * x_prev)[0]
+    except ImportError:
+        pass
+    n = u.shape[-1]
+    y = np.empty_like(u)
+    if a <= 0.0:
+        y[...] = u
+        y[..., :1] += a * x_prev
+        return y
+    # a^L ≥ 1e-150 olacak parça boyu → bölmede taşma yok
+    step = n if a >= 1.0 else max(1, int(150 / -math.log10(a)))
+    prev = x_prev
+    for s in range(0, n, step):
+        pw = a ** np.arange(1, min(step, n - s) + 1)
+        y[..., s:s + pw.size] = pw * (prev + np.cumsum(u[..., s:s + pw.size] / pw, axis=-1))
+        prev = y[..., s + pw.size - 1:s + pw.size]
+    return y
+
+
+def kalman_filter_array(values, q: Optional[float] = None, r: Optional[float] = None) -> np.ndarray:
     """
-    Minimal 1D random-walk Kalman.
-    Q: process noise, R: measurement noise (CONFIG.TA'dan gelir)
+    kalman_filter_series'in vektörel çekirdeği; son eksen zaman (1D veya semboller × zaman 2D).
+    NaN'lar ileri doldurulur (baştaki NaN → çıktı NaN, tekil seri ile aynı).
     """
     if q is None:
         q = getattr(CONFIG.TA, "KALMAN_Q", 1e-5)
     if r is None:
         r = getattr(CONFIG.TA, "KALMAN_R", 1e-2)
 
-    x = 0.0
-    p = 1.0
-    out = []
-    initialized = False
-
-    vals = prices.fillna(method="ffill").values
-    for z in vals:
-        z = float(z)
-        if not initialized:
-            x = z
-            initialized = True
-
-        # predict
-        x_prior = x
-        p_prior = p + q
+    z = _ffill_last_axis(np.asarray(values, dtype=float))
+    n = z.shape[-1]
+    out = np.empty_like(z)
+    if n == 0:
+        return out
+    gains = _kalman_gains(float(q), float(r))
+    m = min(gains.size, n)
+
+    # ilk ölçüm durumu başlatır: x_0 = z_0
+    out[..., 0] = z[..., 0]
+    if m > 1:
+        k = gains[1:m]
+        a = 1.0 - k
+        if a.min() > 0.0:
+            # x_t = P_t·(x_0 + Σ k_s·z_s / P_s), P_t = Π a_j — ısınma boyunca P ≳ 1e-8
+            P = np.cumprod(a)
+            out[..., 1:m] = P * (z[..., :1] + np.cumsum(k * z[..., 1:m] / P, axis=-1))
+        else:
+            for t in range(1, m):
+                out[..., t] = a[t - 1] * out[..., t - 1] + k[t - 1] * z[..., t]
+    if n > m:
+        k_inf = float(gains[-1])
+        out[..., m:] = _ar1_filter(k_inf * z[..., m:], 1.0 - k_inf, out[..., m - 1:m])
+    return out
 
-        # update
-        k = p_prior / (p_prior + r)
-        x = x_prior + k * (z - x_prior)
-        p = (1 - k) * p_prior
-        out.append(x)
+
+def kalman_filter_series(prices: pd.Series, q: Optional[float] = None, r: Optional[float] = None) -> pd.Series:
+    """
+    Minimal 1D random-walk Kalman.
+    Q: process noise, R: measurement noise (CONFIG.TA'dan gelir)
+    """
+    out = kalman_filter_array(prices.to_numpy(dtype=float), q, r)
     return pd.Series(out, index=prices.index, name="kalman")
 
 
@@ -478,14 +555,42 @@ def hilbert_features(prices: pd.Series) -> dict:
 
 
 # --- 3) Entropy measures (ApEn, SampEn, Permutation)
+def _neighbor_counts(s: np.ndarray, m: int, r: float, n_templates: int,
+                     chunk: Optional[int] = None) -> np.ndarray:
+    """
+    İlk n_templates adet m-uzunluklu şablonun her biri için Chebyshev mesafesi ≤ r olan
+    şablon sayısı (kendisi dahil). n×n×m tensör yerine:
+      - şablonlar ilk koordinata göre sıralanır → her satır parçası yalnızca ±r penceresindeki
+        adaylarla karşılaştırılır
+      - max_j |Δ_j| ≤ r  ⇔  tüm j için |Δ_j| ≤ r → koordinat başına bool maske (m ekseni yok)
+    Bellek O(chunk·n); karşılaştırmalar eski broadcast ile aynı → sayılar birebir aynı.
+    """
+    chunk = int(chunk or getattr(CONFIG.TA, "ENTROPY_CHUNK", 256))
+    N = n_templates
+    order = np.argsort(s[:N], kind="stable")
+    cols = [s[j:j + N][order] for j in range(m)]
+    key = cols[0]
+    # pencere sınırında yuvarlama payı: fazladan aday zararsız (aşağıda tam test edilir)
+    pad = r * (1 + 1e-9) + 4 * np.finfo(float).eps * float(np.abs(key).max(initial=0.0))
+    counts_sorted = np.empty(N, dtype=np.int64)
+    for i in range(0, N, chunk):
+        j_end = min(i + chunk, N)
+        lo = int(np.searchsorted(key, key[i] - pad, side="left"))
+        hi = int(np.searchsorted(key, key[j_end - 1] + pad, side="right"))
+        within = np.abs(cols[0][i:j_end, None] - cols[0][None, lo:hi]) <= r
+        for c in cols[1:]:
+            within &= np.abs(c[i:j_end, None] - c[None, lo:hi]) <= r
+        counts_sorted[i:j_end] = within.sum(axis=1)
+    counts = np.empty(N, dtype=np.int64)
+    counts[order] = counts_sorted
+    return counts
+
+
 def _phi(m: int, r: float, series: np.ndarray) -> float:
     n = len(series)
     if n <= m + 1:
         return np.inf
-    x = np.array([series[i:i+m] for i in range(n - m + 1)])
-    # pairwise Chebyshev distances
-    d = np.max(np.abs(x[:, None, :] - x[None, :, :]), axis=2)
-    C = (d <= r).sum(axis=1) / (n - m + 1)
+    C = _neighbor_counts(series, m, r, n - m + 1) / (n - m + 1)
     C = C[C > 0]
     return np.sum(np.log(C)) / (len(C) + 1e-12) if len(C) else np.inf
 
@@ -506,32 +611,88 @@ def sample_entropy(series: pd.Series, m: Optional[int] = None, r: Optional[float
     if r is None:
         r = CONFIG.TA.ENTROPY_R_FACTOR * np.std(s)
     n = len(s)
-    xm = np.array([s[i:i+m] for i in range(n-m)])
-    xm1 = np.array([s[i:i+m+1] for i in range(n-m-1)])
-    def count_sim(x, tol):
-        d = np.max(np.abs(x[:, None, :] - x[None, :, :]), axis=2)
-        return (d <= tol).sum() - len(x)
-    B = count_sim(xm, r)
-    A = count_sim(xm1, r)
+    # kendisiyle eşleşmeler hariç benzer şablon çifti sayıları
+    B = int(_neighbor_counts(s, m, r, n - m).sum()) - (n - m)
+    A = int(_neighbor_counts(s, m + 1, r, n - m - 1).sum()) - (n - m - 1)
     if B <= 0 or A <= 0:
         return np.nan
     return float(-np.log(A / B))
 
+def _ordinal_codes(x: np.ndarray, m: int) -> np.ndarray:
+    """Her m'lik pencerenin sıralama permütasyonu (argsort) → Lehmer kodu (0..m!-1)."""
+    from numpy.lib.stride_tricks import sliding_window_view
+    perm = np.argsort(sliding_window_view(x, m), axis=1)
+    codes = np.zeros(perm.shape[0], dtype=np.int64)
+    for i in range(m - 1):
+        smaller = (perm[:, i + 1:] < perm[:, i:i + 1]).sum(axis=1)
+        codes += smaller * math.factorial(m - 1 - i)
+    return codes
+
+
 def permutation_entropy(series: pd.Series, m: Optional[int] = None) -> float:
     s = series.dropna().values.astype(float)
     m = 3 if m is None else m
     if len(s) < m:
         return np.nan
-    patterns = {}
-    for i in range(len(s) - m + 1):
-        pat = tuple(np.argsort(s[i:i+m]))
-        patterns[pat] = patterns.get(pat, 0) + 1
-    p = np.array(list(patterns.values()), dtype=float)
+    codes = _ordinal_codes(s, m)
+    counts = np.bincount(codes, minlength=math.factorial(m))
+    # desenler ilk görülme sırasıyla toplanır (eski dict sırası → birebir aynı toplam)
+    uniq, first = np.unique(codes, return_index=True)
+    p = counts[uniq[np.argsort(first)]].astype(float)
     p /= p.sum()
     return float(-np.sum(p * np.log(p + 1e-12)) / np.log(math.factorial(m)))
 
 
+def rolling_permutation_entropy(series: pd.Series, window: int, m: Optional[int] = None) -> pd.Series:
+    """
+    Kayan pencere permutation entropy serisi (pencere = son `window` değer, window-m+1 desen).
+    Desen sayıları one-hot kümülatif toplamların farkıyla her bar için güncellenir
+    (bar başına O(m!)); canlı akış için utils.indicators.PermutationEntropy.
+    """
+    m = 3 if m is None else m
+    s = series.dropna()
+    x = s.values.astype(float)
+    out = np.full(len(x), np.nan)
+    k = window - m + 1
+    if k >= 1 and len(x) >= window:
+        n_pat = math.factorial(m)
+        codes = _ordinal_codes(x, m)
+        cum = np.zeros((codes.size + 1, n_pat), dtype=np.int32)
+        np.cumsum(np.eye(n_pat, dtype=np.int32)[codes], axis=0, out=cum[1:])
+        p = (cum[k:] - cum[:-k]) / k
+        out[window - 1:] = -np.sum(p * np.log(p + 1e-12), axis=1) / np.log(n_pat)
+    return pd.Series(out, index=s.index, name="perm_entropy").reindex(series.index)
+
+
 # --- 4) Rejim tespiti (heuristic trendiness skoru)
+def rolling_slope(series: pd.Series, window: int) -> pd.Series:
+    """
+    Pencere içi en küçük kareler eğimi (x = 0..window-1), kapalı form:
+      eğim = Σ (i − ī)·y_i / Σ (i − ī)²,  Σ (i − ī)·y_i = Σ j·y − j̄_pencere·Σ y
+    Σy ve Σj·y rolling toplamlarından O(n); rolling(window).apply(np.polyfit) ile aynı
+    (pencerede NaN → NaN).
+    """
+    y = series.astype(float)
+    n = len(y)
+    if window < 2 or n == 0 or y.isna().all():
+        return pd.Series(np.nan, index=series.index, name=series.name)
+    # y ve j'yi merkezlemek eğimi değiştirmez, büyük fiyat/indekslerde iptal hatasını azaltır
+    yc = y - float(np.nanmean(y.values))
+    j = np.arange(n, dtype=float) - (n - 1) / 2.0
+    s_y = yc.rolling(window).sum()
+    s_jy = (yc * j).rolling(window).sum()
+    j_bar = j - (window - 1) / 2.0      # pencere sonu t → pencere ortalama indeksi
+    den = window * (window * window - 1) / 12.0
+    return ((s_jy - j_bar * s_y) / den).rename(series.name)
+
+
+def rolling_zscore(series: pd.Series, window: int) -> pd.Series:
+    """(s − rolling mean) / (rolling std + 1e-9)"""
+    m = series.rolling(window).mean()
+    sd = series.rolling(window).std()
+    return (series - m) / (sd + 1e-9)
+
+
 def detect_regime(df: pd.DataFrame, window: Optional[int] = None) -> pd.Series:
     """
     Basit rejim skoru: trendiness ~ trend_z - penalty(vol_z)
@@ -544,52 +705,106 @@ def detect_regime(df: pd.DataFrame, window: Optional[int] = None) -> pd.Series:
     ret = px.pct_change()
     vol = ret.rolling(window).std()
     # pencere içinde lineer trend eğimi
-    def slope(x):
-        idx = np.arange(len(x))
-        b, a = np.polyfit(idx, x, 1)
-        return b
-    trend = px.rolling(window).apply(slope, raw=True)
+    trend = rolling_slope(px, window)
     # normalize (robust-ish)
-    def zscore(s):
-        m = s.rolling(window).mean()
-        sd = s.rolling(window).std()
-        return (s - m) / (sd + 1e-9)
-    trend_z = zscore(trend).fillna(0).clip(-3,3)/3.0
-    vol_z = zscore(vol).fillna(0).clip(-3,3)/3.0
+    trend_z = rolling_zscore(trend, window).fillna(0).clip(-3,3)/3.0
+    vol_z = rolling_zscore(vol, window).fillna(0).clip(-3,3)/3.0
     score = trend_z - 0.5*np.maximum(vol_z-0.5, 0.0)
     return score.fillna(0.0).rename("regime_score")
 
 
 # --- 5) Lead-Lag: max xcorr lag (opsiyonel referans)
+def _xcorr_best_lag(X: np.ndarray, y: np.ndarray, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    X: semboller × L getiri matrisi, y: L referans getirisi (sona hizalı).
+    Her gecikme için örtüşen parçaların Pearson korelasyonu (np.corrcoef ile aynı tanım):
+      çapraz toplamlar tek FFT geçişinde (referans spektrumu bir kez), parça ortalama/varyansları
+      prefix toplamlarından. Dönüş: (en iyi gecikme, korelasyon) — |corr| en büyük, eşitlikte ilk gecikme.
+    """
+    S, L = X.shape
+    # sabit kaydırma korelasyonu değiştirmez; merkezlemek iptal hatasını azaltır
+    X = X - X.mean(axis=1, keepdims=True)
+    y = y - y.mean()
+    nfft = 1 << int(2 * L - 1).bit_length()
+    Fy = np.conj(np.fft.rfft(y, nfft))
+    cc = np.fft.irfft(np.fft.rfft(X, nfft, axis=1) * Fy, nfft, axis=1)   # cc[k] = Σ x[t+k]·y[t]
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    sxy = cc[:, lags % nfft]                                          # S × (2M+1)
+    px = np.concatenate((np.zeros((S, 1)), np.cumsum(X, axis=1)), axis=1)
+    px2 = np.concatenate((np.zeros((S, 1)), np.cumsum(X * X, axis=1)), axis=1)
+    py = np.concatenate(([0.0], np.cumsum(y)))
+    py2 = np.concatenate(([0.0], np.cumsum(y * y)))
+    # lag > 0: x[lag:], y[:-lag];  lag < 0: x[:lag], y[-lag:]
+    x0 = np.maximum(lags, 0); x1 = L + np.minimum(lags, 0)
+    y0 = np.maximum(-lags, 0); y1 = L - np.maximum(lags, 0)
+    n = (L - np.abs(lags)).astype(float)
+    sx = px[:, x1] - px[:, x0]
+    sx2 = px2[:, x1] - px2[:, x0]
+    sy = py[y1] - py[y0]
+    sy2 = py2[y1] - py2[y0]
+    cov = sxy - sx * sy / n
+    vx = sx2 - sx * sx / n
+    vy = sy2 - sy * sy / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(vx * vy)
+    # sabit parça (corrcoef → NaN) → atla
+    flat = (vx <= 1e-10 * np.maximum(sx2, 1e-300)) | (vy <= 1e-10 * np.maximum(sy2, 1e-300))
+    corr = np.where(np.isfinite(corr) & ~flat, corr, 0.0)
+
+    best = np.argmax(np.abs(corr), axis=1)
+    best_corr = corr[np.arange(S), best]
+    best_lag = np.where(best_corr != 0.0, lags[best], 0)
+    return best_lag, best_corr
+
+
+def _pct_returns(series: pd.Series) -> np.ndarray:
+    """series.pct_change().dropna().values'in numpy karşılığı (önce ileri doldurma, aynı aritmetik)."""
+    v = _ffill_last_axis(series.to_numpy(dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = v[1:] / v[:-1] - 1
+    return r[~np.isnan(r)]
+
+
+def leadlag_xcorr_batch(targets: Dict[str, pd.Series], reference: pd.Series,
+                        max_lag: Optional[int] = None) -> Dict[str, dict]:
+    """
+    Tüm semboller × tüm gecikmeler tek FFT geçişinde (aynı uzunluktaki seriler tek matriste).
+    Dönüş: {symbol: {"lag", "corr", "score"}} — leadlag_xcorr ile aynı sözleşme.
+    """
+    max_lag = CONFIG.TA.LEADLAG_MAX_LAG if max_lag is None else max_lag
+    y_full = _pct_returns(reference)
+    out: Dict[str, dict] = {}
+    groups: Dict[int, list] = {}
+    for sym, target in targets.items():
+        x = _pct_returns(target)
+        L = min(len(x), len(y_full))
+        if L < max_lag + 5:
+            out[sym] = {"lag": 0, "corr": 0.0, "score": 0.0}
+            continue
+        groups.setdefault(L, []).append((sym, x[-L:]))
+    for L, items in groups.items():
+        X = np.vstack([x for _, x in items]).astype(float)
+        lags, corrs = _xcorr_best_lag(X, y_full[-L:].astype(float), max_lag)
+        for (sym, _), lag, c in zip(items, lags, corrs):
+            out[sym] = {"lag": int(lag), "corr": float(c), "score": float(np.tanh(c))}
+    return out
+
+
 def leadlag_xcorr(target: pd.Series, reference: pd.Series, max_lag: Optional[int] = None) -> dict:
     """
     target ve reference getirileri arasında [-max_lag, max_lag] gecikmede
     maksimum korelasyonu bulur. Skoru [-1,1]'e sıkıştırır.
     """
-    max_lag = CONFIG.TA.LEADLAG_MAX_LAG if max_lag is None else max_lag
-    x = target.pct_change().dropna().values
-    y = reference.pct_change().dropna().values
-    L = min(len(x), len(y))
-    if L < max_lag + 5:
-        return {"lag": 0, "corr": 0.0, "score": 0.0}
-    x = x[-L:]; y = y[-L:]
-    best_corr, best_lag = 0.0, 0
-    for lag in range(-max_lag, max_lag+1):
-        if lag < 0:
-            corr = np.corrcoef(x[:lag], y[-lag:])[0,1]
-        elif lag > 0:
-            corr = np.corrcoef(x[lag:], y[:-lag])[0,1]
-        else:
-            corr = np.corrcoef(x, y)[0,1]
-        if np.isfinite(corr) and abs(corr) > abs(best_corr):
-            best_corr, best_lag = float(corr), lag
-    score = float(np.tanh(best_corr))  # [-1,1]
-    return {"lag": int(best_lag), "corr": float(best_corr), "score": score}
+    return leadlag_xcorr_batch({"target": target}, reference, max_lag)["target"]
 
 
 # --- 6) Birleşik skorlayıcı + sinyal
-def compute_alpha_ta(df: pd.DataFrame, ref_series: Optional[pd.Series] = None) -> dict:
+def compute_alpha_ta(df: pd.DataFrame, ref_series: Optional[pd.Series] = None,
+                     precomputed: Optional[dict] = None) -> dict:
     """
+    precomputed: toplu hesaplanmış parçalar — {"kalman": Series, "regime": Series, "leadlag": {...}}
+                 (scan_market panel + FFT lead-lag'den)
     Döndürür:
       {
         "score": float in [-1,1],
@@ -599,8 +814,9 @@ def compute_alpha_ta(df: pd.DataFrame, ref_series: Optional[pd.Series] = None) -
     """
     try:
         px = df["close"].astype(float)
+        pre = precomputed or {}
         # Kalman
-        kf = kalman_filter_series(px)
+        kf = pre["kalman"] if "kalman" in pre else kalman_filter_series(px)
         kf_err = (px - kf).rolling(20).std()
         kf_score = float(np.tanh((kf.diff().iloc[-1]) / (float(kf_err.iloc[-1]) + 1e-9))) if len(kf) > 21 else 0.0
 
@@ -624,11 +840,14 @@ def compute_alpha_ta(df: pd.DataFrame, ref_series: Optional[pd.Series] = None) -
             entropy_score = 0.0
 
         # Rejim
-        reg = detect_regime(df)
+        reg = pre["regime"] if "regime" in pre else detect_regime(df)
         regime_score = float(np.clip(reg.iloc[-1] if len(reg) else 0.0, -1.0, 1.0))
 
         # Lead-Lag (opsiyonel)
-        if isinstance(ref_series, pd.Series) and len(ref_series) >= len(px)//2:
+        if "leadlag" in pre:
+            leadlag_detail = pre["leadlag"]
+            leadlag_score = leadlag_detail["score"]
+        elif isinstance(ref_series, pd.Series) and len(ref_series) >= len(px)//2:
             ll = leadlag_xcorr(px, ref_series)
             leadlag_score = ll["score"]
             leadlag_detail = ll
@@ -666,8 +885,9 @@ def compute_alpha_ta(df: pd.DataFrame, ref_series: Optional[pd.Series] = None) -
         return {"score": 0.0, "detail": {}, "series": {}}
 
 
-def alpha_signal(df: pd.DataFrame, ref_series: Optional[pd.Series] = None) -> dict:
-    res = compute_alpha_ta(df, ref_series=ref_series)
+def alpha_signal(df: pd.DataFrame, ref_series: Optional[pd.Series] = None,
+                 precomputed: Optional[dict] = None) -> dict:
+    res = compute_alpha_ta(df, ref_series=ref_series, precomputed=precomputed)
     s = res["score"]
     if s >= CONFIG.TA.ALPHA_LONG_THRESHOLD:
         sig = 1
@@ -756,13 +976,217 @@ def scan_market(market_data: Dict[str, pd.DataFrame], ref_close: Optional[pd.Ser
       ref_close  : opsiyonel referans seri (örn. BTC close) lead-lag için
     """
     results: Dict[str, dict] = {}
+    # lead-lag: tüm semboller referansa karşı tek FFT geçişinde
+    leadlag: Dict[str, dict] = {}
+    if isinstance(ref_close, pd.Series):
+        try:
+            targets = {
+                sym: df["close"].astype(float) for sym, df in market_data.items()
+                if isinstance(df, pd.DataFrame) and not df.empty and len(ref_close) >= len(df) // 2
+            }
+            leadlag = leadlag_xcorr_batch(targets, ref_close)
+        except Exception as e:
+            print(f"[SCAN ERROR] leadlag batch: {e}")
+    # Kalman + rejim: tüm semboller panelde tek geçişte
+    series: Dict[str, dict] = {}
+    try:
+        panel = build_panel({s: df[["close"]] for s, df in market_data.items()
+                             if isinstance(df, pd.DataFrame) and not df.empty and "close" in df})
+        pv = panel_indicators(panel, full=True, include=("kalman", "regime"))
+        for i, sym in enumerate(panel.symbols):
+            idx = market_data[sym].index
+            series[sym] = {
+                "kalman": pd.Series(pv["kalman"][i, panel.start[i]:], index=idx, name="kalman"),
+                "regime": pd.Series(pv["regime"][i, panel.start[i]:], index=idx, name="regime_score"),
+            }
+    except Exception as e:
+        print(f"[SCAN ERROR] panel: {e}")
     for symbol, df in market_data.items():
         if not isinstance(df, pd.DataFrame) or df.empty:
             results[symbol] = {"alpha_ta": {"score": 0.0, "signal": 0}}
             continue
         try:
-            results[symbol] = alpha_signal(df, ref_series=ref_close)
+            pre = dict(series.get(symbol, {}))
+            if symbol in leadlag:
+                pre["leadlag"] = leadlag[symbol]
+            results[symbol] = alpha_signal(df, ref_series=ref_close, precomputed=pre)
         except Exception as e:
             print(f"[SCAN ERROR] {symbol}: {e}")
             results[symbol] = {"alpha_ta": {"score": 0.0, "signal": 0}}
     return results
+
+
+# --------------------------
+# 8) Panel (semboller × zaman) motoru
+# --------------------------
+# - Sembollerin OHLCV'si sona hizalı 2D dizilere dizilir (kısa seriler başta NaN dolgulu)
+# - İndikatörler axis=1 boyunca tek vektörel geçişte; tekil fonksiyonlarla aynı tanımlar:
+#     rolling olanlar 2D pandas rolling / sliding_window_view (NaN içeren pencere → NaN)
+#     özyinelemeli olanlar (EMA/MACD/Kalman/OBV) aynı başlangıç ofsetli satır gruplarında
+# - Sonuç: {ad: (S,) son değerler} veya full=True → {ad: (S, T) seriler}
+@dataclass
+class Panel:
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    start: np.ndarray        # satır başına ilk gerçek bar indeksi (dolgu sonrası)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.close.shape
+
+    def row(self, arr: np.ndarray, symbol: str, index=None) -> pd.Series:
+        """Panel serisinden sembolün gerçek kısmı (dolgu hariç) → Series."""
+        i = self.symbols.index(symbol)
+        vals = arr[i, int(self.start[i]):]
+        return pd.Series(vals, index=index if index is not None and len(index) == len(vals) else None)
+
+
+def build_panel(market_data: Dict[str, pd.DataFrame], length: Optional[int] = None) -> Panel:
+    """{symbol: OHLCV df} → Panel; length verilirse son length bar (varsayılan: en uzun seri)."""
+    items = [(s, df) for s, df in market_data.items() if isinstance(df, pd.DataFrame) and not df.empty]
+    T = length or max((len(df) for _, df in items), default=0)
+    S = len(items)
+    cols = {c: np.full((S, T), np.nan) for c in ("open", "high", "low", "close", "volume")}
+    start = np.zeros(S, dtype=np.int64)
+    for i, (_, df) in enumerate(items):
+        n = min(len(df), T)
+        start[i] = T - n
+        for c, arr in cols.items():
+            if c in df:
+                arr[i, T - n:] = df[c].to_numpy(dtype=float)[-n:] if n else []
+    return Panel(symbols=[s for s, _ in items], start=start, **cols)
+
+
+def _start_groups(start: np.ndarray):
+    for s in np.unique(start):
+        yield int(s), np.flatnonzero(start == s)
+
+
+def _rolling(a: np.ndarray, window: int, fn, block: int = 64) -> np.ndarray:
+    """fn(view (b, T-w+1, w)) → (b, T-w+1); satır blokları ile geçici bellek sınırlı."""
+    from numpy.lib.stride_tricks import sliding_window_view
+    S, T = a.shape
+    out = np.full((S, T), np.nan)
+    if T < window:
+        return out
+    for r in range(0, S, block):
+        out[r:r + block, window - 1:] = fn(sliding_window_view(a[r:r + block], window, axis=1))
+    return out
+
+
+def _rolling_frame(a: np.ndarray, window: int):
+    # zaman × sembol DataFrame: pandas rolling sütun başına O(T) (Cython), tekil seriyle aynı tanım
+    return pd.DataFrame(a.T, copy=False).rolling(window)
+
+
+def _rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_frame(a, window).mean().to_numpy().T
+
+
+def _rolling_std(a: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_frame(a, window).std().to_numpy().T
+
+
+def _rolling_zscore(a: np.ndarray, window: int) -> np.ndarray:
+    return (a - _rolling_mean(a, window)) / (_rolling_std(a, window) + 1e-9)
+
+
+def _panel_ema(x: np.ndarray, start: np.ndarray, period: int) -> np.ndarray:
+    """ewm(span=period, adjust=False) satır başına kendi ilk barından."""
+    alpha = 2.0 / (period + 1.0)
+    out = np.full(x.shape, np.nan)
+    for s, rows in _start_groups(start):
+        seg = _ffill_last_axis(x[rows, s:])
+        if not seg.shape[1]:
+            continue
+        out[rows, s] = seg[:, 0]
+        if seg.shape[1] > 1:
+            out[rows, s + 1:] = _ar1_filter(alpha * seg[:, 1:], 1.0 - alpha, seg[:, :1])
+    return out
+
+
+def _panel_regime(close: np.ndarray, start: np.ndarray, window: int) -> np.ndarray:
+    """detect_regime'in panel karşılığı (kısa satırlar → 0)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev = np.concatenate((np.full((close.shape[0], 1), np.nan), close[:, :-1]), axis=1)
+        ret = close / prev - 1
+    vol = _rolling_std(ret, window)
+    idx = np.arange(window, dtype=float)
+    w = (idx - idx.mean()) / (window * (window * window - 1) / 12.0)
+    trend = _rolling(close, window, lambda v: v @ w)
+    trend_z = np.clip(np.nan_to_num(_rolling_zscore(trend, window), nan=0.0), -3, 3) / 3.0
+    vol_z = np.clip(np.nan_to_num(_rolling_zscore(vol, window), nan=0.0), -3, 3) / 3.0
+    score = trend_z - 0.5 * np.maximum(vol_z - 0.5, 0.0)
+    short = (close.shape[1] - start) < window + 5
+    score[short] = 0.0
+    return score
+
+
+def panel_indicators(panel: Panel, full: bool = False, include: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Panelde indikatör seti (axis=1): ema, macd, macd_signal, macd_hist, rsi, atr,
+    bb_upper, bb_mid, bb_lower, obv, stoch_k, stoch_d, kalman, regime.
+    full=False → (S,) son değerler; include ile alt küme seçilebilir.
+    """
+    ta = CONFIG.TA
+    want = set(include) if include else None
+    need = lambda *names: want is None or any(n in want for n in names)
+    h, l, c, v, start = panel.high, panel.low, panel.close, panel.volume, panel.start
+    S, T = c.shape
+    pad = np.arange(T)[None, :] < start[:, None]
+    out: Dict[str, np.ndarray] = {}
+
+    if need("ema"):
+        out["ema"] = _panel_ema(c, start, ta.EMA_PERIOD)
+    if need("macd", "macd_signal", "macd_hist"):
+        line = _panel_ema(c, start, ta.MACD_FAST) - _panel_ema(c, start, ta.MACD_SLOW)
+        sig = _panel_ema(line, start, ta.MACD_SIGNAL)
+        out["macd"], out["macd_signal"], out["macd_hist"] = line, sig, line - sig
+    if need("rsi"):
+        delta = np.diff(c, axis=1, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        gain[pad] = np.nan
+        loss[pad] = np.nan
+        rs = _rolling_mean(gain, ta.RSI_PERIOD) / (_rolling_mean(loss, ta.RSI_PERIOD) + 1e-12)
+        out["rsi"] = 100 - (100 / (1 + rs))
+    if need("atr"):
+        prev_c = np.concatenate((np.full((S, 1), np.nan), c[:, :-1]), axis=1)
+        tr = np.fmax(np.fmax(h - l, np.abs(h - prev_c)), np.abs(l - prev_c))
+        out["atr"] = _rolling_mean(tr, ta.ATR_PERIOD)
+    if need("bb_upper", "bb_mid", "bb_lower"):
+        sma = _rolling_mean(c, ta.BB_PERIOD)
+        sd = _rolling_std(c, ta.BB_PERIOD)
+        out["bb_upper"], out["bb_mid"], out["bb_lower"] = sma + ta.BB_STDDEV * sd, sma, sma - ta.BB_STDDEV * sd
+    if need("obv"):
+        step = np.nan_to_num(np.sign(np.diff(c, axis=1, prepend=np.nan)) * v, nan=0.0)
+        obv_ = np.cumsum(step, axis=1)
+        obv_[pad] = np.nan
+        out["obv"] = obv_
+    if need("stoch_k", "stoch_d"):
+        low_min = _rolling_frame(l, ta.STOCH_K).min().to_numpy().T
+        high_max = _rolling_frame(h, ta.STOCH_K).max().to_numpy().T
+        k = 100 * (c - low_min) / (high_max - low_min + 1e-12)
+        out["stoch_k"], out["stoch_d"] = k, _rolling_mean(k, ta.STOCH_D)
+    if need("kalman"):
+        kf = np.full((S, T), np.nan)
+        for s, rows in _start_groups(start):
+            kf[rows, s:] = kalman_filter_array(c[rows, s:])
+        out["kalman"] = kf
+    if need("regime"):
+        reg = _panel_regime(c, start, ta.REGIME_WINDOW)
+        reg[pad] = np.nan
+        out["regime"] = reg
+
+    if not full:
+        out = {k: (a[:, -1] if T else np.empty(S)) for k, a in out.items()}
+    return out
+
+
+def panel_by_symbol(panel: Panel, values: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+    """panel_indicators(full=False) çıktısı → {symbol: {ad: değer}}"""
+    return {sym: {k: float(a[i]) for k, a in values.items()} for i, sym in enumerate(panel.symbols)}
@@ -0,0 +1,203 @@
+# utils/ticker_table.py
+##♦️ tüm market için canlı ticker tablosu (!miniTicker@arr / !ticker@arr)
+# - Sütun bazlı numpy dizileri: sembol index → last, open, high, low, base/quote volume, change %
+# - WS'ten gelen array mesajı yerinde (in-place) güncellenir, dict birikimi yok
+# - Snapshot okuma API'leri: komutlar REST get_all_24h_tickers() çağırmadan çalışır
+# - Stream sadece değişen sembolleri gönderir → başlangıçta REST snapshot ile tohumlanır (seed);
+#   tohumlanmadan ready() False döner
+# - Tablo hazır değilse (stream yok / tohumlanmadı / bayat) get_all_tickers REST'e düşer
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("ticker_table")
+LOG.addHandler(logging.NullHandler())
+
+COLUMNS = ("last", "open", "high", "low", "volume", "quote_volume", "change_pct")
+
+# REST /api/v3/ticker/24hr alan adları ile eşleme (mevcut consumer'lar için)
+_REST_KEYS = {
+    "last": "lastPrice",
+    "open": "openPrice",
+    "high": "highPrice",
+    "low": "lowPrice",
+    "volume": "volume",
+    "quote_volume": "quoteVolume",
+    "change_pct": "priceChangePercent",
+}
+
+
+class LiveTickerTable:
+    def __init__(self, capacity: int = 4096, stale_after: Optional[float] = None):
+        self.capacity = capacity
+        self.stale_after = stale_after if stale_after is not None else CONFIG.BINANCE.TICKER_TABLE_STALE_SEC
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.cols: Dict[str, np.ndarray] = {c: np.full(capacity, np.nan) for c in COLUMNS}
+        self.event_time = np.zeros(capacity, dtype=np.int64)
+        self.last_update = 0.0
+        self.updates = 0
+        self.seeded = False
+
+    # ---------------------------------------------------------
+    # Yazma (WS callback)
+    # ---------------------------------------------------------
+    def _slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i >= self.capacity:
+                self._grow()
+            self.index[symbol] = i
+            self.symbols.append(symbol)
+        return i
+
+    def _grow(self):
+        new_cap = self.capacity * 2
+        for c, arr in self.cols.items():
+            grown = np.full(new_cap, np.nan)
+            grown[:self.capacity] = arr
+            self.cols[c] = grown
+        et = np.zeros(new_cap, dtype=np.int64)
+        et[:self.capacity] = self.event_time
+        self.event_time = et
+        self.capacity = new_cap
+
+    async def handle_message(self, msg):
+        """ws_subscribe callback: !miniTicker@arr veya !ticker@arr (combined veya raw)."""
+        try:
+            self.update(msg.get("data") if isinstance(msg, dict) else msg)
+        except Exception:
+            LOG.exception("ticker table update error")
+
+    def update(self, items: List[Dict[str, Any]]):
+        # önce slot'lar (kapasite büyüyebilir), sonra sütun referansları
+        slots = [self._slot(t["s"]) for t in items]
+        last, open_, high, low = self.cols["last"], self.cols["open"], self.cols["high"], self.cols["low"]
+        vol, qvol, chg = self.cols["volume"], self.cols["quote_volume"], self.cols["change_pct"]
+        for i, t in zip(slots, items):
+            c = float(t["c"])
+            o = float(t["o"])
+            last[i] = c
+            open_[i] = o
+            high[i] = float(t["h"])
+            low[i] = float(t["l"])
+            vol[i] = float(t["v"])
+            qvol[i] = float(t["q"])
+            # !ticker@arr "P" gönderir; miniTicker'da open'dan hesaplanır
+            p = t.get("P")
+            chg[i] = float(p) if p is not None else ((c - o) / o * 100.0 if o else 0.0)
+            self.event_time[i] = int(t.get("E", 0))
+        self.last_update = time.time()
+        self.updates += 1
+
+    def seed_rows(self, items: List[Dict[str, Any]]):
+        """REST 24hr snapshot satırları; WS'ten daha yeni gelmiş semboller ezilmez."""
+        for t in items:
+            close_time = int(t.get("closeTime", 0))
+            i = self._slot(t["symbol"])
+            if self.event_time[i] >= close_time:
+                continue
+            for c, key in _REST_KEYS.items():
+                self.cols[c][i] = float(t[key])
+            self.event_time[i] = close_time
+        self.seeded = True
+
+    async def seed(self, api, delay: float = 5.0, max_delay: float = 300.0):
+        """Stream başlarken tek get_all_24h_tickers() ile tüm evreni doldur; başarana kadar backoff ile dener."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.seed_rows(await api.get_all_24h_tickers())
+                LOG.info("ticker table seeded: %d symbols", len(self.symbols))
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # tohumlanmadan ready() False kalır → çağıranlar REST'te; bu yüzden sessiz kalınmaz
+                log = LOG.error if attempt >= 3 else LOG.warning
+                log("ticker table seed failed (attempt %d, retry in %.0fs): %s", attempt, delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+    # ---------------------------------------------------------
+    # Okuma API'leri
+    # ---------------------------------------------------------
+    def ready(self) -> bool:
+        return self.seeded and bool(self.symbols) and (time.time() - self.last_update) < self.stale_after
+
+    def snapshot(self, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Sütunların kopyası + "symbol" dizisi (satır sırası index ile aynı)."""
+        n = len(self.symbols)
+        out = {c: self.cols[c][:n].copy() for c in (columns or COLUMNS)}
+        out["symbol"] = np.array(self.symbols, dtype=object)
+        return out
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        row = {"symbol": self.symbols[i]}
+        for c, key in _REST_KEYS.items():
+            row[key] = float(self.cols[c][i])
+        return row
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Tek sembol, REST 24hr ticker alan adlarıyla."""
+        i = self.index.get(symbol.upper())
+        return self._row(i) if i is not None else None
+
+    def rows(self, symbols: Optional[Iterable[str]] = None, quote: Optional[str] = None,
+             sort_by: Optional[str] = None, descending: bool = True, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Filtre + sıralama + limit; sadece dönen satırlar için dict üretilir.
+        sort_by: COLUMNS içinden bir sütun (örn. "quote_volume", "change_pct")
+        """
+        n = len(self.symbols)
+        if symbols is not None:
+            idx = np.array([self.index[s] for s in symbols if s in self.index], dtype=np.int64)
+        else:
+            idx = np.arange(n)
+        if quote:
+            idx = np.array([i for i in idx if self.symbols[i].endswith(quote)], dtype=np.int64)
+        if sort_by and idx.size:
+            key = self.cols[sort_by][idx]
+            key = np.where(np.isnan(key), -np.inf if descending else np.inf, key)
+            order = np.argsort(-key if descending else key, kind="stable")
+            idx = idx[order]
+        if limit is not None:
+            idx = idx[:limit]
+        return [self._row(int(i)) for i in idx]
+
+    def total_quote_volume(self, quote: Optional[str] = None) -> float:
+        n = len(self.symbols)
+        qv = self.cols["quote_volume"][:n]
+        if quote:
+            mask = np.fromiter((s.endswith(quote) for s in self.symbols), dtype=bool, count=n)
+            qv = qv[mask]
+        return float(np.nansum(qv))
+
+
+# -------------------------------------------------------------
+# Singleton + REST fallback
+# -------------------------------------------------------------
+_table: Optional[LiveTickerTable] = None
+
+
+def get_ticker_table() -> LiveTickerTable:
+    global _table
+    if _table is None:
+        _table = LiveTickerTable()
+    return _table
+
+
+async def get_all_tickers(api) -> List[Dict[str, Any]]:
+    """Tablo hazırsa canlı satırlar, değilse REST get_all_24h_tickers()."""
+    table = get_ticker_table()
+    if table.ready():
+        return table.rows()
+    return await api.get_all_24h_tickers()
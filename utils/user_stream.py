@@ -0,0 +1,315 @@
+# utils/user_stream.py
+##♦️ futures user data stream (listenKey) + bellek içi hesap durumu
+# - AccountState: wallet balance, pozisyonlar, açık emirler, fill'ler (push ile güncellenir)
+# - UserDataStream: listenKey alır, önce WS'e bağlanıp event'leri tamponlar, sonra REST snapshot alır ve
+#   snapshot başlangıcından yeni event'leri sırayla yeniden uygular (aradaki fill/emir kaybolmaz);
+#   WS event'lerini (ACCOUNT_UPDATE, ORDER_TRADE_UPDATE) uygular, keepalive atar,
+#   her kopma / listenKeyExpired sonrası aynı senkron akışıyla yeniden bağlanır (kopukken synced=False)
+# - Yanında !markPrice@arr@1s akışı: sembol başına mark price lokal tutulur (emir boyutlama REST'siz)
+# - OrderManager / RiskManager bakiye, mark price ve PnL'i REST yerine buradan okur
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import websockets
+
+from utils.config import CONFIG
+from utils.binance_api import BinanceClient
+
+LOG = logging.getLogger("user_stream")
+LOG.addHandler(logging.NullHandler())
+
+
+class AccountState:
+    """Futures hesap durumu (tek event loop'tan güncellenir)."""
+
+    def __init__(self, asset: str = "USDT", max_fills: int = 1000):
+        self.asset = asset
+        self.balances: Dict[str, Dict[str, float]] = {}
+        self.positions: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.open_orders: Dict[int, Dict[str, Any]] = {}
+        self.fills: Deque[Dict[str, Any]] = deque(maxlen=max_fills)
+        self.realized_pnl_today = 0.0
+        self._pnl_day = self._utc_day()
+        self._seeded_trades: Set[int] = set()   # income ile sayılmış trade'ler (fill'de tekrar eklenmez)
+        self.synced = False
+        self.last_event_ms = 0
+        self.mark_prices: Dict[str, Tuple[float, int]] = {}   # symbol → (mark, event ms)
+
+    @staticmethod
+    def _utc_day() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def utc_midnight_ms() -> int:
+        now = datetime.now(timezone.utc)
+        return int(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp() * 1000)
+
+    # ---------------------------------------------------------
+    # Okuma
+    # ---------------------------------------------------------
+    @property
+    def wallet_balance(self) -> Optional[float]:
+        b = self.balances.get(self.asset)
+        return b["wallet"] if b else None
+
+    def position_amt(self, symbol: str, position_side: str = "BOTH") -> float:
+        pos = self.positions.get((symbol.upper(), position_side))
+        return pos["amt"] if pos else 0.0
+
+    def mark_price(self, symbol: str, max_age_ms: Optional[int] = None) -> Optional[float]:
+        """Lokal mark price; yoksa veya bayatsa None."""
+        item = self.mark_prices.get(symbol.upper())
+        if item is None:
+            return None
+        max_age_ms = int(CONFIG.BOT.MARK_PRICE_STALE_SEC * 1000) if max_age_ms is None else max_age_ms
+        if time.time() * 1000 - item[1] > max_age_ms:
+            return None
+        return item[0]
+
+    def apply_mark_prices(self, items: List[Dict[str, Any]]):
+        for t in items:
+            self.mark_prices[t["s"]] = (float(t["p"]), int(t.get("E", 0)))
+
+    def today_pnl(self) -> float:
+        if self._pnl_day != self._utc_day():
+            self._pnl_day = self._utc_day()
+            self.realized_pnl_today = 0.0
+            self._seeded_trades.clear()
+        return self.realized_pnl_today
+
+    def seed_today_pnl(self, incomes: List[Dict[str, Any]]):
+        """
+        /fapi/v1/income (REALIZED_PNL + COMMISSION, UTC gece yarısından beri) → günlük PnL.
+        Restart'ta RISK_MAX_DAILY_LOSS bütçesi sıfırlanmasın; komisyon kayıtları zaten negatiftir.
+        """
+        self._pnl_day = self._utc_day()
+        midnight = self.utc_midnight_ms()
+        pnl = 0.0
+        trades: Set[int] = set()
+        for inc in incomes:
+            if int(inc.get("time", 0)) < midnight:
+                continue
+            kind = inc.get("incomeType")
+            if kind == "COMMISSION" and inc.get("asset") != self.asset:
+                continue
+            if kind in ("REALIZED_PNL", "COMMISSION"):
+                pnl += float(inc.get("income", 0))
+                if inc.get("tradeId"):
+                    trades.add(int(inc["tradeId"]))
+        self.realized_pnl_today = pnl
+        self._seeded_trades = trades
+
+    # ---------------------------------------------------------
+    # Snapshot (REST)
+    # ---------------------------------------------------------
+    def apply_snapshot(self, account: Dict[str, Any], open_orders: List[Dict[str, Any]]):
+        self.balances = {
+            a["asset"]: {"wallet": float(a.get("walletBalance", 0)), "cross": float(a.get("crossWalletBalance", 0))}
+            for a in account.get("assets", [])
+        }
+        self.positions = {}
+        for p in account.get("positions", []):
+            amt = float(p.get("positionAmt", 0))
+            if amt:
+                self.positions[(p["symbol"], p.get("positionSide", "BOTH"))] = {
+                    "amt": amt,
+                    "entry": float(p.get("entryPrice", 0)),
+                    "upnl": float(p.get("unrealizedProfit", 0)),
+                }
+        self.open_orders = {int(o["orderId"]): {
+            "symbol": o["symbol"], "side": o["side"], "type": o["type"], "status": o["status"],
+            "qty": float(o.get("origQty", 0)), "filled": float(o.get("executedQty", 0)),
+            "price": float(o.get("price", 0)), "client_id": o.get("clientOrderId"),
+        } for o in open_orders}
+        self.synced = True
+
+    # ---------------------------------------------------------
+    # WS event'leri
+    # ---------------------------------------------------------
+    def apply_account_update(self, ev: Dict[str, Any]):
+        a = ev.get("a", {})
+        for b in a.get("B", []):
+            self.balances[b["a"]] = {"wallet": float(b["wb"]), "cross": float(b.get("cw", 0))}
+        for p in a.get("P", []):
+            key = (p["s"], p.get("ps", "BOTH"))
+            amt = float(p["pa"])
+            if amt:
+                self.positions[key] = {"amt": amt, "entry": float(p.get("ep", 0)), "upnl": float(p.get("up", 0))}
+            else:
+                self.positions.pop(key, None)
+
+    def apply_order_update(self, ev: Dict[str, Any]) -> Dict[str, Any]:
+        o = ev["o"]
+        order_id = int(o["i"])
+        order = {
+            "symbol": o["s"], "side": o["S"], "type": o["o"], "status": o["X"],
+            "qty": float(o.get("q", 0)), "filled": float(o.get("z", 0)),
+            "price": float(o.get("p", 0)), "client_id": o.get("c"),
+        }
+        if o["X"] in ("NEW", "PARTIALLY_FILLED"):
+            self.open_orders[order_id] = order
+        else:
+            self.open_orders.pop(order_id, None)
+
+        if o.get("x") == "TRADE":
+            fill = {
+                "order_id": order_id, "symbol": o["s"], "side": o["S"],
+                "qty": float(o.get("l", 0)), "price": float(o.get("L", 0)),
+                "realized_pnl": float(o.get("rp", 0)), "commission": float(o.get("n", 0) or 0),
+                "ts": int(o.get("T", ev.get("E", 0))),
+            }
+            self.fills.append(fill)
+            self.today_pnl()
+            if int(o.get("t", 0)) in self._seeded_trades:
+                return order                # snapshot'taki income'a zaten dahil
+            self.realized_pnl_today += fill["realized_pnl"] - (fill["commission"] if o.get("N") == self.asset else 0.0)
+        return order
+
+
+class UserDataStream:
+    """
+    listenKey tabanlı futures user-data-stream tüketici.
+    on_order_update(order_dict) callback'leri her emir değişiminde push edilir.
+    """
+
+    def __init__(self, client: BinanceClient, state: Optional[AccountState] = None, loop=None,
+                 keepalive_sec: Optional[int] = None):
+        self.client = client
+        self.state = state or AccountState()
+        self.loop = loop or asyncio.get_event_loop()
+        self.keepalive_sec = keepalive_sec or CONFIG.BOT.USER_STREAM_KEEPALIVE_SEC
+        self.order_callbacks: List[Callable] = []
+        self.tasks: List[asyncio.Task] = []
+        self._expired = asyncio.Event()
+        self._buffer: Optional[List[Dict[str, Any]]] = None   # snapshot alınırken gelen event'ler
+
+    def on_order_update(self, cb: Callable):
+        self.order_callbacks.append(cb)
+
+    # ---------------------------------------------------------
+    # Event dispatch
+    # ---------------------------------------------------------
+    async def _on_message(self, ev: Dict[str, Any]):
+        if ev.get("e") == "listenKeyExpired":
+            await self._handle(ev)
+        elif self._buffer is not None:
+            self._buffer.append(ev)
+        else:
+            await self._handle(ev)
+
+    async def _handle(self, msg):
+        try:
+            ev = msg.get("data", msg) if isinstance(msg, dict) else msg
+            et = ev.get("e")
+            self.state.last_event_ms = int(ev.get("E", time.time() * 1000))
+            if et == "ACCOUNT_UPDATE":
+                self.state.apply_account_update(ev)
+            elif et == "ORDER_TRADE_UPDATE":
+                order = self.state.apply_order_update(ev)
+                for cb in self.order_callbacks:
+                    res = cb(order)
+                    if asyncio.iscoroutine(res):
+                        await res
+            elif et == "listenKeyExpired":
+                LOG.warning("listenKey expired; reconnecting")
+                self._expired.set()
+        except Exception:
+            LOG.exception("user stream event error")
+
+    # ---------------------------------------------------------
+    # Bağlantı + keepalive
+    # ---------------------------------------------------------
+    async def _reader(self, ws):
+        async for raw in ws:
+            await self._on_message(json.loads(raw))
+
+    async def _sync(self):
+        """REST snapshot + tampondaki event'lerin (snapshot başlangıcından yeni olanlar) sırayla uygulanması."""
+        start_ms = int(time.time() * 1000)
+        account = await self.client.futures_account()
+        orders = await self.client.futures_open_orders()
+        midnight = self.state.utc_midnight_ms()
+        incomes = (await self.client.futures_income("REALIZED_PNL", midnight)
+                   + await self.client.futures_income("COMMISSION", midnight))
+        self.state.apply_snapshot(account, orders)
+        self.state.seed_today_pnl(incomes)
+        replayed = 0
+        # tampon boşalana kadar (arada await var → yeni event'ler eklenebilir), sonra canlı moda geç
+        while self._buffer:
+            ev = self._buffer.pop(0)
+            if int(ev.get("E", 0)) >= start_ms:
+                await self._handle(ev)
+                replayed += 1
+        self._buffer = None
+        self.state.synced = True
+        LOG.info("User data stream synced (balance=%s, positions=%s, replayed=%d)",
+                 self.state.wallet_balance, len(self.state.positions), replayed)
+
+    async def _run(self):
+        backoff = 1
+        while True:
+            reader = None
+            try:
+                key = await self.client.futures_listen_key()
+                self._expired.clear()
+                url = f"{CONFIG.BINANCE.FSTREAM_URL}/ws/{key}"
+                async with websockets.connect(url) as ws:
+                    # önce bağlan + tamponla, sonra snapshot → aradaki event'ler kaybolmaz
+                    self._buffer = []
+                    reader = self.loop.create_task(self._reader(ws))
+                    await self._sync()
+                    backoff = 1
+                    expired = self.loop.create_task(self._expired.wait())
+                    try:
+                        await asyncio.wait({reader, expired}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        expired.cancel()
+                    if reader.done() and not reader.cancelled() and reader.exception() is not None:
+                        raise reader.exception()
+                    LOG.warning("User data stream disconnected; resyncing")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOG.exception("user data stream error")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                if reader is not None:
+                    reader.cancel()
+                self._buffer = None
+                self.state.synced = False
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_sec)
+            try:
+                await self.client.futures_keepalive_listen_key()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOG.exception("listenKey keepalive failed")
+                self._expired.set()
+
+    async def _on_mark_prices(self, msg):
+        try:
+            self.state.apply_mark_prices(msg.get("data", msg) if isinstance(msg, dict) else msg)
+        except Exception:
+            LOG.exception("mark price update error")
+
+    def start(self):
+        self.tasks.append(self.loop.create_task(self._run()))
+        self.tasks.append(self.loop.create_task(self._keepalive()))
+        # mark price akışı (public, listenKey gerektirmez; ws_subscribe kendi içinde yeniden bağlanır)
+        url = f"{CONFIG.BINANCE.FSTREAM_URL}/ws/!markPrice@arr@1s"
+        self.tasks.append(self.loop.create_task(self.client.ws_subscribe(url, self._on_mark_prices)))
+
+    def stop(self):
+        for t in self.tasks:
+            t.cancel()
+        self.tasks = []
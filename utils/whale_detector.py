@@ -0,0 +1,252 @@
+# utils/whale_detector.py
+##♦️ aggTrade akışı üzerinde streaming whale-trade dedektörü
+# - Sembol bazlı USD eşiği (varsayılan CONFIG.BINANCE.WHALE_USD_THRESHOLD, WHALE_SYMBOL_THRESHOLDS ile override)
+# - Sembol × saniye bucket'ları (sabit boyutlu ring, CONFIG.BINANCE.WHALE_WINDOW_SEC) + kayan toplamlar
+#   → whale sayısı, net whale akışı (USD), boyut bucket'ları (small/medium/large), taker alış/satış miktarı O(1)
+# - Whale trade'inde event hook'ları (on_whale) trade geldiği anda çağrılır
+# - Zaman pencereli metrikler BinanceClient.whale_window_metrics ile ayrı API olarak sunulur;
+#   whale_trades / whale_momentum / trade_size_distribution "son N trade" anlamıyla REST'te kalır
+# - Sadece WHALE_STREAM_ENABLED iken kurulur (bucket'lar ~18 MB); okuyucular active_whale_detector() kullanır
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from utils.config import CONFIG
+
+LOG = logging.getLogger("whale_detector")
+LOG.addHandler(logging.NullHandler())
+
+# bucket sütunları
+C_SMALL, C_MEDIUM, C_LARGE, C_WHALE_BUY, C_WHALE_SELL, USD_WHALE_BUY, USD_WHALE_SELL, QTY_BUY, QTY_SELL, N_TRADES = range(10)
+N_COLS = 10
+
+SMALL_USD = 1000.0    # trade_size_distribution ile aynı sınırlar
+MEDIUM_USD = 10000.0
+
+
+def _parse_thresholds(raw: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in (raw or "").split(","):
+        if ":" in part:
+            sym, val = part.split(":", 1)
+            out[sym.strip().upper()] = float(val)
+    return out
+
+
+class WhaleDetector:
+    def __init__(self, window_sec: Optional[int] = None, default_threshold: Optional[float] = None,
+                 thresholds: Optional[Dict[str, float]] = None, capacity: int = 256, max_events: int = 200):
+        self.window = int(window_sec or CONFIG.BINANCE.WHALE_WINDOW_SEC)
+        self.default_threshold = float(default_threshold or CONFIG.BINANCE.WHALE_USD_THRESHOLD)
+        self.thresholds: Dict[str, float] = dict(
+            thresholds if thresholds is not None else _parse_thresholds(CONFIG.BINANCE.WHALE_SYMBOL_THRESHOLDS)
+        )
+        self.capacity = capacity
+        self.max_events = max_events
+        self.index: Dict[str, int] = {}
+        self.buckets = np.zeros((capacity, self.window, N_COLS))
+        self.sums = np.zeros((capacity, N_COLS))
+        self.last_sec = np.zeros(capacity, dtype=np.int64)
+        self.last_trade_ms = np.zeros(capacity, dtype=np.int64)
+        self.events: Dict[str, Deque[Dict[str, Any]]] = {}
+        self.hooks: List[Callable] = []
+        self.running = False
+        self.trades = 0
+
+    # ---------------------------------------------------------
+    # Eşikler + hook'lar
+    # ---------------------------------------------------------
+    def threshold(self, symbol: str) -> float:
+        return self.thresholds.get(symbol.upper(), self.default_threshold)
+
+    def set_threshold(self, symbol: str, usd: float):
+        self.thresholds[symbol.upper()] = float(usd)
+
+    def on_whale(self, cb: Callable):
+        """cb(event_dict); coroutine dönerse loop'ta task olarak çalışır."""
+        self.hooks.append(cb)
+
+    # ---------------------------------------------------------
+    # İç yardımcılar (LiquidationAggregator ile aynı ring düzeni)
+    # ---------------------------------------------------------
+    def _slot(self, symbol: str, now_sec: int) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = len(self.index)
+            if i >= self.capacity:
+                self._grow()
+            self.index[symbol] = i
+            self.last_sec[i] = now_sec
+        return i
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("buckets", "sums"):
+            arr = getattr(self, name)
+            grown = np.zeros((cap,) + arr.shape[1:])
+            grown[:self.capacity] = arr
+            setattr(self, name, grown)
+        for name in ("last_sec", "last_trade_ms"):
+            arr = getattr(self, name)
+            grown = np.zeros(cap, dtype=np.int64)
+            grown[:self.capacity] = arr
+            setattr(self, name, grown)
+        self.capacity = cap
+
+    def _advance(self, i: int, now_sec: int):
+        last = int(self.last_sec[i])
+        if now_sec <= last:
+            return
+        if now_sec - last >= self.window:
+            self.buckets[i] = 0.0
+            self.sums[i] = 0.0
+        else:
+            b = self.buckets[i]
+            for s in range(last + 1, now_sec + 1):
+                # pencereden çıkan saniye (s - window) aynı ring hücresi → önce toplamdan düş, sonra sıfırla
+                row = b[s % self.window]
+                self.sums[i] -= row
+                row[:] = 0.0
+            np.maximum(self.sums[i], 0.0, out=self.sums[i])  # float sürüklenmesine karşı
+        self.last_sec[i] = now_sec
+
+    # ---------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------
+    def add(self, symbol: str, price: float, qty: float, buyer_maker: bool, ts_ms: Optional[int] = None):
+        ts_ms = int(ts_ms if ts_ms is not None else time.time() * 1000)
+        now_sec = ts_ms // 1000
+        i = self._slot(symbol, now_sec)
+        self._advance(i, now_sec)
+        notional = price * qty
+        is_whale = notional >= self.threshold(symbol)
+        if now_sec > int(self.last_sec[i]) - self.window:  # pencereden eski trade'ler sayılmaz
+            b = self.buckets[i, now_sec % self.window]
+            tot = self.sums[i]
+            size_col = C_SMALL if notional < SMALL_USD else (C_MEDIUM if notional < MEDIUM_USD else C_LARGE)
+            # buyer maker → agresör satıcı
+            cols = [N_TRADES, size_col, QTY_SELL if buyer_maker else QTY_BUY]
+            vals = [1.0, 1.0, qty]
+            if is_whale:
+                cols += [C_WHALE_SELL if buyer_maker else C_WHALE_BUY, USD_WHALE_SELL if buyer_maker else USD_WHALE_BUY]
+                vals += [1.0, notional]
+            for c, v in zip(cols, vals):
+                b[c] += v
+                tot[c] += v
+        self.last_trade_ms[i] = max(int(self.last_trade_ms[i]), ts_ms)
+        self.trades += 1
+        if is_whale:
+            self._emit({
+                "symbol": symbol,
+                "side": "SELL" if buyer_maker else "BUY",
+                "price": price,
+                "qty": qty,
+                "notional": notional,
+                "ts": ts_ms,
+                "latency_ms": time.time() * 1000 - ts_ms,
+            })
+
+    def _emit(self, event: Dict[str, Any]):
+        evs = self.events.get(event["symbol"])
+        if evs is None:
+            evs = self.events[event["symbol"]] = deque(maxlen=self.max_events)
+        evs.append(event)
+        for cb in self.hooks:
+            try:
+                res = cb(event)
+                if asyncio.iscoroutine(res):
+                    asyncio.get_running_loop().create_task(res)
+            except Exception:
+                LOG.exception("whale hook error")
+
+    async def handle_message(self, msg):
+        """ws_subscribe / bridge callback: <symbol>@aggTrade (raw veya combined)."""
+        try:
+            data = msg.get("data", msg) if isinstance(msg, dict) else msg
+            self.add(data["s"], float(data["p"]), float(data["q"]), bool(data.get("m")), int(data.get("T") or data.get("E")))
+        except Exception:
+            LOG.exception("aggTrade parse error")
+
+    def add_records(self, sym_names, view):
+        """IngestProcess.consume(on_trades=...) için: shm ring trade kayıtları (closed = buyer maker)."""
+        for rec in view:
+            self.add(str(sym_names[rec["sym"]]), float(rec["close"]), float(rec["volume"]),
+                     bool(rec["closed"]), int(rec["ts"]))
+
+    # ---------------------------------------------------------
+    # Okuma (O(1) — pencere toplamları)
+    # ---------------------------------------------------------
+    def covers(self, symbol: str) -> bool:
+        """Dedektör bu sembolü canlı takip ediyor mu (stream açık + pencere içinde trade var)."""
+        i = self.index.get(symbol.upper())
+        return self.running and i is not None and (time.time() * 1000 - self.last_trade_ms[i]) < self.window * 1000
+
+    def _sums(self, symbol: str, window_sec: Optional[int] = None) -> Optional[np.ndarray]:
+        i = self.index.get(symbol.upper())
+        if i is None:
+            return None
+        now_sec = int(time.time())
+        self._advance(i, now_sec)
+        if window_sec is None or window_sec >= self.window:
+            return self.sums[i]
+        cols = (now_sec - np.arange(int(window_sec))) % self.window
+        return self.buckets[i, cols].sum(axis=0)
+
+    def whale_count(self, symbol: str, window_sec: Optional[int] = None) -> int:
+        s = self._sums(symbol, window_sec)
+        return 0 if s is None else int(round(s[C_WHALE_BUY] + s[C_WHALE_SELL]))
+
+    def net_flow(self, symbol: str, window_sec: Optional[int] = None) -> float:
+        """Net whale akışı (USD): whale alış − whale satış."""
+        s = self._sums(symbol, window_sec)
+        return 0.0 if s is None else float(s[USD_WHALE_BUY] - s[USD_WHALE_SELL])
+
+    def whale_volume(self, symbol: str, window_sec: Optional[int] = None) -> float:
+        s = self._sums(symbol, window_sec)
+        return 0.0 if s is None else float(s[USD_WHALE_BUY] + s[USD_WHALE_SELL])
+
+    def momentum(self, symbol: str, window_sec: Optional[int] = None) -> float:
+        """(whale alış sayısı − whale satış sayısı) / toplam trade (BinanceClient.whale_momentum ile aynı ölçek)."""
+        s = self._sums(symbol, window_sec)
+        if s is None:
+            return 0.0
+        return float((s[C_WHALE_BUY] - s[C_WHALE_SELL]) / max(s[N_TRADES], 1))
+
+    def size_distribution(self, symbol: str, window_sec: Optional[int] = None) -> Dict[str, int]:
+        s = self._sums(symbol, window_sec)
+        if s is None:
+            return {"small": 0, "medium": 0, "large": 0}
+        return {"small": int(round(s[C_SMALL])), "medium": int(round(s[C_MEDIUM])), "large": int(round(s[C_LARGE]))}
+
+    def taker_qty(self, symbol: str, window_sec: Optional[int] = None) -> Dict[str, float]:
+        s = self._sums(symbol, window_sec)
+        if s is None:
+            return {"buy": 0.0, "sell": 0.0}
+        return {"buy": float(s[QTY_BUY]), "sell": float(s[QTY_SELL])}
+
+    def recent_events(self, symbol: str, limit: int = 20) -> List[Dict[str, Any]]:
+        evs = self.events.get(symbol.upper())
+        return list(evs)[-limit:] if evs else []
+
+
+# -------------------------------------------------------------
+# Singleton
+# -------------------------------------------------------------
+_detector: Optional[WhaleDetector] = None
+
+
+def get_whale_detector() -> WhaleDetector:
+    global _detector
+    if _detector is None:
+        _detector = WhaleDetector()
+    return _detector
+
+
+def active_whale_detector() -> Optional[WhaleDetector]:
+    """Okuyucular için: dedektör kurulmuş ve çalışıyorsa o, yoksa None (bellek ayırmaz)."""
+    return _detector if _detector is not None and _detector.running else None